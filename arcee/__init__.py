@@ -1,41 +1,135 @@
 __version__ = "2.0.1"
 
-import os
-
-from arcee import config
-from arcee.api import (
-    alignment_status,
-    corpus_status,
-    delete_corpus,
-    deployment_status,
-    generate,
-    get_retriever_status,
-    list_pretrainings,
-    mergekit_evolve,
-    mergekit_yaml,
-    merging_status,
-    retrieve,
-    start_alignment,
-    start_deployment,
-    start_pretraining,
-    start_retriever_training,
-    stop_deployment,
-    upload_alignment,
-    upload_corpus_folder,
-    upload_docs,
-    upload_hugging_face_dataset_qa_pairs,
-    upload_qa_pairs,
-    upload_qa_pairs_from_csv,
-)
-from arcee.dalm import DALM, DALMFilter
-
-if not config.ARCEE_API_KEY:
-    # We check this because it's impossible the user imported arcee, _then_ set the env, then imported again
-    # We don't want to block or prompt here because this will interfere with CLI usage
-    config.ARCEE_API_KEY = os.getenv("ARCEE_API_KEY", "")
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from arcee.api import (
+        alignment_status,
+        corpus_status,
+        delete_corpus,
+        deployment_status,
+        embed_many,
+        generate,
+        generate_many,
+        get_retriever_status,
+        list_pretrainings,
+        mergekit_evolve,
+        mergekit_yaml,
+        merging_status,
+        retrieve,
+        retrieve_many,
+        start_alignment,
+        start_deployment,
+        start_pretraining,
+        start_retriever_training,
+        stop_deployment,
+        upload_alignment,
+        upload_corpus_folder,
+        upload_docs,
+        upload_docs_batches,
+        upload_hugging_face_dataset_qa_pairs,
+        upload_qa_pairs,
+        upload_qa_pairs_from_csv,
+    )
+    from arcee.cache import ResponseCache
+    from arcee.chunking import Splitter
+    from arcee.client import ArceeClient
+    from arcee.compression import Compression
+    from arcee.dalm import DALM, DALMFilter
+    from arcee.dedup import DocDeduplicator
+    from arcee.weights_cache import WeightsCache
+
+# `import arcee` stays cheap: the API and its dependencies are imported on first attribute access
+_lazy_attributes: Dict[str, str] = {
+    "ArceeClient": "arcee.client",
+    "Compression": "arcee.compression",
+    "Splitter": "arcee.chunking",
+    "ResponseCache": "arcee.cache",
+    "DALM": "arcee.dalm",
+    "DALMFilter": "arcee.dalm",
+    "DocDeduplicator": "arcee.dedup",
+    "WeightsCache": "arcee.weights_cache",
+    **{
+        name: "arcee.api"
+        for name in [
+            "alignment_status",
+            "corpus_status",
+            "delete_corpus",
+            "deployment_status",
+            "embed_many",
+            "generate",
+            "generate_many",
+            "get_retriever_status",
+            "list_pretrainings",
+            "mergekit_evolve",
+            "mergekit_yaml",
+            "merging_status",
+            "retrieve",
+            "retrieve_many",
+            "start_alignment",
+            "start_deployment",
+            "start_pretraining",
+            "start_retriever_training",
+            "stop_deployment",
+            "upload_alignment",
+            "upload_corpus_folder",
+            "upload_docs",
+            "upload_docs_batches",
+            "upload_hugging_face_dataset_qa_pairs",
+            "upload_qa_pairs",
+            "upload_qa_pairs_from_csv",
+        ]
+    },
+}
+_lazy_submodules = {
+    "aio",
+    "api",
+    "api_handler",
+    "api_helpers",
+    "batch",
+    "cache",
+    "cli",
+    "client",
+    "chunking",
+    "compression",
+    "config",
+    "dalm",
+    "dedup",
+    "discovery",
+    "downloads",
+    "embedding_store",
+    "retry",
+    "schemas",
+    "streaming",
+    "uploads",
+    "weights_cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+        globals()[name] = value
+        return value
+    if name in _lazy_submodules:
+        return importlib.import_module(f"arcee.{name}")
+    raise AttributeError(f"module 'arcee' has no attribute '{name}'")
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_lazy_attributes, *_lazy_submodules})
+
 
 __all__ = [
+    "ArceeClient",
+    "Compression",
+    "ResponseCache",
     "upload_docs",
+    "upload_docs_batches",
+    "DocDeduplicator",
+    "Splitter",
+    "WeightsCache",
     "DALM",
     "DALMFilter",
     "upload_corpus_folder",
@@ -59,4 +153,7 @@ __all__ = [
     "deployment_status",
     "merging_status",
     "alignment_status",
+    "generate_many",
+    "retrieve_many",
+    "embed_many",
 ]
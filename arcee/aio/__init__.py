@@ -0,0 +1,80 @@
+"""Asyncio client for the Arcee platform
+
+All calls made on one event loop share a single pooled, keep-alive `aiohttp` session, so many requests can be
+in flight at once without a thread per request. Requires the `async` extra: `pip install 'arcee-py[async]'`
+
+    import arcee.aio
+
+    async def main():
+        results = await asyncio.gather(*(arcee.aio.generate("my-deployment", query=q) for q in queries))
+        await arcee.aio.close()
+"""
+
+from arcee.aio.api import (
+    alignment_status,
+    corpus_status,
+    delete_corpus,
+    deployment_status,
+    download_weights,
+    embed,
+    embed_many,
+    generate,
+    generate_many,
+    get_current_org,
+    get_retriever_status,
+    list_pretrainings,
+    mergekit_evolve,
+    mergekit_yaml,
+    merging_status,
+    retrieve,
+    retrieve_many,
+    start_alignment,
+    start_deployment,
+    start_pretraining,
+    start_retriever_training,
+    stop_deployment,
+    upload_alignment,
+    upload_corpus_folder,
+    upload_docs,
+    upload_docs_batches,
+    upload_hugging_face_dataset_qa_pairs,
+    upload_qa_pairs,
+    upload_qa_pairs_from_csv,
+)
+from arcee.aio.api_handler import close, get_session
+from arcee.aio.dalm import AsyncDALM
+
+__all__ = [
+    "upload_docs",
+    "upload_docs_batches",
+    "AsyncDALM",
+    "upload_corpus_folder",
+    "upload_qa_pairs",
+    "start_alignment",
+    "start_pretraining",
+    "start_retriever_training",
+    "get_retriever_status",
+    "start_deployment",
+    "stop_deployment",
+    "generate",
+    "retrieve",
+    "embed",
+    "delete_corpus",
+    "corpus_status",
+    "upload_alignment",
+    "mergekit_evolve",
+    "mergekit_yaml",
+    "upload_qa_pairs_from_csv",
+    "upload_hugging_face_dataset_qa_pairs",
+    "list_pretrainings",
+    "deployment_status",
+    "merging_status",
+    "alignment_status",
+    "get_current_org",
+    "download_weights",
+    "close",
+    "get_session",
+    "generate_many",
+    "retrieve_many",
+    "embed_many",
+]
@@ -0,0 +1,607 @@
+"""Asyncio counterparts of the functions in `arcee.api`
+
+Every function here has the same arguments and return value as its `arcee.api` namesake, but is awaitable and runs
+over the pooled `aiohttp` session of the running event loop.
+"""
+
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
+
+from aiohttp import ClientResponse
+
+from arcee import config
+from arcee.aio.api_handler import make_request, nonjson_request
+from arcee.aio.batch import amap_bounded
+from arcee.aio.dalm import check_model_status
+from arcee.aio.streaming import AsyncTokenStream
+from arcee.api import (
+    QA_MAX_BATCH_PAIRS,
+    QAUploadSummary,
+    _batch_qa_pairs,
+    _docs_payload,
+    _iter_hugging_face_qa_pairs,
+    _iter_qa_pairs_csv,
+    _mergekit_yaml_payload,
+    _qa_pairs_payload,
+    model_weight_types,
+    type_to_weights_route,
+)
+from arcee.batch import BatchResult
+from arcee.chunking import Splitter, split_batches, split_docs
+from arcee.client import get_client
+from arcee.compression import EncodedBody, encode_body
+from arcee.retry import IDEMPOTENCY_HEADER, RetryPolicy
+from arcee.schemas.routes import Route
+from arcee.streaming import SSE_CONTENT_TYPE
+
+if TYPE_CHECKING:
+    from arcee.dedup import DocDeduplicator
+    from arcee.embedding_store import EmbeddingStore
+
+R = TypeVar("R")
+
+
+async def _run_blocking(func: Callable[..., R], *args: Any) -> R:
+    """Runs blocking IO or CPU-bound work on the default executor of the running loop, off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def upload_corpus_folder(corpus: str, s3_folder_url: str, tokenizer_name: str, block_size: int) -> Dict[str, str]:
+    """Upload a corpus file to a context. See `arcee.api.upload_corpus_folder`"""
+    if not s3_folder_url.startswith("s3://"):
+        raise Exception("s3_folder_url must be an S3 url")
+
+    data = {
+        "corpus_name": corpus,
+        "s3_folder_url": s3_folder_url,
+        "tokenizer_name": tokenizer_name,
+        "block_size": block_size,
+    }
+
+    return await make_request("post", Route.corpus, data)
+
+
+async def upload_qa_pairs(
+    qa_set: str, qa_pairs: List[Dict[str, str]], question_column: str = "question", answer_column: str = "answer"
+) -> Dict[str, str]:
+    """Upload a list of QA pairs to a specific QA set. See `arcee.api.upload_qa_pairs`"""
+    data = _qa_pairs_payload(qa_set, qa_pairs, question_column, answer_column)
+    return await make_request("post", Route.alignment + "/qaUpload", data)
+
+
+async def _upload_qa_batches(
+    qa_set: str,
+    batches: Iterator[List[Dict[str, str]]],
+    workers: int,
+    retry: Optional[RetryPolicy],
+    summary: QAUploadSummary,
+    idempotency_keys: bool,
+) -> QAUploadSummary:
+    """Uploads batches of {"question", "answer"} pairs with up to `workers` requests in flight
+
+    Batches are read and encoded on a worker thread, one at a time, so reading files does not block the event loop.
+    See `arcee.api._upload_qa_batches`
+    """
+    compression = get_client().compression
+    started_at = perf_counter()
+
+    def next_encoded() -> Optional[Tuple[int, EncodedBody]]:
+        batch = next(batches, None)
+        return (
+            None
+            if batch is None
+            else (len(batch), encode_body({"qa_set_name": qa_set, "qa_pairs": batch}, compression))
+        )
+
+    async def encoded() -> AsyncIterator[Tuple[int, EncodedBody]]:
+        while True:
+            item = await _run_blocking(next_encoded)
+            if item is None:
+                return
+            yield item
+
+    async def send(encoded: Tuple[int, EncodedBody]) -> Dict[str, str]:
+        body = encoded[1]
+        headers = {IDEMPOTENCY_HEADER: hashlib.sha256(body.data).hexdigest()} if idempotency_keys else None
+        return await make_request("post", Route.alignment + "/qaUpload", body, headers=headers, retry=retry)
+
+    async for result in amap_bounded(send, encoded(), concurrency=workers):
+        summary.batches += 1
+        if result.error is None:
+            summary.uploaded += result.item[0]
+        else:
+            summary.failed += result.item[0]
+            summary.errors.append(result.error)
+    summary.elapsed = perf_counter() - started_at
+    return summary
+
+
+async def upload_qa_pairs_from_csv(
+    qa_set: str,
+    csv_path: str,
+    question_column: str = "question",
+    answer_column: str = "answer",
+    batch_size: int = QA_MAX_BATCH_PAIRS,
+    workers: int = 4,
+    retry: Optional[RetryPolicy] = None,
+    idempotency_keys: bool = False,
+) -> QAUploadSummary:
+    """Upload QA pairs from a CSV file to a specific QA set. See `arcee.api.upload_qa_pairs_from_csv`"""
+    assert 1 <= batch_size <= QA_MAX_BATCH_PAIRS, f"batch_size must be between 1 and {QA_MAX_BATCH_PAIRS}"
+    assert workers >= 1, "workers must be >= 1"
+    summary = QAUploadSummary()
+    qa_pairs = _iter_qa_pairs_csv(csv_path, question_column, answer_column, summary)
+    batches = _batch_qa_pairs(qa_pairs, max_pairs=batch_size)
+    return await _upload_qa_batches(qa_set, batches, workers, retry, summary, idempotency_keys)
+
+
+async def upload_hugging_face_dataset_qa_pairs(
+    qa_set: str,
+    hf_dataset_id: str,
+    dataset_split: str,
+    data_format: str,
+    streaming: bool = False,
+    workers: int = 4,
+    retry: Optional[RetryPolicy] = None,
+    idempotency_keys: bool = False,
+) -> QAUploadSummary:
+    """Upload QA pairs from a hugging face dataset. See `arcee.api.upload_hugging_face_dataset_qa_pairs`"""
+    assert workers >= 1, "workers must be >= 1"
+    summary = QAUploadSummary()
+    qa_pairs = _iter_hugging_face_qa_pairs(hf_dataset_id, dataset_split, data_format, streaming, summary)
+    return await _upload_qa_batches(qa_set, _batch_qa_pairs(qa_pairs), workers, retry, summary, idempotency_keys)
+
+
+async def upload_docs(
+    context: str,
+    docs: List[Dict[str, str]],
+    dedup: Optional["DocDeduplicator"] = None,
+    splitter: Optional[Splitter] = None,
+) -> Dict[str, str]:
+    """Upload a list of documents to a context. See `arcee.api.upload_docs`
+
+    Deduplication and splitting run on a worker thread, so they do not block the event loop.
+    """
+
+    def prepare() -> Optional[List[Dict[str, str]]]:
+        prepared = docs
+        if dedup is not None:
+            prepared = list(dedup.filter(prepared))
+            if not prepared:
+                return None
+        if splitter is not None:
+            prepared = list(split_docs(prepared, splitter))
+        return prepared
+
+    async with _dedup_transaction(dedup):
+        if dedup is not None or splitter is not None:
+            prepared = await _run_blocking(prepare)
+            if prepared is None:
+                return {}
+            docs = prepared
+        return await make_request("post", Route.contexts, _docs_payload(context, docs))
+
+
+@asynccontextmanager
+async def _dedup_transaction(dedup: Optional["DocDeduplicator"]) -> AsyncIterator[None]:
+    """Marks the documents `dedup` let through as sent if the upload succeeds, and forgets them if it fails. See
+    `arcee.api._dedup_transaction`"""
+    if dedup is None:
+        yield
+        return
+    try:
+        yield
+    except BaseException:
+        await _run_blocking(dedup.rollback)
+        raise
+    await _run_blocking(dedup.commit)
+
+
+async def upload_docs_batches(
+    context: str,
+    batches: Iterable[List[Dict[str, str]]],
+    workers: int = 1,
+    dedup: Optional["DocDeduplicator"] = None,
+    splitter: Optional[Splitter] = None,
+) -> List[Dict[str, str]]:
+    """Upload batches of documents to a context, one request per batch. See `arcee.api.upload_docs_batches`
+
+    Batches are read, deduplicated, split and encoded on a worker thread, one at a time, while up to `workers`
+    previous batches are sent.
+    """
+    if dedup is not None:
+        batches = (batch for batch in (list(dedup.filter(docs)) for docs in batches) if batch)
+    if splitter is not None:
+        batches = split_batches(batches, splitter)
+    compression = get_client().compression
+    bodies = (encode_body(_docs_payload(context, docs), compression) for docs in batches)
+
+    async def encoded() -> AsyncIterator[EncodedBody]:
+        while True:
+            body = await _run_blocking(next, bodies, None)
+            if body is None:
+                return
+            yield body
+
+    async def send(body: EncodedBody) -> Dict[str, str]:
+        return await make_request("post", Route.contexts, body)
+
+    responses = []
+    async with _dedup_transaction(dedup):
+        results = amap_bounded(send, encoded(), concurrency=workers)
+        try:
+            async for result in results:
+                if result.error is not None:
+                    raise result.error
+                responses.append(cast(Dict[str, str], result.result))
+        finally:
+            # Cancels the requests still in flight after a failure
+            await results.aclose()
+    return responses
+
+
+async def start_pretraining(
+    pretraining_name: str,
+    corpus: str,
+    base_model: str,
+    target_compute: Optional[str] = None,
+    capacity_id: Optional[str] = None,
+) -> Dict[str, str]:
+    """Start pretraining a model. See `arcee.api.start_pretraining`"""
+    data = {"pretraining_name": pretraining_name, "corpus_name": corpus, "base_model": base_model}
+
+    if target_compute:
+        data["target_compute"] = target_compute
+
+    if capacity_id:
+        data["capacity_id"] = capacity_id
+
+    return await make_request("post", Route.pretraining + "/startTraining", data)
+
+
+async def mergekit_yaml(
+    merging_name: str, merging_yaml_path: str, target_compute: Optional[str] = None, capacity_id: Optional[str] = None
+) -> Dict[str, str]:
+    """Start merging models from a yaml file. See `arcee.api.mergekit_yaml`"""
+    data = _mergekit_yaml_payload(merging_name, merging_yaml_path, target_compute, capacity_id)
+    return await make_request("post", Route.merging + "/start", data)
+
+
+async def mergekit_evolve(
+    merging_name: str,
+    arcee_aligned_models: Optional[List[str]] = None,
+    arcee_merged_models: Optional[List[str]] = None,
+    arcee_pretrained_models: Optional[List[str]] = None,
+    hf_models: Optional[List[str]] = None,
+    arcee_eval_qa_set_names_and_weights: Optional[List[dict]] = None,
+    general_evals_and_weights: Optional[List[dict]] = None,
+    base_model: Optional[str] = None,
+    merge_method: Optional[str] = "ties",
+    target_compute: Optional[str] = None,
+    capacity_id: Optional[str] = None,
+    time_budget_secs: int = 3600,
+) -> Dict[str, str]:
+    """Start an evolutionary merge. See `arcee.api.mergekit_evolve`"""
+    if general_evals_and_weights is None:
+        general_evals_and_weights = [
+            {"agieval_gaokao_physics": 1, "agieval_gaokao_english": 1, "agieval_logiqa_en": 1, "truthfulqa_gen": 1}
+        ]
+
+    data = {
+        "merging_name": merging_name,
+        "arcee_aligned_models": arcee_aligned_models,
+        "arcee_merged_models": arcee_merged_models,
+        "arcee_pretrained_models": arcee_pretrained_models,
+        "hf_models": hf_models,
+        "arcee_eval_qa_set_names_and_weights": arcee_eval_qa_set_names_and_weights,
+        "general_evals_and_weights": general_evals_and_weights,
+        "base_model": base_model,
+        "merge_method": merge_method,
+        "target_compute": target_compute,
+        "capacity_id": capacity_id,
+        "time_budget_secs": time_budget_secs,
+    }
+
+    return await make_request("post", Route.merging + "/start", data)
+
+
+async def merging_status(merging: str) -> Dict[str, str]:
+    """Check the status of a merging job"""
+    data = {"merging_name": merging}
+    return await make_request("get", Route.merging + "/status", data)
+
+
+async def delete_corpus(corpus_name: str) -> Dict[str, str]:
+    """Delete a corpus"""
+    data = {"corpus_name": corpus_name}
+    return await make_request("delete", Route.corpus, data)
+
+
+async def corpus_status(corpus_id: str) -> Dict[str, str]:
+    """Check the status of a corpus"""
+    return await make_request("get", Route.corpus + f"/status/{corpus_id}")
+
+
+async def start_alignment(
+    alignment_name: str,
+    qa_set: Optional[str] = None,
+    pretrained_model: Optional[str] = None,
+    merging_model: Optional[str] = None,
+    alignment_model: Optional[str] = None,
+    hf_model: Optional[str] = None,
+    target_compute: Optional[str] = None,
+    capacity_id: Optional[str] = None,
+    alignment_type: str = "sft",
+    full_or_peft: Optional[str] = "full",
+) -> Dict[str, str]:
+    """Start the alignment of a model. See `arcee.api.start_alignment`"""
+    if alignment_type == "sft" and qa_set is None:
+        raise ValueError("qa_set is required when alignment_type is 'sft'")
+
+    data = {
+        "alignment_name": alignment_name,
+        "qa_set_name": qa_set,
+        "pretrained_model": pretrained_model,
+        "merging_model": merging_model,
+        "alignment_model": alignment_model,
+        "full_or_peft": full_or_peft,
+        "hf_model": hf_model,
+        "target_compute": target_compute,
+        "capacity_id": capacity_id,
+        "alignment_type": alignment_type,
+    }
+
+    return await make_request("post", Route.alignment + "/startAlignment", data)
+
+
+async def alignment_status(alignment: str) -> Dict[str, str]:
+    """Check the status of an alignment job"""
+    data = {"alignment_name": alignment}
+    return await make_request("get", Route.alignment + "/status", data)
+
+
+async def upload_alignment(
+    alignment_name: str, alignment_id: str, qa_set_id: str, pretraining_id: str
+) -> Dict[str, str]:
+    data = {
+        "alignment_name": alignment_name,
+        "alignment_id": alignment_id,
+        "qa_set_id": qa_set_id,
+        "pretraining_id": pretraining_id,
+    }
+    return await make_request("post", Route.alignment + "/uploadAlignment", data)
+
+
+async def start_retriever_training(name: str, context: str) -> None:
+    data = {"name": name, "context": context}
+    await make_request("post", Route.train_model, data)
+    org = await get_current_org()
+    status_url = f"{config.ARCEE_APP_URL}/{org}/models/{name}/training"
+    print(f'Retriever model training started - view model status at {status_url} \
+          or with arcee.get_retriever_status("{name}")')
+
+
+async def get_retriever_status(id_or_name: str) -> Dict[str, str]:
+    """Gets the status of a retriever training job"""
+    return await check_model_status(id_or_name)
+
+
+async def start_deployment(
+    deployment_name: str,
+    alignment: Optional[str] = None,
+    merging: Optional[str] = None,
+    pretraining: Optional[str] = None,
+    retriever: Optional[str] = None,
+    target_instance: Optional[str] = None,
+    openai_compatability: Optional[bool] = False,
+) -> Dict[str, str]:
+    data = {
+        "deployment_name": deployment_name,
+        "alignment_name": alignment,
+        "merging_name": merging,
+        "pretraining_name": pretraining,
+        "retriever_name": retriever,
+        "target_instance": target_instance,
+        "openai_compatability": openai_compatability,
+    }
+    return await make_request("post", Route.deployment + "/startDeployment", data)
+
+
+async def stop_deployment(deployment_name: str) -> Dict[str, str]:
+    data = {"deployment_name": deployment_name}
+    return await make_request("post", Route.deployment + "/stopDeployment", data)
+
+
+async def deployment_status(deployment_name: str) -> Dict[str, str]:
+    """Check the status of a deployment"""
+    data = {"deployment_name": deployment_name}
+    return await make_request("get", Route.deployment + "/status", data)
+
+
+@overload
+async def generate(
+    deployment_name: str,
+    query: str | None = None,
+    messages: List[Dict[str, str]] | None = None,
+    repetition_penalty: float | None = None,
+    top_k: int | None = None,
+    max_new_tokens: int | None = None,
+    temperature: float | None = None,
+    top_p: float | None = None,
+    stream: Literal[False] = False,
+) -> Dict[str, str]: ...
+
+
+@overload
+async def generate(
+    deployment_name: str,
+    query: str | None = None,
+    messages: List[Dict[str, str]] | None = None,
+    repetition_penalty: float | None = None,
+    top_k: int | None = None,
+    max_new_tokens: int | None = None,
+    temperature: float | None = None,
+    top_p: float | None = None,
+    *,
+    stream: Literal[True],
+) -> AsyncTokenStream: ...
+
+
+async def generate(
+    deployment_name: str,
+    query: str | None = None,
+    messages: List[Dict[str, str]] | None = None,
+    repetition_penalty: float | None = None,
+    top_k: int | None = None,
+    max_new_tokens: int | None = None,
+    temperature: float | None = None,
+    top_p: float | None = None,
+    stream: bool = False,
+) -> Union[Dict[str, str], AsyncTokenStream]:
+    """Generate a completion with a deployment, or an `AsyncTokenStream` of it with `stream=True`"""
+    data = {
+        "deployment_name": deployment_name,
+        "query": query,
+        "repetition_penalty": repetition_penalty,
+        "top_k": top_k,
+        "max_new_tokens": max_new_tokens,
+        "temperature": temperature,
+        "messages": messages,
+        "top_p": top_p,
+    }
+    if stream:
+        started_at = perf_counter()
+        data["stream"] = True
+        response = await nonjson_request(
+            "post", Route.deployment + "/generate", data, headers={"Accept": SSE_CONTENT_TYPE}, stream=True
+        )
+        return AsyncTokenStream(response, started_at)
+    return await make_request("post", Route.deployment + "/generate", data)
+
+
+async def retrieve(deployment_name: str, query: str, size: Optional[int] = 5, use_cache: bool = True) -> Dict[str, str]:
+    """Retrieve contexts for a query, through the client `ResponseCache` if any. See `arcee.api.retrieve`"""
+    cache = get_client().cache if use_cache else None
+    key = ("retrieve", deployment_name, query, size)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    data = {"deployment_name": deployment_name, "query": query, "size": size}
+    response = await make_request("post", Route.deployment + "/retrieve", data)
+    if cache is not None:
+        cache.set(key, response)
+    return response
+
+
+async def embed(
+    deployment_name: str, query: str, use_cache: bool = True, store: Optional["EmbeddingStore"] = None
+) -> Dict[str, Any]:
+    """Embed a query, through the client `ResponseCache` or an `EmbeddingStore` if any. See `arcee.api.embed`"""
+    if store is not None:
+        from arcee.embedding_store import embedding_from_response
+
+        # The store reads and writes SQLite and memory-mapped files, which would block the event loop
+        stored = await _run_blocking(store.get, deployment_name, query)
+        if stored is not None:
+            return {"embedding": stored.tolist()}
+        vector = embedding_from_response(await embed(deployment_name, query, use_cache=use_cache))
+        await _run_blocking(store.put, deployment_name, query, vector)
+        return {"embedding": vector}
+
+    cache = get_client().cache if use_cache else None
+    key = ("embed", deployment_name, query)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    data = {"deployment_name": deployment_name, "query": query}
+    response = await make_request("post", Route.deployment + "/embed", data)
+    if cache is not None:
+        cache.set(key, response)
+    return response
+
+
+def generate_many(
+    deployment_name: str,
+    queries: Union[Iterable[Union[str, List[Dict[str, str]]]], AsyncIterable[Union[str, List[Dict[str, str]]]]],
+    concurrency: int = 64,
+    **kwargs: Any,
+) -> AsyncIterator[BatchResult]:
+    """
+    Generate completions for many queries, with at most `concurrency` requests in flight.
+
+    Use as `async for result in generate_many(...)`. Results come in input order, and a failed query yields a
+    `BatchResult` carrying its `error`. Each query is a query string or a list of chat messages, and the keyword
+    arguments are passed to `generate`. See `arcee.api.generate_many`
+    """
+
+    async def generate_one(query_or_messages: Union[str, List[Dict[str, str]]]) -> Dict[str, str]:
+        if isinstance(query_or_messages, str):
+            return await generate(deployment_name, query=query_or_messages, **kwargs)
+        return await generate(deployment_name, messages=query_or_messages, **kwargs)
+
+    return amap_bounded(generate_one, queries, concurrency)
+
+
+def retrieve_many(
+    deployment_name: str,
+    queries: Union[Iterable[str], AsyncIterable[str]],
+    size: Optional[int] = 5,
+    concurrency: int = 64,
+) -> AsyncIterator[BatchResult]:
+    """Retrieve for many queries, with at most `concurrency` requests in flight. See `generate_many`"""
+    return amap_bounded(lambda query: retrieve(deployment_name, query, size), queries, concurrency)
+
+
+def embed_many(
+    deployment_name: str,
+    queries: Union[Iterable[str], AsyncIterable[str]],
+    concurrency: int = 64,
+    store: Optional["EmbeddingStore"] = None,
+) -> AsyncIterator[BatchResult]:
+    """Embed many queries, with at most `concurrency` requests in flight. See `arcee.api.embed_many`"""
+    return amap_bounded(lambda query: embed(deployment_name, query, store=store), queries, concurrency)
+
+
+async def get_current_org() -> str:
+    return (await make_request("get", Route.identity))["org"]
+
+
+async def list_pretrainings() -> List[Dict[str, str]]:
+    return cast(List[Dict[str, str]], await make_request("get", Route.pretraining + "/"))
+
+
+async def download_weights(
+    type: model_weight_types, id_or_name: str, headers: Optional[Dict[str, str]] = None
+) -> ClientResponse:
+    """
+    Download the weights of a trained model on the Arcee platform. See `arcee.api.download_weights`
+
+    The returned response is unread; release it once done, e.g.
+    `async with await download_weights(...) as response:`
+    """
+    route = type_to_weights_route[type].format(id_or_name=id_or_name)
+    return await nonjson_request("get", route, headers=headers, stream=True)
@@ -0,0 +1,150 @@
+import asyncio
+import weakref
+from importlib.util import find_spec
+from typing import Any, Dict, Literal, Optional, Union
+
+if not find_spec("aiohttp"):
+    raise ModuleNotFoundError(
+        "Cannot find aiohttp. Please run `pip install --upgrade 'arcee-py[async]'` for asyncio support"
+    )
+
+import aiohttp
+
+from arcee import config
+from arcee.client import OK_STATUSES, ArceeAPIError, get_client
+from arcee.compression import EncodedBody, encode_body
+from arcee.retry import RetryPolicy
+from arcee.schemas.routes import Route
+
+# Default maximum number of simultaneous connections per event loop (0 means unlimited)
+POOL_LIMIT = 100
+# Seconds an idle keep-alive connection is kept in the pool
+KEEPALIVE_TIMEOUT = 30.0
+
+# aiohttp sessions are bound to the event loop they were created on, so we keep one pooled session per loop
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+default_headers = {
+    "Content-Type": "application/json",
+}
+
+
+def get_session(limit: Optional[int] = None) -> aiohttp.ClientSession:
+    """Returns the pooled session of the running event loop, creating it on first use
+
+    The pool of a new session holds up to `limit` simultaneous connections, `POOL_LIMIT` by default (0 means
+    unlimited). Call this with a `limit` before any request to size the pool, e.g. `arcee.aio.get_session(limit=256)`.
+    To resize the pool of an existing session, `close()` it first.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT if limit is None else limit, keepalive_timeout=KEEPALIVE_TIMEOUT
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+    elif limit is not None and session.connector is not None and session.connector.limit != limit:
+        raise ValueError(f"The session already has a pool of {session.connector.limit} connections, close() it first")
+    return session
+
+
+async def close() -> None:
+    """Closes the pooled session of the running event loop and its connections"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+def _params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # requests silently drops None query params, aiohttp rejects them
+    return {k: v for k, v in params.items() if v is not None} if params else None
+
+
+async def _send(
+    method: str,
+    route: Union[str, Route],
+    body: Union[Dict[str, Any], EncodedBody, None],
+    params: Optional[Dict[str, Any]],
+    headers: Dict[str, Any],
+    retry: Optional[RetryPolicy] = None,
+) -> aiohttp.ClientResponse:
+    """Sends the request, retrying per the retry policy, and returns the unread successful response"""
+    config.check_for_changes()
+    client = get_client()
+    retry = retry or client.retry
+    request_headers = {**client.headers, **headers}
+    timeout = aiohttp.ClientTimeout(sock_read=client.timeout)
+    if isinstance(body, dict) and client.compression is not None:
+        # Compressing large bodies would block the event loop (asyncio.to_thread needs Python 3.9)
+        body = await asyncio.get_running_loop().run_in_executor(None, encode_body, body, client.compression)
+    if isinstance(body, EncodedBody):
+        payload: Dict[str, Any] = {"data": body.data}
+        request_headers.update(body.headers)
+    else:
+        payload = {"json": body}
+
+    attempt = 0
+    previous_error: Optional[Exception] = None
+    while True:
+        attempt += 1
+        try:
+            response = await get_session().request(
+                method.upper(),
+                client.url(route),
+                params=_params(params),
+                headers=request_headers,
+                timeout=timeout,
+                **payload,
+            )
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if not retry.should_retry(attempt, method, headers):
+                raise
+            previous_error = e
+            await asyncio.sleep(retry.backoff(attempt))
+            continue
+
+        if response.status in OK_STATUSES:
+            return response
+
+        error = ArceeAPIError(response.status, await response.text())
+        response.release()
+        if not retry.should_retry(attempt, method, headers, response.status):
+            raise error from previous_error
+        previous_error = error
+        await asyncio.sleep(retry.backoff(attempt, response.headers.get("Retry-After")))
+
+
+async def make_request(
+    method: Literal["get", "post", "put", "patch", "delete", "head"],
+    route: Union[str, Route],
+    body: Union[Dict[str, Any], EncodedBody, None] = None,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, Any]] = None,
+    retry: Optional[RetryPolicy] = None,
+) -> Dict[str, str]:
+    """Makes the request with the settings and retry policy of the current `ArceeClient`"""
+    request_headers = {**default_headers, **(headers or {})}
+    async with await _send(method, route, body, params, request_headers, retry=retry) as response:
+        return await response.json(content_type=None)
+
+
+async def nonjson_request(
+    method: Literal["get", "post", "put", "patch", "delete", "head"],
+    route: Union[str, Route],
+    body: Union[Dict[str, Any], EncodedBody, None] = None,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, Any]] = None,
+    stream: Optional[bool] = False,
+    retry: Optional[RetryPolicy] = None,
+) -> aiohttp.ClientResponse:
+    """Makes the request with the settings and retry policy of the current `ArceeClient`
+
+    With stream=True the body is left unread and the caller must release the response,
+    e.g. `async with await nonjson_request(...) as response:`
+    """
+    response = await _send(method, route, body, params, headers or {}, retry=retry)
+    if not stream:
+        await response.read()
+        response.release()
+    return response
@@ -0,0 +1,66 @@
+import asyncio
+from collections import deque
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Iterable,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from arcee.batch import BatchResult
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _aiter(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def amap_bounded(
+    func: Callable[[T], Awaitable[R]], items: Union[Iterable[T], AsyncIterable[T]], concurrency: int = 64
+) -> AsyncGenerator[BatchResult[T, R], None]:
+    """Awaits `func` for every item as tasks and yields the results in input order.
+
+    The asyncio counterpart of `arcee.batch.map_bounded`: at most `concurrency` calls are in flight, at most twice
+    as many results are buffered, and a failing item yields a `BatchResult` with its `error`.
+    """
+    assert concurrency >= 1, "concurrency must be >= 1"
+
+    async def collect(entry: Tuple[int, T, "asyncio.Task[R]"]) -> BatchResult[T, R]:
+        index, item, task = entry
+        try:
+            return BatchResult(index, item, result=await task)
+        except Exception as e:
+            return BatchResult(index, item, error=e)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    window: Deque[Tuple[int, T, "asyncio.Task[R]"]] = deque()
+    try:
+        index = 0
+        async for item in _aiter(items):
+            window.append((index, item, asyncio.ensure_future(call(item))))
+            index += 1
+            if len(window) >= 2 * concurrency:
+                yield await collect(window.popleft())
+        while window:
+            yield await collect(window.popleft())
+    finally:
+        for _, _, task in window:
+            task.cancel()
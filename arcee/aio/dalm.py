@@ -0,0 +1,110 @@
+from time import perf_counter
+from typing import Any, Dict, List, Literal, Optional, Union, overload
+
+from arcee.aio.api_handler import make_request, nonjson_request
+from arcee.aio.streaming import AsyncTokenStream
+from arcee.client import get_client
+from arcee.dalm import DALMFilter, filters_key
+from arcee.schemas.routes import Route
+from arcee.streaming import SSE_CONTENT_TYPE
+
+
+async def check_model_status(name: str) -> Dict[str, str]:
+    route = Route.train_model_status.value.format(id_or_name=name)
+    return await make_request("get", route)
+
+
+class AsyncDALM:
+    """Asyncio counterpart of `arcee.DALM`
+
+    The model status lookup is a network call, so instances are created with `await AsyncDALM.create(name)`
+    """
+
+    def __init__(self, name: str, model_id: str, status: str) -> None:
+        self.name = name
+        self.model_id = model_id
+        self.status = status
+
+        if self.status != "training_complete":
+            raise Exception("DALM model is not ready. Please wait for training to complete.")
+
+    @classmethod
+    async def create(cls, name: str) -> "AsyncDALM":
+        retriever_api_response = await check_model_status(name)
+        return cls(name, retriever_api_response["id"], retriever_api_response["status"])
+
+    async def invoke(
+        self, invocation_type: Literal["retrieve", "generate"], query: str, size: int, filters: List[Dict]
+    ) -> Dict[str, Any]:
+        route = Route.retrieve if invocation_type == "retrieve" else Route.generate
+        payload = {"model_id": self.model_id, "query": query, "size": size, "filters": filters, "id": self.model_id}
+        return await make_request("post", route, body=payload)
+
+    async def retrieve(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, use_cache: bool = True
+    ) -> Dict:
+        """Retrieve {size} contexts with your retriever for the given query
+
+        Arguments:
+            query: The question to submit to the model
+            size: The max number of context results to retrieve (can be less if filters are provided)
+            filters: Optional filters to include with the query. This will restrict which context data the model can
+                retrieve from the context dataset
+            use_cache: Whether to answer from the `ResponseCache` of the client, if it has one
+        """
+        filters = filters or []
+        cache = get_client().cache if use_cache else None
+        key = ("dalm_retrieve", self.model_id, query, size, filters_key(filters))
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        ret_filters = [DALMFilter.model_validate(f).model_dump() for f in filters]
+        response = await self.invoke("retrieve", query, size, ret_filters)
+        if cache is not None:
+            cache.set(key, response)
+        return response
+
+    @overload
+    async def generate(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, stream: Literal[False] = False
+    ) -> Dict: ...
+
+    @overload
+    async def generate(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, *, stream: Literal[True]
+    ) -> AsyncTokenStream: ...
+
+    async def generate(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, stream: bool = False
+    ) -> Union[Dict, AsyncTokenStream]:
+        """Generate a response using {size} contexts with your generator for the given query
+
+        Arguments:
+            query: The question to submit to the model
+            size: The max number of context results to retrieve (can be less if filters are provided)
+            filters: Optional filters to include with the query. This will restrict which context data the model can
+                retrieve from the context dataset
+            stream: Whether to return an `AsyncTokenStream` yielding the response tokens as they are generated
+        """
+        filters = filters or []
+        gen_filters = [DALMFilter.model_validate(f).model_dump() for f in filters]
+        if stream:
+            return await self._invoke_stream(query, size, gen_filters)
+        return await self.invoke("generate", query, size, gen_filters)
+
+    async def _invoke_stream(self, query: str, size: int, filters: List[Dict]) -> AsyncTokenStream:
+        started_at = perf_counter()
+        payload = {
+            "model_id": self.model_id,
+            "query": query,
+            "size": size,
+            "filters": filters,
+            "id": self.model_id,
+            "stream": True,
+        }
+        response = await nonjson_request(
+            "post", Route.generate, body=payload, headers={"Accept": SSE_CONTENT_TYPE}, stream=True
+        )
+        return AsyncTokenStream(response, started_at)
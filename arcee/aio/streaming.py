@@ -0,0 +1,71 @@
+import codecs
+from time import perf_counter
+from typing import Any, AsyncIterator, List, Optional
+
+import aiohttp
+
+from arcee.streaming import SSE_CONTENT_TYPE, SSEDecoder, token_from_event
+
+
+class AsyncTokenStream:
+    """Asyncio counterpart of `arcee.streaming.TokenStream`
+
+    stream = await arcee.aio.generate("my-deployment", query="...", stream=True)
+    async for token in stream:
+        print(token, end="", flush=True)
+    print(stream.time_to_first_token, stream.elapsed)
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, started_at: Optional[float] = None) -> None:
+        self.response = response
+        self.started_at = perf_counter() if started_at is None else started_at
+        self.time_to_first_token: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.tokens: List[str] = []
+
+    @property
+    def text(self) -> str:
+        """The text received so far"""
+        return "".join(self.tokens)
+
+    async def _deltas(self) -> AsyncIterator[str]:
+        if self.response.headers.get("Content-Type", "").startswith(SSE_CONTENT_TYPE):
+            decoder = SSEDecoder()
+            async for raw_line in self.response.content:
+                data = decoder.feed(raw_line.decode("utf-8").rstrip("\r\n"))
+                if data is not None:
+                    token = token_from_event(data)
+                    if token:
+                        yield token
+                if decoder.done:
+                    return
+            data = decoder.flush()
+            token = token_from_event(data) if data is not None else None
+            if token:
+                yield token
+        else:
+            text_decoder = codecs.getincrementaldecoder(self.response.charset or "utf-8")()
+            async for chunk in self.response.content.iter_any():
+                text = text_decoder.decode(chunk)
+                if text:
+                    yield text
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for token in self._deltas():
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = perf_counter() - self.started_at
+                self.tokens.append(token)
+                yield token
+        finally:
+            self.elapsed = perf_counter() - self.started_at
+            self.close()
+
+    def close(self) -> None:
+        self.response.release()
+
+    async def __aenter__(self) -> "AsyncTokenStream":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
@@ -1,16 +1,45 @@
 import csv
+import hashlib
 import os
-from typing import Any, Dict, Generator, List, Literal, Optional, Union, cast
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
 
-import yaml
-from datasets import load_dataset
 from requests import Response
 
 from arcee import config
 from arcee.api_handler import make_request, nonjson_request
-from arcee.api_helpers import _chat_ml_messages_to_qa_pair
+from arcee.batch import BatchResult, map_ahead, map_bounded
+from arcee.chunking import Splitter, split_batches, split_docs
+from arcee.client import get_client
+from arcee.compression import EncodedBody, encode_ahead, encode_body
 from arcee.dalm import check_model_status
+from arcee.retry import IDEMPOTENCY_HEADER, RetryPolicy
 from arcee.schemas.routes import Route
+from arcee.streaming import SSE_CONTENT_TYPE, TokenStream
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+    from arcee.dedup import DocDeduplicator
+    from arcee.embedding_store import EmbeddingStore
 
 
 def upload_corpus_folder(corpus: str, s3_folder_url: str, tokenizer_name: str, block_size: int) -> Dict[str, str]:
@@ -38,6 +67,14 @@ def upload_corpus_folder(corpus: str, s3_folder_url: str, tokenizer_name: str, b
     return make_request("post", Route.corpus, data)
 
 
+# The server accepts at most this many QA pairs per request
+QA_MAX_BATCH_PAIRS = 2000
+# Batches of long QA pairs are cut before reaching about this many bytes of text
+QA_MAX_BATCH_BYTES = 8 * 1024 * 1024
+# Rows of a hugging face dataset converted at a time
+HF_READ_BATCH_ROWS = 10_000
+
+
 def upload_qa_pairs(
     qa_set: str, qa_pairs: List[Dict[str, str]], question_column: str = "question", answer_column: str = "answer"
 ) -> Dict[str, str]:
@@ -51,8 +88,16 @@ def upload_qa_pairs(
     Returns:
         Dict[str, str]: The response from the make_request call.
     """
-    if len(qa_pairs) > 2000:
-        raise Exception("You can only upload 2000 QA pairs at a time")
+    data = _qa_pairs_payload(qa_set, qa_pairs, question_column, answer_column)
+    return make_request("post", Route.alignment + "/qaUpload", data)
+
+
+def _qa_pairs_payload(
+    qa_set: str, qa_pairs: List[Dict[str, str]], question_column: str, answer_column: str
+) -> Dict[str, Any]:
+    """Validates QA pairs and builds the qaUpload request body"""
+    if len(qa_pairs) > QA_MAX_BATCH_PAIRS:
+        raise Exception(f"You can only upload {QA_MAX_BATCH_PAIRS} QA pairs at a time")
 
     qa_list = []
     for qa in qa_pairs:
@@ -61,8 +106,7 @@ def upload_qa_pairs(
 
         qa_list.append({"question": qa[question_column], "answer": qa[answer_column]})
 
-    data = {"qa_set_name": qa_set, "qa_pairs": qa_list}
-    return make_request("post", Route.alignment + "/qaUpload", data)
+    return {"qa_set_name": qa_set, "qa_pairs": qa_list}
 
 
 def chunk_list(lst: List[Any], chunk_size: int) -> Generator[List[Any], Any, None]:
@@ -71,94 +115,260 @@ def chunk_list(lst: List[Any], chunk_size: int) -> Generator[List[Any], Any, Non
         yield lst[i : i + chunk_size]
 
 
+def _iter_qa_pairs_csv(
+    csv_path: str, question_column: str, answer_column: str, summary: Optional["QAUploadSummary"] = None
+) -> Iterator[Dict[str, str]]:
+    """Reads the QA pairs of a CSV file one row at a time, as {"question", "answer"} pairs
+
+    Rows too short to have a question and an answer are skipped, and counted in `summary.skipped` when a summary is
+    given.
+    """
+    with open(csv_path, "r", encoding="utf-8", newline="") as csvfile:
+        reader = csv.DictReader(csvfile)
+        columns = reader.fieldnames or []
+        if question_column not in columns or answer_column not in columns:
+            raise Exception(
+                f"Each row must have a '{question_column}' and an '{answer_column}' key."
+                + " You can override the column names using the question_column and answer_column arguments."
+            )
+        for row in reader:
+            question, answer = row[question_column], row[answer_column]
+            if question is None or answer is None:
+                # DictReader fills the missing cells of short rows with None
+                if summary is not None:
+                    summary.skipped += 1
+                continue
+            yield {"question": question, "answer": answer}
+
+
+def _batch_qa_pairs(
+    qa_pairs: Iterable[Dict[str, str]], max_pairs: int = QA_MAX_BATCH_PAIRS, max_bytes: int = QA_MAX_BATCH_BYTES
+) -> Iterator[List[Dict[str, str]]]:
+    """Groups QA pairs into batches of at most `max_pairs` pairs and about `max_bytes` of text"""
+    batch: List[Dict[str, str]] = []
+    size = 0
+    for qa in qa_pairs:
+        # Text length is a cheap estimate of the encoded size, which is only known once the batch is serialized
+        pair_size = len(qa["question"]) + len(qa["answer"]) + 32
+        if batch and (len(batch) >= max_pairs or size + pair_size > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(qa)
+        size += pair_size
+    if batch:
+        yield batch
+
+
+@dataclass
+class QAUploadSummary:
+    """The outcome of a streaming QA pairs upload
+
+    Arguments:
+        uploaded: The number of QA pairs uploaded
+        failed: The number of QA pairs in batches that failed after all retries
+        skipped: The number of rows skipped because they are not valid QA pairs
+        batches: The number of requests sent
+        elapsed: The duration of the upload in seconds
+        errors: The error of every failed batch
+    """
+
+    uploaded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    errors: List[Exception] = field(default_factory=list)
+
+    @property
+    def pairs_per_second(self) -> float:
+        return self.uploaded / self.elapsed if self.elapsed else 0.0
+
+
+def _upload_qa_batches(
+    qa_set: str,
+    batches: Iterable[List[Dict[str, str]]],
+    workers: int,
+    retry: Optional[RetryPolicy],
+    summary: Optional[QAUploadSummary] = None,
+    idempotency_keys: bool = False,
+) -> QAUploadSummary:
+    """Uploads batches of {"question", "answer"} pairs with up to `workers` requests in flight
+
+    The next batch is read and encoded while previous ones are sent. With `idempotency_keys`, every batch carries its
+    content hash as `Idempotency-Key`, which lets the retry policy re-send batches that failed with a transient error.
+    """
+    compression = get_client().compression
+    summary = summary or QAUploadSummary()
+    started_at = perf_counter()
+
+    def encode(batch: List[Dict[str, str]]) -> Tuple[int, EncodedBody]:
+        return len(batch), encode_body({"qa_set_name": qa_set, "qa_pairs": batch}, compression)
+
+    def send(encoded: Tuple[int, EncodedBody]) -> Dict[str, str]:
+        body = encoded[1]
+        headers = {IDEMPOTENCY_HEADER: hashlib.sha256(body.data).hexdigest()} if idempotency_keys else None
+        return make_request("post", Route.alignment + "/qaUpload", body, headers=headers, retry=retry)
+
+    encoded = map_ahead(encode, batches, thread_name_prefix="arcee-qa")
+    for result in map_bounded(send, encoded, concurrency=workers, max_pending=workers + 1):
+        summary.batches += 1
+        if result.error is None:
+            summary.uploaded += result.item[0]
+        else:
+            summary.failed += result.item[0]
+            summary.errors.append(result.error)
+    summary.elapsed = perf_counter() - started_at
+    return summary
+
+
 def upload_qa_pairs_from_csv(
-    qa_set: str, csv_path: str, question_column: str = "question", answer_column: str = "answer", batch_size: int = 200
-) -> None:
+    qa_set: str,
+    csv_path: str,
+    question_column: str = "question",
+    answer_column: str = "answer",
+    batch_size: int = QA_MAX_BATCH_PAIRS,
+    workers: int = 4,
+    retry: Optional[RetryPolicy] = None,
+    idempotency_keys: bool = False,
+) -> QAUploadSummary:
     """
     Upload QA pairs from a CSV file to a specific QA set.
 
+    The file is streamed: rows are read, batched and uploaded as they come, so memory use does not grow with the
+    size of the file. Batches hold up to `batch_size` pairs, and are cut earlier to keep requests to a few MB.
+
     Args:
         qa_set (str): The name of the QA set to upload to.
         csv_path (str): The path to the CSV file containing QA pairs.
         question_column (str): The name of the column containing questions in the CSV file.
         answer_column (str): The name of the column containing answers in the CSV file.
+        batch_size (int): The maximum number of QA pairs per request, at most 2000.
+        workers (int): The number of upload requests kept in flight.
+        retry (RetryPolicy): When to re-send failed batches. Defaults to the retry policy of the client.
+        idempotency_keys (bool): Send the content hash of every batch as its `Idempotency-Key`, so that batches
+            failing with a transient error are retried. A POST is otherwise only retried after a 429 response. Retried
+            batches are only uploaded once if the server deduplicates requests on the key.
 
     Returns:
-        Dict[str, str]: The response from the make_request call.
+        QAUploadSummary: The number of uploaded, failed and skipped (missing a question or an answer) pairs, the
+            elapsed time and the throughput.
     """
-    qa_pairs = []
+    assert 1 <= batch_size <= QA_MAX_BATCH_PAIRS, f"batch_size must be between 1 and {QA_MAX_BATCH_PAIRS}"
+    assert workers >= 1, "workers must be >= 1"
+    summary = QAUploadSummary()
+    qa_pairs = _iter_qa_pairs_csv(csv_path, question_column, answer_column, summary)
+    batches = _batch_qa_pairs(qa_pairs, max_pairs=batch_size)
+    return _upload_qa_batches(qa_set, batches, workers, retry, summary, idempotency_keys)
 
-    print(f"Reading QA pairs from {csv_path}...")
-    with open(csv_path, "r", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            if question_column not in row.keys() or answer_column not in row.keys():
-                raise Exception(
-                    f"Each row must have a '{question_column}' and an '{answer_column}' key."
-                    + " You can override the column names using the question_column and answer_column arguments."
-                )
-            qa_pairs.append({f"{question_column}": row[question_column], f"{answer_column}": row[answer_column]})
 
-    print(f"Total QA pairs read: {len(qa_pairs)}")
-    # Split the QA pairs into chunks and upload each chunk separately
-    for i, chunk in enumerate(chunk_list(qa_pairs, batch_size)):
-        print(f"Uploading chunk {i + 1} of {len(qa_pairs) // batch_size + 1}...")
+def _load_hugging_face_split(hf_dataset_id: str, dataset_split: str, streaming: bool) -> Any:
+    """Loads only the requested split, from a `save_to_disk` directory, local data files or the hub"""
+    path = Path(hf_dataset_id).expanduser()
+    if (path / "dataset_dict.json").is_file() or (path / "state.json").is_file():
+        from datasets import load_from_disk
+
+        # Memory-mapped Arrow files: reading batches of rows needs no network and little memory
+        dataset = load_from_disk(str(path))
+        return dataset[dataset_split] if (path / "dataset_dict.json").is_file() else dataset
+
+    from datasets import load_dataset
 
-        upload_qa_pairs(qa_set=qa_set, qa_pairs=chunk, question_column=question_column, answer_column=answer_column)
+    return load_dataset(hf_dataset_id, split=dataset_split, streaming=streaming)
 
 
-def upload_hugging_face_dataset_qa_pairs(qa_set: str, hf_dataset_id: str, dataset_split: str, data_format: str) -> None:
+def _chat_ml_qa_columns(table: "pa.Table") -> Tuple[List[str], List[str]]:
+    """Extracts the QA pairs of a batch of single turn ChatML conversations, a whole column at a time
+
+    Like `_chat_ml_messages_to_qa_pair`, rows that are not exactly a user message followed by an assistant message
+    are skipped.
+    """
+    import pyarrow.compute as pc
+
+    messages = table.column("messages")
+    messages = messages.filter(pc.equal(pc.fill_null(pc.list_value_length(messages), 0), 2))
+    question, answer = pc.list_element(messages, 0), pc.list_element(messages, 1)
+    valid = pc.fill_null(
+        pc.and_(
+            pc.equal(pc.struct_field(question, "role"), "user"), pc.equal(pc.struct_field(answer, "role"), "assistant")
+        ),
+        False,
+    )
+    questions = pc.struct_field(question, "content").filter(valid).to_pylist()
+    answers = pc.struct_field(answer, "content").filter(valid).to_pylist()
+    return questions, answers
+
+
+def _iter_hugging_face_qa_pairs(
+    hf_dataset_id: str,
+    dataset_split: str,
+    data_format: str,
+    streaming: bool = False,
+    summary: Optional["QAUploadSummary"] = None,
+) -> Iterator[Dict[str, str]]:
+    """Reads the ChatML conversations of a dataset split as QA pairs, in Arrow record batches
+
+    Invalid rows are skipped, and counted in `summary.skipped` when a summary is given.
+    """
+    if data_format != "chatml":
+        raise Exception(f"{data_format} not supported yet, only chatml is supported")
+
+    dataset = _load_hugging_face_split(hf_dataset_id, dataset_split, streaming)
+    for table in dataset.with_format("arrow").iter(batch_size=HF_READ_BATCH_ROWS):
+        questions, answers = _chat_ml_qa_columns(table)
+        if summary is not None:
+            summary.skipped += table.num_rows - len(questions)
+        for question, answer in zip(questions, answers):  # noqa: B905
+            yield {"question": question, "answer": answer}
+
+
+def upload_hugging_face_dataset_qa_pairs(
+    qa_set: str,
+    hf_dataset_id: str,
+    dataset_split: str,
+    data_format: str,
+    streaming: bool = False,
+    workers: int = 4,
+    retry: Optional[RetryPolicy] = None,
+    idempotency_keys: bool = False,
+) -> QAUploadSummary:
     """
     Upload a list of QA pairs from a hugging face dataset to a specific QA set.
 
     NOTE: you will need to set HUGGINGFACE_TOKEN in your environment to use this function.
 
+    Only the requested split is loaded, and it is read in Arrow record batches while previous batches of QA pairs are
+    uploaded, so memory use does not grow with the size of the dataset.
+
     Args:
         qa_set (str): The name of the QA set to upload to.
         hf_dataset_id (str): The HF dataset id (eg, org/dataset) that contains ChatML format in a 'messages' column.
+            Can also be a local directory: of data files, or written by `Dataset.save_to_disk`, which is read without
+            any network access.
         dataset_split (str): The name of the dataset split to use, eg, "train", "train_sft", etc..
         data_format (str): The format of the data in the dataset.
             Only "chatml" is currently supported, and it can only be single turn, not multi-turn.
+        streaming (bool): Stream the split from the hub instead of downloading and caching it first.
+        workers (int): The number of upload requests kept in flight.
+        retry (RetryPolicy): When to re-send failed batches. Defaults to the retry policy of the client.
+        idempotency_keys (bool): Send the content hash of every batch as its `Idempotency-Key`, so that batches
+            failing with a transient error are retried. A POST is otherwise only retried after a 429 response. Retried
+            batches are only uploaded once if the server deduplicates requests on the key.
 
     Returns:
-        None
+        QAUploadSummary: The number of uploaded, failed and skipped (not single turn ChatML) pairs, and the throughput.
     """
-
-    if data_format != "chatml":
-        raise Exception(f"{data_format} not supported yet, only chatml is supported")
-
-    qa_pairs = []
-
-    # Load dataset from HF
-    dataset = load_dataset(hf_dataset_id)
-
-    # Convert the split to pandas
-    df = dataset[dataset_split].to_pandas()
-
-    # Loop over all the rows in df and convert the messages into QA pairs
-    for i, row in df.iterrows():
-        try:
-            qa_pair_tuple = _chat_ml_messages_to_qa_pair(row["messages"])
-            qa_pair = {"question": qa_pair_tuple[0], "answer": qa_pair_tuple[1]}
-            qa_pairs.append(qa_pair)
-        except Exception as e:
-            print(f"Error on row {i}: {e}.  Skipping row")
-            continue
-
-    batch_size = 200
-
-    print(f"Uploading {len(qa_pairs)} QA pairs in batches of {batch_size}")
-
-    # Upload in chunks of batch_size
-    for i in range(0, len(qa_pairs), batch_size):
-        chunk = qa_pairs[i : i + batch_size]
-        print(f"Uploading {batch_size} QA pairs..")
-        upload_qa_pairs(qa_set, chunk)
-
-    print("Finished uploading QA pairs")
+    assert workers >= 1, "workers must be >= 1"
+    summary = QAUploadSummary()
+    qa_pairs = _iter_hugging_face_qa_pairs(hf_dataset_id, dataset_split, data_format, streaming, summary)
+    return _upload_qa_batches(qa_set, _batch_qa_pairs(qa_pairs), workers, retry, summary, idempotency_keys)
 
 
-def upload_docs(context: str, docs: List[Dict[str, str]]) -> Dict[str, str]:
+def upload_docs(
+    context: str,
+    docs: List[Dict[str, str]],
+    dedup: Optional["DocDeduplicator"] = None,
+    splitter: Optional[Splitter] = None,
+) -> Dict[str, str]:
     """
     Upload a list of documents to a context
 
@@ -168,20 +378,90 @@ def upload_docs(context: str, docs: List[Dict[str, str]]) -> Dict[str, str]:
 
         Any other keys in the `docs` will be assumed as metadata, and will be uploaded as such. This metadata can
             be filtered on during retrieval and generation.
+        dedup (DocDeduplicator): Opt-in deduplication. Documents already seen by `dedup`, in this call or in previous
+            uploads, are not sent and are counted in `dedup.stats`. No request is made if none are left
+        splitter (Splitter): Opt-in splitting of the documents into chunks, each uploaded as a document. Applied
+            after deduplication
+    """
+    with _dedup_transaction(dedup):
+        if dedup is not None:
+            docs = list(dedup.filter(docs))
+            if not docs:
+                return {}
+        if splitter is not None:
+            docs = list(split_docs(docs, splitter))
+        return make_request("post", Route.contexts, _docs_payload(context, docs))
+
+
+@contextmanager
+def _dedup_transaction(dedup: Optional["DocDeduplicator"]) -> Iterator[None]:
+    """Marks the documents `dedup` let through as sent if the upload succeeds, and forgets them if it fails"""
+    if dedup is None:
+        yield
+        return
+    try:
+        yield
+    except BaseException:
+        dedup.rollback()
+        raise
+    dedup.commit()
+
+
+def upload_docs_batches(
+    context: str,
+    batches: Iterable[List[Dict[str, str]]],
+    workers: int = 1,
+    dedup: Optional["DocDeduplicator"] = None,
+    splitter: Optional[Splitter] = None,
+) -> List[Dict[str, str]]:
     """
-    doc_list = []
-    for doc in docs:
-        if "doc_name" not in doc.keys() or "doc_text" not in doc.keys():
-            raise Exception("Each document must have a doc_name and doc_text key")
+    Upload batches of documents to a context, one request per batch
 
-        new_doc: Dict[str, Union[str, Dict]] = {"name": doc.pop("doc_name"), "document": doc.pop("doc_text")}
-        # Any other keys are metadata
-        if doc:
-            new_doc["meta"] = doc
-        doc_list.append(new_doc)
+    Each batch is built, serialized and compressed (per the `compression` of the client) on a worker thread while up
+    to `workers` previous batches are sent, so encoding overlaps with the network transfer.
+
+    Args:
+        context (str): The name of the context to upload to
+        batches (iterable): Lists of documents, as in `upload_docs`. Can be a generator that reads them lazily
+        workers (int): The number of upload requests kept in flight
+        dedup (DocDeduplicator): Opt-in deduplication, as in `upload_docs`. Batches left empty are not sent
+        splitter (Splitter): Opt-in splitting of the documents into chunks, as in `upload_docs`. The chunks of a batch
+            are sent together
 
-    data = {"context_name": context, "documents": doc_list}
-    return make_request("post", Route.contexts, data)
+    Returns:
+        List[Dict[str, str]]: The response to every sent batch, in order
+    """
+    if dedup is not None:
+        batches = (batch for batch in (list(dedup.filter(docs)) for docs in batches) if batch)
+    if splitter is not None:
+        batches = split_batches(batches, splitter)
+    bodies = encode_ahead((_docs_payload(context, docs) for docs in batches), get_client().compression)
+    responses = []
+    with _dedup_transaction(dedup):
+        for result in map_bounded(
+            partial(make_request, "post", Route.contexts), bodies, concurrency=workers, max_pending=workers + 1
+        ):
+            if result.error is not None:
+                raise result.error
+            responses.append(cast(Dict[str, str], result.result))
+    return responses
+
+
+def _docs_payload(context: str, docs: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Validates documents and builds the contexts request body"""
+    return {"context_name": context, "documents": [_doc_payload(doc) for doc in docs]}
+
+
+def _doc_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates a document and converts it to its contexts request form. Consumes `doc`"""
+    if "doc_name" not in doc.keys() or "doc_text" not in doc.keys():
+        raise Exception("Each document must have a doc_name and doc_text key")
+
+    new_doc: Dict[str, Union[str, Dict]] = {"name": doc.pop("doc_name"), "document": doc.pop("doc_text")}
+    # Any other keys are metadata
+    if doc:
+        new_doc["meta"] = doc
+    return new_doc
 
 
 def start_pretraining(
@@ -235,24 +515,34 @@ def mergekit_yaml(
             training.
     """
 
+    data = _mergekit_yaml_payload(merging_name, merging_yaml_path, target_compute, capacity_id)
+    return make_request("post", Route.merging + "/start", data)
+
+
+def _mergekit_yaml_payload(
+    merging_name: str, merging_yaml_path: str, target_compute: Optional[str], capacity_id: Optional[str]
+) -> Dict[str, str]:
+    """Validates and reads the merging yaml file and builds the merging request body"""
     if not merging_yaml_path.endswith(".yaml"):
         raise Exception("The merging yaml file must be a .yaml file")
 
     if not os.path.exists(merging_yaml_path):
         raise Exception(f"The merging yaml file {merging_yaml_path} does not exist")
 
+    import yaml
+
     with open(merging_yaml_path, "r") as file:
         merging_yaml = yaml.safe_load(file)
 
-        data = {"merging_name": merging_name, "best_merge_yaml": str(merging_yaml)}
+    data = {"merging_name": merging_name, "best_merge_yaml": str(merging_yaml)}
 
-        if target_compute:
-            data["target_compute"] = target_compute
+    if target_compute:
+        data["target_compute"] = target_compute
 
-        if capacity_id:
-            data["capacity_id"] = capacity_id
+    if capacity_id:
+        data["capacity_id"] = capacity_id
 
-        return make_request("post", Route.merging + "/start", data)
+    return data
 
 
 def mergekit_evolve(
@@ -418,10 +708,8 @@ def start_retriever_training(name: str, context: str) -> None:
     make_request("post", Route.train_model, data)
     org = get_current_org()
     status_url = f"{config.ARCEE_APP_URL}/{org}/models/{name}/training"
-    print(
-        f'Retriever model training started - view model status at {status_url} \
-          or with arcee.get_retriever_status("{name}")'
-    )
+    print(f'Retriever model training started - view model status at {status_url} \
+          or with arcee.get_retriever_status("{name}")')
 
 
 def get_retriever_status(id_or_name: str) -> Dict[str, str]:
@@ -468,6 +756,7 @@ def deployment_status(deployment_name: str) -> Dict[str, str]:
     return make_request("get", Route.deployment + "/status", data)
 
 
+@overload
 def generate(
     deployment_name: str,
     query: str | None = None,
@@ -477,7 +766,42 @@ def generate(
     max_new_tokens: int | None = None,
     temperature: float | None = None,
     top_p: float | None = None,
-) -> Dict[str, str]:
+    stream: Literal[False] = False,
+) -> Dict[str, str]: ...
+
+
+@overload
+def generate(
+    deployment_name: str,
+    query: str | None = None,
+    messages: List[Dict[str, str]] | None = None,
+    repetition_penalty: float | None = None,
+    top_k: int | None = None,
+    max_new_tokens: int | None = None,
+    temperature: float | None = None,
+    top_p: float | None = None,
+    *,
+    stream: Literal[True],
+) -> TokenStream: ...
+
+
+def generate(
+    deployment_name: str,
+    query: str | None = None,
+    messages: List[Dict[str, str]] | None = None,
+    repetition_penalty: float | None = None,
+    top_k: int | None = None,
+    max_new_tokens: int | None = None,
+    temperature: float | None = None,
+    top_p: float | None = None,
+    stream: bool = False,
+) -> Union[Dict[str, str], TokenStream]:
+    """
+    Generate a completion with a deployment.
+
+    With `stream=True` the completion is not awaited: a `TokenStream` is returned, which yields the token deltas
+    as the deployment produces them and records `time_to_first_token`.
+    """
     data = {
         "deployment_name": deployment_name,
         "query": query,
@@ -488,17 +812,128 @@ def generate(
         "messages": messages,
         "top_p": top_p,
     }
+    if stream:
+        started_at = perf_counter()
+        data["stream"] = True
+        response = nonjson_request(
+            "post", Route.deployment + "/generate", data, headers={"Accept": SSE_CONTENT_TYPE}, stream=True
+        )
+        return TokenStream(response, started_at)
     return make_request("post", Route.deployment + "/generate", data)
 
 
-def retrieve(deployment_name: str, query: str, size: Optional[int] = 5) -> Dict[str, str]:
+def retrieve(deployment_name: str, query: str, size: Optional[int] = 5, use_cache: bool = True) -> Dict[str, str]:
+    """
+    Retrieve the `size` best matching contexts of a deployment for a query.
+
+    If the client has a `ResponseCache`, repeated queries are answered from it unless `use_cache` is False.
+    """
+    cache = get_client().cache if use_cache else None
+    key = ("retrieve", deployment_name, query, size)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     data = {"deployment_name": deployment_name, "query": query, "size": size}
-    return make_request("post", Route.deployment + "/retrieve", data)
+    response = make_request("post", Route.deployment + "/retrieve", data)
+    if cache is not None:
+        cache.set(key, response)
+    return response
+
+
+def embed(
+    deployment_name: str, query: str, use_cache: bool = True, store: Optional["EmbeddingStore"] = None
+) -> Dict[str, Any]:
+    """
+    Embed a query with a deployment.
 
+    If the client has a `ResponseCache`, repeated queries are answered from it unless `use_cache` is False.
+
+    With a persistent `EmbeddingStore`, queries embedded before with this deployment are served from disk, new ones
+    are stored, and the response is normalized to `{"embedding": [...]}`.
+    """
+    if store is not None:
+        from arcee.embedding_store import embedding_from_response
+
+        stored = store.get(deployment_name, query)
+        if stored is not None:
+            return {"embedding": stored.tolist()}
+        vector = embedding_from_response(embed(deployment_name, query, use_cache=use_cache))
+        store.put(deployment_name, query, vector)
+        return {"embedding": vector}
+
+    cache = get_client().cache if use_cache else None
+    key = ("embed", deployment_name, query)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
-def embed(deployment_name: str, query: str) -> Dict[str, str]:
     data = {"deployment_name": deployment_name, "query": query}
-    return make_request("post", Route.deployment + "/embed", data)
+    response = make_request("post", Route.deployment + "/embed", data)
+    if cache is not None:
+        cache.set(key, response)
+    return response
+
+
+def _generate_one(deployment_name: str, query_or_messages: Union[str, List[Dict[str, str]]], **kwargs: Any) -> Any:
+    if isinstance(query_or_messages, str):
+        return generate(deployment_name, query=query_or_messages, **kwargs)
+    return generate(deployment_name, messages=query_or_messages, **kwargs)
+
+
+def generate_many(
+    deployment_name: str,
+    queries: Iterable[Union[str, List[Dict[str, str]]]],
+    concurrency: int = 8,
+    repetition_penalty: float | None = None,
+    top_k: int | None = None,
+    max_new_tokens: int | None = None,
+    temperature: float | None = None,
+    top_p: float | None = None,
+) -> Iterator[BatchResult]:
+    """
+    Generate completions for many queries, with at most `concurrency` requests in flight.
+
+    Results are yielded lazily and in input order, so `queries` can be a generator of any size. A failed query
+    yields a `BatchResult` carrying its `error` instead of aborting the batch. Keep `concurrency` at or below the
+    `pool_maxsize` of the client (10 by default) so every request reuses a pooled connection.
+
+    Args:
+        deployment_name (str): The name of the deployment to generate with.
+        queries (iterable): Queries, each either a query string or a list of chat messages.
+        concurrency (int): The maximum number of requests in flight.
+        The remaining arguments are passed to `generate` for every query.
+    """
+    generate_one = partial(
+        _generate_one,
+        deployment_name,
+        repetition_penalty=repetition_penalty,
+        top_k=top_k,
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        top_p=top_p,
+    )
+    return map_bounded(generate_one, queries, concurrency)
+
+
+def retrieve_many(
+    deployment_name: str, queries: Iterable[str], size: Optional[int] = 5, concurrency: int = 8
+) -> Iterator[BatchResult]:
+    """Retrieve for many queries, with at most `concurrency` requests in flight. See `generate_many`"""
+    return map_bounded(lambda query: retrieve(deployment_name, query, size), queries, concurrency)
+
+
+def embed_many(
+    deployment_name: str, queries: Iterable[str], concurrency: int = 8, store: Optional["EmbeddingStore"] = None
+) -> Iterator[BatchResult]:
+    """
+    Embed many queries, with at most `concurrency` requests in flight. See `generate_many`
+
+    With an `EmbeddingStore`, only queries missing from it are sent to the API. See `embed`
+    """
+    return map_bounded(lambda query: embed(deployment_name, query, store=store), queries, concurrency)
 
 
 def get_current_org() -> str:
@@ -519,13 +954,17 @@ type_to_weights_route = {
 }
 
 
-def download_weights(type: model_weight_types, id_or_name: str) -> Response:
+def download_weights(type: model_weight_types, id_or_name: str, headers: Optional[Dict[str, str]] = None) -> Response:
     """
     Download the weights of a trained model on the Arcee platform.
 
+    Returns the streamed response. To save the weights to a file over several connections, see
+    `arcee.downloads.download_weights_file`.
+
     type: The type of model to download weights for.
         Can be one of "pretraining", "alignment", "retriever", or "merging".
     id_or_name: The ID or name of the model to download weights for.
+    headers: Extra request headers, e.g. a `Range` of bytes to download.
     """
     route = type_to_weights_route[type].format(id_or_name=id_or_name)
-    return nonjson_request("get", route, stream=True)
+    return nonjson_request("get", route, headers=headers, stream=True)
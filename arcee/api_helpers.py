@@ -1,9 +1,10 @@
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
-import numpy as np
+if TYPE_CHECKING:
+    import numpy as np
 
 
-def _chat_ml_messages_to_qa_pair(messages: np.ndarray) -> Tuple[str, str]:
+def _chat_ml_messages_to_qa_pair(messages: "np.ndarray") -> Tuple[str, str]:
     """
     Helper function to convert a ChatML messages field into a QA pair.
 
@@ -0,0 +1,91 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Generic, Iterable, Iterator, Optional, Tuple, TypeVar, cast
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BatchResult(Generic[T, R]):
+    """The outcome of one item of a batch call
+
+    Arguments:
+        index: The position of the item in the input
+        item: The input item
+        result: The response for the item, if it succeeded
+        error: The exception raised for the item, if it failed
+    """
+
+    index: int
+    item: T
+    result: Optional[R] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def map_bounded(
+    func: Callable[[T], R], items: Iterable[T], concurrency: int = 8, max_pending: Optional[int] = None
+) -> Iterator[BatchResult[T, R]]:
+    """Applies `func` to every item on a thread pool and yields the results in input order.
+
+    At most `concurrency` calls are in flight and at most `max_pending` (by default twice `concurrency`) items are
+    submitted but not yet yielded, so `items` can be a lazy iterable of any length. A failing item yields a
+    `BatchResult` with its `error` instead of aborting the rest. Calls run in a copy of the caller's context, so a
+    client activated with `ArceeClient.use()` applies to them.
+    """
+    assert concurrency >= 1, "concurrency must be >= 1"
+    max_pending = 2 * concurrency if max_pending is None else max_pending
+    assert max_pending >= 1, "max_pending must be >= 1"
+
+    def collect(entry: Tuple[int, T, "Future[R]"]) -> BatchResult[T, R]:
+        index, item, future = entry
+        try:
+            return BatchResult(index, item, result=future.result())
+        except Exception as e:
+            return BatchResult(index, item, error=e)
+
+    window: Deque[Tuple[int, T, "Future[R]"]] = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="arcee-batch") as pool:
+        try:
+            for index, item in enumerate(items):
+                window.append((index, item, pool.submit(copy_context().run, func, item)))
+                if len(window) >= max_pending:
+                    yield collect(window.popleft())
+            while window:
+                yield collect(window.popleft())
+        finally:
+            # The consumer stopped early: don't run what was never asked for
+            for _, _, future in window:
+                future.cancel()
+
+
+_done = object()
+
+
+def map_ahead(func: Callable[[T], R], items: Iterable[T], thread_name_prefix: str = "arcee-ahead") -> Iterator[R]:
+    """Applies `func` to every item one step ahead on a worker thread and yields the results in order.
+
+    While the consumer handles a result, the next item is drawn from `items` and processed on the worker, so a lazy
+    producer (e.g. reading and encoding the next upload batch) overlaps with the consumer (e.g. sending the previous
+    one). At most one result is computed ahead. Runs in a copy of the caller's context, like `map_bounded`.
+    """
+    iterator = iter(items)
+
+    def next_result() -> Any:
+        item = next(iterator, _done)
+        return _done if item is _done else func(cast(T, item))
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name_prefix) as executor:
+        pending = executor.submit(copy_context().run, next_result)
+        while True:
+            result = pending.result()
+            if result is _done:
+                return
+            pending = executor.submit(copy_context().run, next_result)
+            yield result
@@ -0,0 +1,120 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Hashable, Optional, Tuple
+
+CacheKey = Tuple[Hashable, ...]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """A thread-safe, in-process LRU cache of API responses with a per-entry TTL and a total size bound
+
+    Opt in by giving one to a client, which `retrieve`, `embed` and `DALM.retrieve` then consult before calling the
+    API. Entries are keyed on (call kind, deployment name or DALM model id, query, size, normalized filters):
+
+        cache = ResponseCache(max_entries=10_000, ttl=600)
+        arcee.client.set_default_client(ArceeClient(cache=cache))
+        arcee.api.retrieve("my-deployment", "query")  # network
+        arcee.api.retrieve("my-deployment", "query")  # cache hit
+        cache.invalidate("my-deployment")  # e.g. after uploading new context
+
+    Responses are stored serialized as UTF-8 JSON, so callers can freely mutate what they get back.
+
+    Arguments:
+        max_entries: The maximum number of cached responses
+        ttl: Seconds a response stays valid. None keeps responses until they are evicted
+        max_bytes: The maximum total size in bytes of the cached responses, serialized as UTF-8 JSON. None disables
+            the bound
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 300.0, max_bytes: Optional[int] = 64 << 20):
+        assert max_entries >= 1, "max_entries must be >= 1"
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Returns the cached response for `key`, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            serialized = entry[1]
+        return json.loads(serialized)
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        """Caches `value` for `key`, evicting the least recently used entries beyond the bounds"""
+        serialized = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if self.max_bytes is not None and len(serialized) > self.max_bytes:
+            return
+        expires_at = monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, serialized)
+            self._stats.bytes += len(serialized)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._stats.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        _, serialized = self._entries.pop(key)
+        self._stats.bytes -= len(serialized)
+
+    def invalidate(self, name: Optional[str] = None) -> int:
+        """Drops the cached responses of deployment name or DALM model id `name`, or all of them if no name is given.
+
+        Returns the number of dropped entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if name is None or key[1] == name]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drops every cached response and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+                bytes=self._stats.bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
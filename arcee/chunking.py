@@ -0,0 +1,192 @@
+"""Splitting of large documents into chunks before upload"""
+
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Literal, Tuple
+
+SPLIT_MODES = ("fixed", "sentence", "paragraph")
+
+# Documents sent to a worker process at a time
+PROCESS_BATCH_DOCS = 64
+
+# Worker processes are started fresh rather than forked: the pool is created wherever the documents are pulled, often
+# on an upload thread while other threads (HTTP, file readers, the dedup store) may hold locks a forked child would
+# inherit locked
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_WORD_BREAK = re.compile(r"\s+")
+
+Span = Tuple[int, int]
+
+
+def _split_spans(text: str, pattern: "re.Pattern[str]", start: int, end: int) -> List[Span]:
+    """The non-blank ranges of text[start:end] between the matches of `pattern`"""
+    spans, position = [], start
+    for match in pattern.finditer(text, start, end):
+        if text[position : match.start()].strip():
+            spans.append((position, match.start()))
+        position = match.end()
+    if text[position:end].strip():
+        spans.append((position, end))
+    return spans
+
+
+def _fixed_spans(start: int, end: int, size: int, step: int) -> List[Span]:
+    spans = []
+    while True:
+        spans.append((start, min(start + size, end)))
+        if start + size >= end:
+            return spans
+        start += step
+
+
+@dataclass(frozen=True)
+class Splitter:
+    """How documents are split into chunks before upload
+
+        arcee.upload_docs("pubmed", docs, splitter=Splitter("paragraph", size=2000, overlap=200))
+
+    Every chunk is uploaded as a document with the name and metadata of the original document, plus its position as
+    `chunk_index` and the number of chunks as `chunk_count` metadata.
+
+    Arguments:
+        mode: "fixed" cuts the text every `size` characters. "sentence" and "paragraph" pack whole sentences or
+            paragraphs into chunks of up to `size` characters, cutting a paragraph or sentence (between words) only
+            if it is longer than a chunk on its own
+        size: The maximum number of characters of a chunk
+        overlap: The number of characters of the end of a chunk repeated at the start of the next one. With
+            "sentence" and "paragraph", whole sentences or paragraphs up to that length are repeated
+        processes: The number of worker processes splitting documents. Use several for large corpora. 0 uses one per
+            CPU, 1 splits in the calling process. The workers are spawned, so a script using several must guard its
+            entry point with `if __name__ == "__main__":`
+    """
+
+    mode: Literal["fixed", "sentence", "paragraph"] = "paragraph"
+    size: int = 2000
+    overlap: int = 0
+    processes: int = 1
+
+    def __post_init__(self) -> None:
+        if self.mode not in SPLIT_MODES:
+            raise ValueError(f"Unsupported split mode {self.mode}. Must be one of {', '.join(SPLIT_MODES)}")
+        if self.size < 1:
+            raise ValueError("size must be >= 1")
+        if not 0 <= self.overlap < self.size:
+            raise ValueError("overlap must be >= 0 and smaller than size")
+        if self.processes < 0:
+            raise ValueError("processes must be >= 0")
+
+    def _units(self, text: str) -> List[Span]:
+        """The sentences or paragraphs of the text, split into sentences, then words, where longer than a chunk"""
+        patterns = [_SENTENCE_BREAK, _WORD_BREAK]
+        if self.mode == "paragraph":
+            patterns.insert(0, _PARAGRAPH_BREAK)
+        spans = [(0, len(text))]
+        for pattern in patterns:
+            spans = [
+                unit
+                for start, end in spans
+                for unit in (_split_spans(text, pattern, start, end) if end - start > self.size else [(start, end)])
+            ]
+        return [
+            unit
+            for start, end in spans
+            for unit in (_fixed_spans(start, end, self.size, self.size) if end - start > self.size else [(start, end)])
+        ]
+
+    def split_text(self, text: str) -> List[str]:
+        """Splits a text into chunks of at most `size` characters"""
+        if len(text) <= self.size:
+            return [text]
+        if self.mode == "fixed":
+            return [text[start:end] for start, end in _fixed_spans(0, len(text), self.size, self.size - self.overlap)]
+
+        chunks: List[Span] = []
+        current: List[Span] = []
+        for unit in self._units(text):
+            if current and unit[1] - current[0][0] > self.size:
+                chunks.append((current[0][0], current[-1][1]))
+                # Start the next chunk with the last units of this one, up to `overlap` characters
+                end = current[-1][1]
+                current = [span for span in current if end - span[0] <= self.overlap]
+                if current and unit[1] - current[0][0] > self.size:
+                    current = []
+            current.append(unit)
+        if current:
+            chunks.append((current[0][0], current[-1][1]))
+        return [text[start:end] for start, end in chunks]
+
+    def split_doc(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Splits a document, in the form taken by `upload_docs`, into chunk documents"""
+        if "doc_text" not in doc:
+            # Left for `upload_docs` to reject
+            return [doc]
+        chunks = self.split_text(str(doc["doc_text"]))
+        return [
+            {**doc, "doc_text": chunk, "chunk_index": index, "chunk_count": len(chunks)}
+            for index, chunk in enumerate(chunks)
+        ]
+
+
+def _split_batch(splitter: Splitter, docs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    return [splitter.split_doc(doc) for doc in docs]
+
+
+def _batched(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _split_batches(batches: Iterable[List[Dict[str, Any]]], splitter: Splitter) -> Iterator[List[List[Dict[str, Any]]]]:
+    """Splits lists of documents, on a process pool with a bounded number of lists in flight unless processes is 1"""
+    if splitter.processes == 1:
+        for batch in batches:
+            yield _split_batch(splitter, batch)
+        return
+
+    processes = splitter.processes or os.cpu_count() or 1
+    window: Deque["Future[List[List[Dict[str, Any]]]]"] = deque()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=_MP_CONTEXT) as pool:
+        try:
+            for batch in batches:
+                window.append(pool.submit(_split_batch, splitter, batch))
+                if len(window) >= 2 * processes:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+        finally:
+            for future in window:
+                future.cancel()
+
+
+def split_groups(docs: Iterable[Dict[str, Any]], splitter: Splitter) -> Iterator[List[Dict[str, Any]]]:
+    """Yields the chunks of every document, as one list per document, in order
+
+    Documents are read lazily. With `splitter.processes` other than 1, batches of documents are split on a process
+    pool while the next ones are read.
+    """
+    for groups in _split_batches(_batched(docs, PROCESS_BATCH_DOCS), splitter):
+        yield from groups
+
+
+def split_batches(batches: Iterable[List[Dict[str, Any]]], splitter: Splitter) -> Iterator[List[Dict[str, Any]]]:
+    """Splits the documents of every list of documents, keeping one list of chunks per list"""
+    for groups in _split_batches(batches, splitter):
+        yield [chunk for chunks in groups for chunk in chunks]
+
+
+def split_docs(docs: Iterable[Dict[str, Any]], splitter: Splitter) -> Iterator[Dict[str, Any]]:
+    """Splits documents, in the form taken by `upload_docs`, into chunk documents. See `Splitter`"""
+    return (chunk for chunks in split_groups(docs, splitter) for chunk in chunks)
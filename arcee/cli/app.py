@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import Optional
 
 import typer
@@ -6,11 +7,13 @@ from rich.prompt import Prompt
 from typing_extensions import Annotated
 
 import arcee.api
+from arcee.cli.commands.cache import cache
 from arcee.cli.commands.cpt import cpt
 from arcee.cli.commands.merging import merging
 from arcee.cli.commands.retriever import retriever
 from arcee.cli.commands.sft import sft
 from arcee.cli.errors import ArceeException
+from arcee.cli.handlers.weights import WeightsDownloadHandler
 from arcee.cli.typer import ArceeTyper
 from arcee.config import ARCEE_API_KEY, ARCEE_API_URL, ARCEE_ORG, write_configuration_value
 
@@ -31,6 +34,7 @@ cli = ArceeTyper(
 ############################
 #  Subcommands
 ############################
+cli.add_typer(cache, name="cache")
 cli.add_typer(cpt, name="cpt")
 cli.add_typer(merging, name="merging")
 cli.add_typer(retriever, name="retriever")
@@ -51,6 +55,34 @@ def org() -> None:
         raise ArceeException(message=f"Error getting current org: {e}") from e
 
 
+@cli.command()
+def download(
+    manifest: Annotated[
+        Path,
+        typer.Argument(
+            help='JSON list of the models to download, e.g. [{"kind": "alignment", "name": "my-model", '
+            '"path": "models/my-model.tar.gz"}]. Add "extract": true to extract the weights into "path" instead.',
+            exists=True,
+            dir_okay=False,
+        ),
+    ],
+    concurrency: Annotated[int, typer.Option(help="The number of models downloaded at the same time.", min=1)] = 4,
+    connections: Annotated[int, typer.Option(help="The number of connections shared by all downloads.", min=1)] = 16,
+    max_speed: Annotated[
+        Optional[float], typer.Option(help="Cap the combined download speed to this many MB/s.", min=0)
+    ] = None,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            help="Link the weights from the local weights cache if they are in it, and add them to it otherwise. "
+            "See `arcee cache`"
+        ),
+    ] = False,
+) -> None:
+    """Download the weights of several models at the same time"""
+    WeightsDownloadHandler.handle_bulk_download(manifest, concurrency, connections, max_speed, cache)
+
+
 @cli.command()
 def configure(
     org: Annotated[
@@ -0,0 +1,66 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from typing_extensions import Annotated
+
+from arcee.cli.errors import ArceeException
+from arcee.cli.typer import ArceeTyper
+from arcee.weights_cache import WeightsCache
+
+console = Console()
+
+cache = ArceeTyper(help="""
+        Manage the local cache of downloaded weights, used by download commands run with --cache.
+        It is kept in ARCEE_WEIGHTS_CACHE, or ~/.cache/arcee/weights
+    """)
+
+CacheDir = Annotated[
+    Optional[Path],
+    typer.Option(
+        help="The cache directory. Defaults to ARCEE_WEIGHTS_CACHE, or ~/.cache/arcee/weights", file_okay=False
+    ),
+]
+
+
+@cache.command(name="ls")
+def list_cached_weights(directory: CacheDir = None) -> None:
+    """List the cached weights, most recently used first"""
+    try:
+        with WeightsCache(directory) as weights_cache:
+            entries = weights_cache.entries()
+            size = weights_cache.size()
+            table = Table("Kind", "Name", "Size", "SHA-256", "Last used", title=f"Weights cache {weights_cache.path}")
+        for entry in entries:
+            table.add_row(
+                entry.kind,
+                entry.name,
+                f"{entry.size / 1e9:,.2f} GB",
+                entry.sha256[:12],
+                datetime.fromtimestamp(entry.last_used).strftime("%Y-%m-%d %H:%M"),
+            )
+        table.caption = f"{len(entries)} weights, {size / 1e9:,.2f} GB"
+        console.print(table)
+    except Exception as e:
+        raise ArceeException(message=f"Error listing the weights cache: {e}") from e
+
+
+@cache.command(name="prune")
+def prune_cached_weights(
+    max_size: Annotated[
+        float, typer.Option(help="Evict the least recently used weights until the cache is at most this many GB", min=0)
+    ] = 0,
+    directory: CacheDir = None,
+) -> None:
+    """Evict the least recently used weights from the cache. Without --max-size, empties it"""
+    try:
+        with WeightsCache(directory) as weights_cache:
+            before = weights_cache.size()
+            evicted = weights_cache.prune(int(max_size * 1e9))
+            after = weights_cache.size()
+        console.print(f"Evicted {len(evicted)} weights, freeing {(before - after) / 1e9:,.2f} GB")
+    except Exception as e:
+        raise ArceeException(message=f"Error pruning the weights cache: {e}") from e
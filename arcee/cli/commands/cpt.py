@@ -74,6 +74,24 @@ def download_cpt_weights(
         Optional[Path],
         typer.Option(help="Path to download file to", file_okay=True, dir_okay=False, readable=True),
     ] = None,
+    connections: Annotated[
+        int, typer.Option(help="The number of connections byte ranges of the weights are downloaded on.", min=1)
+    ] = 8,
+    extract: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Extract the weights into this directory as they download, instead of saving the archive",
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ] = None,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            help="Link the weights from the local weights cache if they are in it, and add them to it otherwise. "
+            "See `arcee cache`"
+        ),
+    ] = False,
 ) -> None:
     """Download CPT weights"""
-    WeightsDownloadHandler.handle_weights_download("pretraining", name, out)
+    WeightsDownloadHandler.handle_weights_download("pretraining", name, out, connections, extract, cache)
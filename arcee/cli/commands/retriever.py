@@ -4,10 +4,12 @@ from typing import List, Optional
 import typer
 from typing_extensions import Annotated
 
+from arcee.chunking import Splitter
 from arcee.cli.errors import ArceeException
-from arcee.cli.handlers.upload import UploadHandler
 from arcee.cli.handlers.weights import WeightsDownloadHandler
 from arcee.cli.typer import ArceeTyper
+from arcee.client import ArceeClient
+from arcee.compression import Compression
 
 retriever = ArceeTyper(help="Manage Retrievers")
 
@@ -24,9 +26,27 @@ def download_retriever_weights(
         Optional[Path],
         typer.Option(help="Path to download file to", file_okay=True, dir_okay=False, readable=True),
     ] = None,
+    connections: Annotated[
+        int, typer.Option(help="The number of connections byte ranges of the weights are downloaded on.", min=1)
+    ] = 8,
+    extract: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Extract the weights into this directory as they download, instead of saving the archive",
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ] = None,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            help="Link the weights from the local weights cache if they are in it, and add them to it otherwise. "
+            "See `arcee cache`"
+        ),
+    ] = False,
 ) -> None:
     """Download Retriever weights"""
-    WeightsDownloadHandler.handle_weights_download("retriever", name, out)
+    WeightsDownloadHandler.handle_weights_download("retriever", name, out, connections, extract, cache)
 
 
 @retriever.command(name="upload-context", short_help="Upload document(s) to context")
@@ -53,9 +73,63 @@ def upload_context(
             dir_okay=True,
         ),
     ] = None,
+    recursive: Annotated[
+        bool, typer.Option(help="Upload the files of the subdirectories of each directory too.")
+    ] = False,
+    include: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Glob pattern of the files to upload from directories, e.g. '*.jsonl'. Repeatable."),
+    ] = None,
+    exclude: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Glob pattern of the files and directories to skip, e.g. '.git'. Repeatable."),
+    ] = None,
     chunk_size: Annotated[
         int, typer.Option(help="Specify the chunk size in megabytes (MB) to limit memory usage during file uploads.")
-    ] = 512,
+    ] = 8,
+    batch_docs: Annotated[int, typer.Option(help="The maximum number of documents uploaded per request.")] = 10_000,
+    workers: Annotated[
+        int, typer.Option(help="The number of upload requests kept in flight while the next files are read.", min=1)
+    ] = 1,
+    manifest: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Checkpoint file of the uploaded batches. Re-run with the same file to resume an interrupted upload.",
+            dir_okay=False,
+        ),
+    ] = None,
+    dedup: Annotated[
+        bool, typer.Option(help="Skip documents with the same name and text as one already uploaded.")
+    ] = False,
+    dedup_normalize: Annotated[
+        bool,
+        typer.Option(help="Deduplicate on normalized text (Unicode, case and whitespace). Implies --dedup."),
+    ] = False,
+    dedup_store: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="File persisting the uploaded documents across runs, so re-uploads only send new or changed ones. "
+            "Implies --dedup.",
+            dir_okay=False,
+        ),
+    ] = None,
+    split: Annotated[
+        Optional[str],
+        typer.Option(help="Split documents into chunks before upload: fixed, sentence or paragraph."),
+    ] = None,
+    split_size: Annotated[int, typer.Option(help="The maximum number of characters of a chunk.", min=1)] = 2000,
+    split_overlap: Annotated[
+        int, typer.Option(help="The number of characters repeated between consecutive chunks.", min=0)
+    ] = 0,
+    split_processes: Annotated[
+        int, typer.Option(help="The number of processes splitting documents. 0 uses one per CPU.", min=0)
+    ] = 1,
+    compress: Annotated[
+        Optional[str], typer.Option(help="Compress uploaded batches with gzip or zstd (needs `arcee-py[zstd]`)")
+    ] = None,
+    compression_level: Annotated[
+        Optional[int], typer.Option(help="The compression level. Defaults to 6 for gzip and 3 for zstd")
+    ] = None,
 ) -> None:
     """Upload document(s) to context. If a directory is provided, all valid files in the directory will be uploaded.
     At least one of file or directory must be provided.
@@ -67,9 +141,31 @@ def upload_context(
         name (str): Name of the context
         file (Path): Path to the file.
         directory (Path): Path to the directory.
-        chunk_size (int): The chunk size in megabytes (MB) to limit memory usage during file uploads.
+        recursive (bool): Whether to upload the files of subdirectories too
+        include (List[str]): Glob patterns of the files to upload from directories, matched against the path relative
+            to the directory or the file name
+        exclude (List[str]): Glob patterns of the files and directories to skip
+        chunk_size (int): The chunk size in megabytes (MB) to limit memory usage during file uploads. Files are
+            streamed and uploaded in requests of at most this size
+        batch_docs (int): The maximum number of documents uploaded per request
+        workers (int): The number of upload requests kept in flight. Memory use is bounded by
+            (workers + 2) x chunk size
+        manifest (Path): A local checkpoint of the uploaded batches. If the upload fails, re-running the same command
+            skips the batches that were already uploaded instead of duplicating them
         doc_name (str): The name of the column/key representing the doc name. Used for csv/jsonl
         doc_text (str): The name of the column/key representing the doc text/content. Used for csv/jsonl
+        dedup (bool): Skip documents whose name and text were already seen in this upload
+        dedup_normalize (bool): Compare normalized text, so that case and whitespace differences count as duplicates
+        dedup_store (Path): An on-disk set of the uploaded documents. Re-uploading a corpus with the same store only
+            sends the documents that are new or changed since the last successful upload
+        split (str): Split documents into chunks of at most `split_size` characters before upload. "fixed" cuts every
+            `split_size` characters, "sentence" and "paragraph" pack whole sentences or paragraphs. Each chunk is
+            uploaded as a document with `chunk_index` and `chunk_count` metadata
+        split_size (int): The maximum number of characters of a chunk
+        split_overlap (int): The number of characters of a chunk repeated at the start of the next one
+        split_processes (int): The number of processes splitting documents, for large corpora
+        compress (str): The Content-Encoding of the uploaded batches, gzip or zstd. Uncompressed if not given
+        compression_level (int): The compression level
     """
     if not file and not directory:
         raise typer.BadParameter("At least one file or directory must be provided")
@@ -83,7 +179,44 @@ def upload_context(
     file.extend(directory)
 
     try:
-        resp = UploadHandler.handle_doc_upload(name, file, chunk_size, doc_name, doc_text)
+        compression = Compression(compress, compression_level) if compress else None  # type: ignore[arg-type]
+        splitter = (
+            Splitter(split, split_size, split_overlap, split_processes) if split else None  # type: ignore[arg-type]
+        )
+    except (ValueError, ModuleNotFoundError) as e:
+        raise typer.BadParameter(str(e)) from e
+
+    try:
+        # The upload pipeline is only imported when documents are uploaded, keeping `arcee --help` fast
+        from arcee.cli.handlers.upload import UploadHandler
+        from arcee.dedup import DocDeduplicator
+
+        deduplicator = (
+            DocDeduplicator(dedup_store, normalize=dedup_normalize)
+            if dedup or dedup_normalize or dedup_store is not None
+            else None
+        )
+        try:
+            with ArceeClient(compression=compression) as client, client.use():
+                resp = UploadHandler.handle_doc_upload(
+                    name,
+                    file,
+                    chunk_size,
+                    doc_name,
+                    doc_text,
+                    max_batch_docs=batch_docs,
+                    workers=workers,
+                    manifest=manifest,
+                    dedup=deduplicator,
+                    include=include or [],
+                    exclude=exclude or [],
+                    recursive=recursive,
+                    splitter=splitter,
+                )
+        finally:
+            # Also closes the store of a failed upload, and removes the temporary file of in-memory keys
+            if deduplicator is not None:
+                deduplicator.close()
         typer.secho(resp)
     except Exception as e:
         raise ArceeException(message=f"Error uploading document(s): {e}") from e
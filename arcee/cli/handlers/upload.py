@@ -1,19 +1,15 @@
-from importlib.util import find_spec
 from pathlib import Path
-from typing import Dict, List
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence
 
 import typer
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from arcee import upload_docs
-from arcee.cli.errors import ArceeException
-from arcee.schemas.doc import Doc
-
-if not find_spec("pandas"):
-    raise ModuleNotFoundError("Cannot find pandas. Please run `pip install --upgrade 'arcee-py[cli]'` for cli support")
-
-import pandas as pd
+from arcee.chunking import Splitter
+from arcee.dedup import DocDeduplicator
+from arcee.discovery import FoundFile, discover_files
+from arcee.uploads import DEFAULT_MAX_BATCH_DOCS, DOC_FILE_EXTENSIONS, DocBatch, UploadSummary, upload_doc_files
 
 console = Console()
 
@@ -21,121 +17,138 @@ console = Console()
 class UploadHandler:
     """Upload data to Arcee platform"""
 
-    valid_context_file_extensions = {".txt", ".jsonl", ".csv"}
+    valid_context_file_extensions = DOC_FILE_EXTENSIONS
 
     one_kb = 1024
     one_mb = 1024 * one_kb
     one_gb = 1024 * one_mb
 
     @classmethod
-    def _validator(cls, paths: List[Path]) -> List[Path]:
-        """Validates file paths.
+    def _validator(cls, files: List[FoundFile]) -> List[FoundFile]:
+        """Validates files.
 
         Validations:
-            - path is a file
-            - path has a valid extension `.txt` or `.jsonl`
+            - file has a valid extension `.txt`, `.jsonl` or `.csv`
 
         Args:
-            paths List[Path]: list of paths to files.
+            files List[FoundFile]: list of files, as listed by `_handle_paths`.
 
         Returns:
-            List[Path]: Validated unique paths
+            List[FoundFile]: Validated files
 
         Raises:
-            typer.BadParameter: If any path is not a file or has an invalid extension
+            typer.BadParameter: If any file has an invalid extension
         """
-        for path in paths:
-            if not path.is_file() or path.suffix not in cls.valid_context_file_extensions:
+        for file in files:
+            if file.path.suffix not in cls.valid_context_file_extensions:
                 raise typer.BadParameter(
-                    f"{path} is not a file or has an invalid extension;"
+                    f"{file.path} is not a file or has an invalid extension;"
                     f"\nAllowed {' '.join(cls.valid_context_file_extensions)}"
                 )
 
-        return paths
+        return files
 
     @classmethod
-    def _handle_paths(cls, paths: List[Path]) -> List[Path]:
+    def _handle_paths(
+        cls,
+        paths: List[Path],
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        recursive: bool = False,
+    ) -> List[FoundFile]:
         """Process paths and spread them into constituent files if path is a directory.
 
         Args:
             paths List[Path]: list of paths.
+            include List[str]: glob patterns of the files to upload from directories
+            exclude List[str]: glob patterns of the files and directories to skip
+            recursive bool: whether to upload the files of subdirectories too
 
         Returns:
-            List[Path]: unique list of paths.
-        """
-        all_paths: List[Path] = []
-        for path in paths:
-            if not path.is_dir():
-                all_paths.append(path)  # append any path that's not a directory
-            else:
-                all_paths.extend(
-                    filter(lambda x: not x.is_dir(), path.iterdir())
-                )  # append all non directory paths of a directory
+            List[FoundFile]: unique list of files, sorted so that re-runs read files in the same order and can resume
+                from an upload manifest
 
-        return list(set(all_paths))
-
-    @classmethod
-    def _get_docs(cls, file: Path, doc_name: str, doc_text: str) -> List[Doc]:
-        if file.suffix == ".txt":
-            return [Doc(doc_name=file.name, doc_text=file.read_text())]
-        if file.suffix == ".jsonl":
-            df = pd.read_json(file.name, lines=True)
-        elif file.suffix == ".csv":
-            df = pd.read_csv(file.name)
-        else:
-            raise ValueError(f"File type not valid. Must be one of {cls.valid_context_file_extensions}")
-        if doc_name not in df.columns:
-            raise ValueError(
-                f"{doc_name} not found in data column/key. Rename column/key or use "
-                f"--doc-name in comment to specify your own"
-            )
-        if doc_text not in df.columns:
-            raise ValueError(
-                f"{doc_text} not found in data column/key. Rename column/key or use "
-                f"--doc-text in comment to specify your own"
-            )
-        return [Doc(doc_name=row.pop(doc_name), doc_text=row.pop(doc_text), meta=dict(row)) for _, row in df.iterrows()]
+        Raises:
+            typer.BadParameter: If any path is neither a file nor a directory
+        """
+        try:
+            return discover_files(paths, include=include, exclude=exclude, recursive=recursive)
+        except (OSError, ValueError) as e:
+            raise typer.BadParameter(str(e)) from e
 
     @classmethod
     def _handle_upload(
-        cls, name: str, files: List[Path], max_chunk_size: int, doc_name: str, doc_text: str
-    ) -> Dict[str, str]:
+        cls,
+        name: str,
+        files: List[FoundFile],
+        max_chunk_size: int,
+        doc_name: str,
+        doc_text: str,
+        max_batch_docs: int = DEFAULT_MAX_BATCH_DOCS,
+        workers: int = 1,
+        on_batch: Optional[Callable[[DocBatch, Dict[str, str]], None]] = None,
+        manifest: Optional[Path] = None,
+        dedup: Optional[DocDeduplicator] = None,
+        splitter: Optional[Splitter] = None,
+    ) -> UploadSummary:
         """Upload document file(s) to context
         Args:
             name str: Name of the context
-            files List[Path]: tuple of paths to valid file(s).
-            max_chunk_size int: Maximum memory, in bytes to use for uploading
+            files List[FoundFile]: valid file(s).
+            max_chunk_size int: Maximum size, in bytes, of the JSON of one upload request
+            max_batch_docs int: Maximum number of documents in one upload request
+            workers int: Number of upload requests kept in flight
+            manifest Path: Checkpoint file of the uploaded batches, to resume an interrupted upload
+            dedup DocDeduplicator: Drops documents whose content was already uploaded
+            splitter Splitter: Splits documents into chunks before upload
         """
-        docs: List[Dict[str, str]] = []
-        chunk: int = 0
-        for file in files:
-            if chunk + file.stat().st_size >= max_chunk_size:
-                if len(docs) == 0:
-                    raise ArceeException(
-                        message=f"Memory Limit Exceeded. "
-                        f"When uploading {file.name} ({file.stat().st_size/cls.one_mb} MB). "
-                        "Try increasing chunk size."
-                    )
-                upload_docs(context=name, docs=docs)
-                chunk = 0
-                docs.clear()
-            chunk += file.stat().st_size
-            file_docs = cls._get_docs(file, doc_name, doc_text)
-            file_docs_json = [doc.dict() for doc in file_docs]
-            docs.extend(file_docs_json)
-
-        return upload_docs(context=name, docs=docs)
+        # Files are streamed: the next batch is read and encoded while the previous one is being uploaded
+        return upload_doc_files(
+            name,
+            files,
+            doc_name=doc_name,
+            doc_text=doc_text,
+            max_batch_bytes=max_chunk_size,
+            max_batch_docs=max_batch_docs,
+            workers=workers,
+            on_batch=on_batch,
+            manifest=manifest,
+            dedup=dedup,
+            splitter=splitter,
+        )
 
     @classmethod
     def handle_doc_upload(
-        cls, name: str, paths: List[Path], chunk_size: int, doc_name: str, doc_text: str
+        cls,
+        name: str,
+        paths: List[Path],
+        chunk_size: int,
+        doc_name: str,
+        doc_text: str,
+        max_batch_docs: int = DEFAULT_MAX_BATCH_DOCS,
+        workers: int = 1,
+        manifest: Optional[Path] = None,
+        dedup: Optional[DocDeduplicator] = None,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        recursive: bool = False,
+        splitter: Optional[Splitter] = None,
     ) -> Dict[str, str]:
         """Handle document upload from valid paths to files and directories
 
         Args:
             name str: Name of the context.
             paths List[Path]: tuple of paths to files or directories.
-            chunk_size int: Maximum memory in megabytes (MB) to use for uploading
+            chunk_size int: Maximum size in megabytes (MB) of one upload request
+            max_batch_docs int: Maximum number of documents in one upload request
+            workers int: Number of upload requests kept in flight while the next batches are read
+            manifest Path: Checkpoint file of the uploaded batches. Re-running an interrupted upload with the same
+                manifest skips the batches that were already uploaded
+            dedup DocDeduplicator: Drops documents whose content was already seen, in this upload or in previous ones
+            include List[str]: Glob patterns of the files to upload from directories, e.g. "*.jsonl"
+            exclude List[str]: Glob patterns of the files and directories to skip
+            recursive bool: Whether to upload the files of subdirectories too
+            splitter Splitter: Splits documents into chunks, each uploaded as a document
         """
         paths_validator = cls._validator
         paths_handler = cls._handle_paths
@@ -149,18 +162,51 @@ class UploadHandler:
         ) as progress:
             # process paths
             processing = progress.add_task(description=f"Processing {len(paths)} path(s)...", total=len(paths))
-            paths = paths_handler(paths)
-            progress.update(processing, description=f"✅ Listed {len(paths)} document path(s)")
+            found = paths_handler(paths, include=include, exclude=exclude, recursive=recursive)
+            progress.update(processing, description=f"✅ Listed {len(found)} document path(s)")
 
             # validate paths
-            validating = progress.add_task(description=f"Validating {len(paths)} path(s)...", total=len(paths))
-            files = paths_validator(paths)
-            progress.update(validating, description=f"✅ Validated {len(paths)} files(s)")
+            validating = progress.add_task(description=f"Validating {len(found)} path(s)...", total=len(found))
+            files = paths_validator(found)
+            progress.update(validating, description=f"✅ Validated {len(files)} files(s)")
 
             # upload documents
-            uploading = progress.add_task(description=f"Uploading {len(paths)} document(s)...", total=len(files))
-            resp = doc_uploader(
-                name=name, files=files, max_chunk_size=chunk_size * ONE_MB, doc_name=doc_name, doc_text=doc_text
+            uploading = progress.add_task(description=f"Uploading {len(files)} file(s)...", total=None)
+            uploaded = {"batches": 0, "docs": 0, "bytes": 0}
+            started_at = perf_counter()
+
+            def on_batch(batch: DocBatch, _: Dict[str, str]) -> None:
+                uploaded["batches"] += 1
+                uploaded["docs"] += batch.docs
+                uploaded["bytes"] += batch.sent
+                elapsed = max(perf_counter() - started_at, 1e-9)
+                progress.update(
+                    uploading,
+                    description=f"Uploading {len(files)} file(s)... {uploaded['docs']} document(s) "
+                    f"in {uploaded['batches']} batch(es), {uploaded['docs'] / elapsed:,.0f} docs/s, "
+                    f"{uploaded['bytes'] / cls.one_mb / elapsed:,.2f} MB/s"
+                    + (f", {dedup.stats.duplicates} duplicate(s) skipped" if dedup is not None else ""),
+                )
+
+            summary = doc_uploader(
+                name=name,
+                files=files,
+                max_chunk_size=chunk_size * ONE_MB,
+                doc_name=doc_name,
+                doc_text=doc_text,
+                max_batch_docs=max_batch_docs,
+                workers=workers,
+                on_batch=on_batch,
+                manifest=manifest,
+                dedup=dedup,
+                splitter=splitter,
+            )
+            skipped = f", skipped {summary.skipped_docs} already uploaded" if summary.skipped_batches else ""
+            if summary.duplicates:
+                skipped += f", skipped {summary.duplicates} duplicate(s)"
+            progress.update(
+                uploading,
+                description=f"✅ Uploaded {summary.docs} document(s) from {len(files)} file(s) to context {name}"
+                + skipped,
             )
-            progress.update(uploading, description=f"✅ Uploaded {len(paths)} document(s) to context {name}")
-            return resp
+            return summary.responses[-1] if summary.responses else {}
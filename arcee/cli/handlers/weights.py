@@ -1,11 +1,23 @@
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from rich.console import Console
-from rich.progress import DownloadColumn, Progress, TimeElapsedColumn, TransferSpeedColumn
+from rich.progress import DownloadColumn, Progress, TaskID, TimeElapsedColumn, TransferSpeedColumn
+from rich.table import Table
 
-from arcee.api import download_weights, model_weight_types
+from arcee.api import model_weight_types
 from arcee.cli.errors import ArceeException
+from arcee.client import ArceeClient
+from arcee.downloads import (
+    DEFAULT_CONNECTIONS,
+    WeightsDownload,
+    download_weights_file,
+    download_weights_files,
+    extract_weights,
+    read_weights_manifest,
+)
+from arcee.weights_cache import WeightsCache
 
 console = Console()
 
@@ -14,39 +26,168 @@ class WeightsDownloadHandler:
     """Download weights from Arcee platform"""
 
     @classmethod
-    def handle_weights_download(cls, kind: model_weight_types, id_or_name: str, path: Optional[Path] = None) -> None:
+    def handle_weights_download(
+        cls,
+        kind: model_weight_types,
+        id_or_name: str,
+        path: Optional[Path] = None,
+        connections: int = DEFAULT_CONNECTIONS,
+        extract: Optional[Path] = None,
+        cache: bool = False,
+    ) -> None:
         """Download weights from Arcee platform
 
         Args:
             kind model_weight_types: Type of model weights.
             id_or_name str: Name or ID of the model.
             path Path: Path to save the weights.
+            connections int: Number of connections to download byte ranges of the weights on, if the server supports
+                ranges.
+            extract Path: Directory to extract the weights into as they download, instead of saving the archive.
+            cache bool: Whether to link the weights from the local weights cache if they are in it, and add them to it
+                otherwise.
         """
+        out = extract or path or Path.cwd() / f"{id_or_name}.tar.gz"
         try:
-            out = path or Path.cwd() / f"{id_or_name}.tar.gz"
+            if extract is not None and path is not None:
+                raise ValueError("Give either a path to save the weights to or a directory to extract them into")
             console.print(f"Downloading {kind} model weights for {id_or_name} to {out}")
 
-            with open(out, "wb") as f:
-                with download_weights(kind, id_or_name) as response:
-                    response.raise_for_status()
-                    size = int(response.headers.get("Content-Length", 0))
-
-                    with Progress(
-                        *Progress.get_default_columns(),
-                        DownloadColumn(),
-                        TimeElapsedColumn(),
-                        TransferSpeedColumn(),
-                        transient=True,
-                    ) as progress:
-                        task = progress.add_task(
-                            f"[blue]Downloading {id_or_name} weights...", total=size if size > 0 else None
-                        )
+            weights_cache = WeightsCache() if cache else None
+            try:
+                # Enough pooled connections for every range in flight
+                with ArceeClient(pool_maxsize=max(connections, 10)) as client, client.use(), Progress(
+                    *Progress.get_default_columns(),
+                    DownloadColumn(),
+                    TimeElapsedColumn(),
+                    TransferSpeedColumn(),
+                    transient=True,
+                ) as progress:
+                    task = progress.add_task(f"[blue]Downloading {id_or_name} weights...", total=None)
 
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                            progress.update(task, advance=len(chunk))
+                    def on_progress(done: int, total: Optional[int]) -> None:
+                        progress.update(task, completed=done, total=total)
 
-                        console.print(f"Downloaded {out} in {progress.get_time()} seconds")
+                    if extract is not None:
+                        summary = extract_weights(
+                            kind, id_or_name, extract, on_progress=on_progress, cache=weights_cache
+                        )
+                    else:
+                        summary = download_weights_file(
+                            kind, id_or_name, out, connections=connections, on_progress=on_progress, cache=weights_cache
+                        )
+            finally:
+                if weights_cache is not None:
+                    weights_cache.close()
+
+            if extract is not None:
+                console.print(f"Extracted {summary.files} file(s) into {out}")
+            if summary.cached:
+                console.print(f"Took {out} from the weights cache (SHA-256 {summary.sha256})")
+                return
+            console.print(
+                f"Downloaded {out} in {summary.elapsed:.1f} seconds "
+                f"({summary.bytes_per_second / 1e6:,.1f} MB/s over {summary.connections} connection(s))"
+            )
+            console.print(f"SHA-256 {summary.sha256}")
+            if summary.resumed_bytes:
+                console.print(f"Resumed an interrupted download, keeping {summary.resumed_bytes / 1e6:,.1f} MB")
         except Exception as e:
+            if out.with_name(out.name + ".progress").exists():
+                console.print("Run the same command again to resume the download")
             console.print_exception()
             raise ArceeException(message=f"Error downloading {kind} weights: {e}") from e
+
+    @classmethod
+    def handle_bulk_download(
+        cls,
+        manifest: Path,
+        concurrency: int = 4,
+        connections: int = 2 * DEFAULT_CONNECTIONS,
+        max_speed: Optional[float] = None,
+        cache: bool = False,
+    ) -> None:
+        """Download the weights of the models listed in a manifest at the same time
+
+        Args:
+            manifest Path: JSON file listing the kind, name and path of each model, see `read_weights_manifest`.
+            concurrency int: Number of models downloaded at the same time.
+            connections int: Number of connections shared by all downloads.
+            max_speed float: Combined download speed cap in MB/s.
+            cache bool: Whether to link the weights from the local weights cache if they are in it, and add them to it
+                otherwise.
+        """
+        try:
+            downloads = read_weights_manifest(manifest)
+        except Exception as e:
+            raise ArceeException(message=f"Error reading the manifest {manifest}: {e}") from e
+        console.print(f"Downloading the weights of {len(downloads)} model(s), {concurrency} at a time")
+
+        weights_cache = WeightsCache() if cache else None
+        try:
+            with ArceeClient(pool_maxsize=max(connections, 10)) as client, client.use(), Progress(
+                *Progress.get_default_columns(),
+                DownloadColumn(),
+                TimeElapsedColumn(),
+                TransferSpeedColumn(),
+                transient=True,
+            ) as progress:
+                overall = progress.add_task("[bold]All weights", total=None)
+                tasks: Dict[int, TaskID] = {}
+                sizes: Dict[int, Optional[int]] = {}
+                done: Dict[int, int] = {}
+                lock = threading.Lock()
+
+                def on_progress(item: WeightsDownload, completed: int, total: Optional[int]) -> None:
+                    key = id(item)
+                    with lock:
+                        if key not in tasks:
+                            tasks[key] = progress.add_task(f"[blue]{item.kind} {item.id_or_name}", total=total)
+                        progress.update(tasks[key], completed=completed, total=total)
+                        sizes[key], done[key] = total, completed
+                        # The overall size is known once every model has started and sent its size
+                        known = len(sizes) == len(downloads) and None not in sizes.values()
+                        progress.update(
+                            overall,
+                            completed=sum(done.values()),
+                            total=sum(size or 0 for size in sizes.values()) if known else None,
+                        )
+
+                results = download_weights_files(
+                    downloads,
+                    concurrency=concurrency,
+                    connections=connections,
+                    max_bytes_per_second=max_speed * 1e6 if max_speed else None,
+                    on_progress=on_progress,
+                    cache=weights_cache,
+                )
+        finally:
+            if weights_cache is not None:
+                weights_cache.close()
+
+        table = Table("Kind", "Name", "Path", "Result", "Size", "Time", "SHA-256", title="Weights downloads")
+        for result in results:
+            item = result.item
+            if result.ok and result.result is not None:
+                summary = result.result
+                outcome = "[green]cached" if summary.cached else "[green]downloaded"
+                if item.extract:
+                    outcome += f", {summary.files} file(s) extracted"
+                table.add_row(
+                    item.kind,
+                    item.id_or_name,
+                    str(item.path),
+                    outcome,
+                    f"{(summary.resumed_bytes + summary.bytes) / 1e6:,.1f} MB",
+                    f"{summary.elapsed:.1f} s",
+                    (summary.sha256 or "")[:12],
+                )
+            else:
+                table.add_row(item.kind, item.id_or_name, str(item.path), f"[red]failed: {result.error}", "", "", "")
+        console.print(table)
+
+        failed = [result for result in results if not result.ok]
+        if failed:
+            if any(result.item.path.with_name(result.item.path.name + ".progress").exists() for result in failed):
+                console.print("Run the same command again to resume the failed downloads")
+            raise ArceeException(message=f"Error downloading the weights of {len(failed)} of {len(results)} model(s)")
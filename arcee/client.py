@@ -0,0 +1,260 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import sleep
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Literal, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from arcee import __version__ as ARCEE_PY_VERSION
+from arcee import config
+from arcee.compression import Compression, EncodedBody, encode_body
+from arcee.retry import RetryPolicy
+from arcee.schemas.routes import Route
+
+if TYPE_CHECKING:
+    from arcee.cache import ResponseCache
+
+default_headers = {
+    "Content-Type": "application/json",
+}
+
+# Response statuses of successful requests, 206 for the byte ranges of downloads
+OK_STATUSES = frozenset({200, 201, 202, 206})
+
+
+class ArceeAPIError(Exception):
+    """The Arcee API answered a request with an error status"""
+
+    def __init__(self, status_code: int, text: str) -> None:
+        super().__init__(f"Failed to make request. Response: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class ArceeClient:
+    """A connection to the Arcee platform with its own configuration and connection pool
+
+    Every setting left as None follows the global configuration (`arcee.config`), so a bare `ArceeClient()` behaves
+    like the module-level `arcee.*` functions. Instances are safe to share across threads: requests never mutate the
+    session, and headers are built per request from the client settings.
+
+        client = ArceeClient(org="other-org", pool_maxsize=64)
+        client.make_request("get", Route.identity)
+        with client.use():
+            arcee.generate("my-deployment", query="...")  # runs through `client`
+
+    Arguments:
+        api_key: The Arcee API key. Defaults to ARCEE_API_KEY
+        org: The organization to issue requests for. Defaults to ARCEE_ORG
+        api_url: The URL of the Arcee API. Defaults to ARCEE_API_URL
+        api_version: The version of the Arcee API. Defaults to ARCEE_API_VERSION
+        pool_connections: The number of host connection pools to cache
+        pool_maxsize: The maximum number of connections kept alive per host. Set it to at least the number of threads
+            sharing the client, otherwise extra connections are opened and discarded after every request
+        pool_block: Whether threads wait for a free pooled connection instead of opening a throwaway one
+        keep_alive: Whether connections are kept open and reused between requests
+        timeout: Seconds to wait for the server to send data before giving up. Defaults to no timeout
+        retry: When to re-send requests that failed with a connection error or a transient status. Defaults to
+            retrying idempotent requests up to 3 times with jittered exponential backoff
+        cache: An opt-in `ResponseCache` consulted by `retrieve`, `embed` and `DALM.retrieve` calls through this client
+        compression: Opt-in compression of JSON request bodies, e.g. `Compression("gzip")` for bulk uploads
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        org: Optional[str] = None,
+        api_url: Optional[str] = None,
+        api_version: Optional[str] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional["ResponseCache"] = None,
+        compression: Optional[Compression] = None,
+    ) -> None:
+        self._api_key = api_key
+        self._org = org
+        self._api_url = api_url
+        self._api_version = api_version
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.compression = compression
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def api_key(self) -> str:
+        return self._api_key if self._api_key is not None else config.ARCEE_API_KEY
+
+    @property
+    def org(self) -> str:
+        return self._org if self._org is not None else config.ARCEE_ORG
+
+    @property
+    def api_url(self) -> str:
+        return self._api_url if self._api_url is not None else config.ARCEE_API_URL
+
+    @property
+    def api_version(self) -> str:
+        return self._api_version if self._api_version is not None else config.ARCEE_API_VERSION
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """The headers sent with every request of this client"""
+        headers = {
+            "User-Agent": f"arcee-py/{ARCEE_PY_VERSION}",
+            "X-Token": f"{self.api_key}",
+        }
+        if self.org != "":
+            headers["X-Arcee-Org"] = self.org
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        return headers
+
+    def url(self, route: Union[str, Route]) -> str:
+        arcee_api_url = self.api_url.rstrip("/")
+        return f"{arcee_api_url}/{self.api_version}/{route}"
+
+    def _send(
+        self,
+        method: str,
+        route: Union[str, Route],
+        body: Union[Dict[str, Any], EncodedBody, None],
+        params: Optional[Dict[str, Any]],
+        headers: Dict[str, Any],
+        stream: bool = False,
+        retry: Optional[RetryPolicy] = None,
+    ) -> requests.Response:
+        config.check_for_changes()
+        retry = retry or self.retry
+        if isinstance(body, dict) and self.compression is not None:
+            body = encode_body(body, self.compression)
+        if isinstance(body, EncodedBody):
+            request = requests.Request(
+                method.upper(),
+                self.url(route),
+                data=body.data,
+                params=params,
+                headers={**self.headers, **headers, **body.headers},
+            )
+        else:
+            request = requests.Request(
+                method.upper(), self.url(route), json=body, params=params, headers={**self.headers, **headers}
+            )
+        prepped = self.session.prepare_request(request)
+
+        attempt = 0
+        previous_error: Optional[Exception] = None
+        while True:
+            attempt += 1
+            try:
+                response = self.session.send(prepped, allow_redirects=True, stream=stream, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not retry.should_retry(attempt, method, headers):
+                    raise
+                previous_error = e
+                sleep(retry.backoff(attempt))
+                continue
+
+            if response.status_code in OK_STATUSES:
+                return response
+
+            error = ArceeAPIError(response.status_code, response.text)
+            if not retry.should_retry(attempt, method, headers, response.status_code):
+                raise error from previous_error
+            previous_error = error
+            wait = retry.backoff(attempt, response.headers.get("Retry-After"))
+            response.close()
+            sleep(wait)
+
+    def make_request(
+        self,
+        method: Literal["get", "post", "put", "patch", "delete", "head"],
+        route: Union[str, Route],
+        body: Union[Dict[str, Any], EncodedBody, None] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        retry: Optional[RetryPolicy] = None,
+    ) -> Dict[str, str]:
+        """Makes a request and returns the decoded JSON response
+
+        `body` is sent as JSON, compressed per the client `compression` if any, or as is if it was already encoded.
+        `retry` overrides the retry policy of the client for this request. POST and PATCH requests are only retried
+        when they carry an `Idempotency-Key` header.
+        """
+        request_headers = {**default_headers, **headers} if headers else default_headers
+        return self._send(method, route, body, params, request_headers, retry=retry).json()
+
+    def nonjson_request(
+        self,
+        method: Literal["get", "post", "put", "patch", "delete", "head"],
+        route: Union[str, Route],
+        body: Union[Dict[str, Any], EncodedBody, None] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        stream: Optional[bool] = False,
+        retry: Optional[RetryPolicy] = None,
+    ) -> requests.Response:
+        """Makes a request and returns the raw response. See `make_request` for `retry`"""
+        return self._send(method, route, body, params, headers or {}, stream=bool(stream), retry=retry)
+
+    @contextmanager
+    def use(self) -> Iterator["ArceeClient"]:
+        """Routes the module-level `arcee.*` functions through this client within the block.
+
+        The override is scoped to the current thread or asyncio task.
+        """
+        token = _current_client.set(self)
+        try:
+            yield self
+        finally:
+            _current_client.reset(token)
+
+    def close(self) -> None:
+        """Closes all pooled connections"""
+        self.session.close()
+
+    def __enter__(self) -> "ArceeClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+_current_client: ContextVar[Optional[ArceeClient]] = ContextVar("arcee_client", default=None)
+_default_client: Optional[ArceeClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> ArceeClient:
+    """Returns the client used by the module-level `arcee.*` functions.
+
+    That is the client activated with `ArceeClient.use()`, or else the process-wide default client.
+    """
+    client = _current_client.get()
+    if client is not None:
+        return client
+
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = ArceeClient()
+    return _default_client
+
+
+def set_default_client(client: ArceeClient) -> None:
+    """Replaces the process-wide default client, e.g. to tune its connection pool"""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
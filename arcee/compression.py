@@ -0,0 +1,80 @@
+import gzip
+import json
+from dataclasses import dataclass, field
+from functools import partial
+from importlib.util import find_spec
+from typing import Any, Dict, Iterable, Iterator, Literal, Optional, Union
+
+from arcee.batch import map_ahead
+
+ENCODINGS = ("gzip", "zstd")
+
+# Compression levels used when none is given: fast settings that still shrink text-heavy JSON several times over
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+@dataclass(frozen=True)
+class Compression:
+    """How request bodies are compressed. Give one to an `ArceeClient` to opt in
+
+        client = ArceeClient(compression=Compression("zstd", level=3))
+
+    Arguments:
+        encoding: The `Content-Encoding` of compressed bodies, "gzip" or "zstd". zstd needs the `zstandard` package
+        level: The compression level. Defaults to 6 for gzip and 3 for zstd
+        threshold: Bodies smaller than this many bytes are sent uncompressed
+    """
+
+    encoding: Literal["gzip", "zstd"] = "gzip"
+    level: Optional[int] = None
+    threshold: int = 1024
+
+    def __post_init__(self) -> None:
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported encoding {self.encoding}. Must be one of {', '.join(ENCODINGS)}")
+        if self.encoding == "zstd" and not find_spec("zstandard"):
+            raise ModuleNotFoundError(
+                "Cannot find zstandard. Please run `pip install --upgrade 'arcee-py[zstd]'` for zstd compression"
+            )
+
+    def compress(self, data: bytes) -> bytes:
+        level = DEFAULT_LEVELS[self.encoding] if self.level is None else self.level
+        if self.encoding == "zstd":
+            import zstandard
+
+            return zstandard.ZstdCompressor(level=level).compress(data)
+        # mtime=0 keeps the output deterministic, so retried requests send identical bytes
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A JSON request body serialized, and compressed if large enough, ahead of sending it"""
+
+    data: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def encode_body(body: Union[Dict[str, Any], bytes], compression: Optional[Compression] = None) -> EncodedBody:
+    """Serializes `body` to JSON, compressing it when `compression` is given and the JSON reaches its threshold
+
+    `body` can also be JSON that is already serialized, as bytes.
+    """
+    data = body if isinstance(body, bytes) else json.dumps(body, allow_nan=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if compression is not None and len(data) >= compression.threshold:
+        data = compression.compress(data)
+        headers["Content-Encoding"] = compression.encoding
+    return EncodedBody(data, headers)
+
+
+def encode_ahead(
+    bodies: Iterable[Union[Dict[str, Any], bytes]], compression: Optional[Compression] = None
+) -> Iterator[EncodedBody]:
+    """Encodes `bodies` one step ahead on a worker thread
+
+    While the caller sends a body, the next one is built (the iterable is advanced on the worker too), serialized and
+    compressed, so CPU-bound encoding overlaps with the network transfer of the previous batch. zlib and zstd release
+    the GIL while compressing.
+    """
+    return map_ahead(partial(encode_body, compression=compression), bodies, thread_name_prefix="arcee-encode")
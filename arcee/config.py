@@ -1,6 +1,10 @@
 import json
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from time import monotonic
+from typing import Dict, Optional
 
 from typer import get_app_dir
 
@@ -48,7 +52,20 @@ def write_configuration_value(key: str, value: str) -> None:
         json.dump(config, f)
 
 
-def get_conditional_configuration_variable(key: str, default: str) -> str:
+def read_configuration_file(conf_path: Path) -> Dict[str, str]:
+    """Reads the configuration file, or returns an empty configuration if there is none.
+    Args:
+        conf_path (Path): The configuration file path.
+    Returns:
+        dict: The configuration variables of the file.
+    """
+    if not os.path.exists(conf_path):
+        return {}
+    with open(conf_path) as f:
+        return json.load(f)
+
+
+def get_conditional_configuration_variable(key: str, default: str, config: Optional[Dict[str, str]] = None) -> str:
     """Retrieves the configuration variable conditionally.
         ##1. check if variable is in environment
         ##2. check if variable is in config file
@@ -56,22 +73,128 @@ def get_conditional_configuration_variable(key: str, default: str) -> str:
     Args:
         key (string): The name of the configuration variable.
         default (string): The default value of the configuration variable.
+        config (dict): The already read configuration file. Read from disk if not given.
     Returns:
         string: The value of the conditional configuration variable.
     """
-    conf_location = get_configuration_path()
-
-    if os.path.exists(conf_location):
-        with open(conf_location) as f:
-            config = json.load(f)
-    else:
-        config = {}
+    if config is None:
+        config = read_configuration_file(get_configuration_path())
 
     return (os.getenv(key) or config.get(key)) or default
 
 
-ARCEE_API_URL = get_conditional_configuration_variable("ARCEE_API_URL", "https://app.arcee.ai/api")
-ARCEE_APP_URL = get_conditional_configuration_variable("ARCEE_APP_URL", "https://app.arcee.ai")
-ARCEE_API_KEY = get_conditional_configuration_variable("ARCEE_API_KEY", "")
-ARCEE_API_VERSION = get_conditional_configuration_variable("ARCEE_API_VERSION", "v2")
-ARCEE_ORG = get_conditional_configuration_variable("ARCEE_ORG", "")
+DEFAULTS = {
+    "ARCEE_API_URL": "https://app.arcee.ai/api",
+    "ARCEE_APP_URL": "https://app.arcee.ai",
+    "ARCEE_API_KEY": "",
+    "ARCEE_API_VERSION": "v2",
+    "ARCEE_ORG": "",
+}
+
+
+@dataclass(frozen=True)
+class Configuration:
+    """A snapshot of the configuration variables, read from the environment and the configuration file"""
+
+    ARCEE_API_URL: str
+    ARCEE_APP_URL: str
+    ARCEE_API_KEY: str
+    ARCEE_API_VERSION: str
+    ARCEE_ORG: str
+    path: Path
+    mtime_ns: Optional[int]
+
+
+def _file_mtime_ns(conf_path: Path) -> Optional[int]:
+    try:
+        return os.stat(conf_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_configuration() -> Configuration:
+    """Reads the environment and the configuration file, opening the file once"""
+    conf_path = get_configuration_path()
+    mtime_ns = _file_mtime_ns(conf_path)
+    config = read_configuration_file(conf_path)
+    values = {key: get_conditional_configuration_variable(key, default, config) for key, default in DEFAULTS.items()}
+    return Configuration(**values, path=conf_path, mtime_ns=mtime_ns)
+
+
+_lock = threading.Lock()
+_loaded = load_configuration()
+_hot_reload_interval: Optional[float] = None
+_next_check = 0.0
+
+ARCEE_API_URL = _loaded.ARCEE_API_URL
+ARCEE_APP_URL = _loaded.ARCEE_APP_URL
+ARCEE_API_KEY = _loaded.ARCEE_API_KEY
+ARCEE_API_VERSION = _loaded.ARCEE_API_VERSION
+ARCEE_ORG = _loaded.ARCEE_ORG
+
+
+def get_configuration() -> Configuration:
+    """Returns the configuration as last loaded, without touching the disk"""
+    return _loaded
+
+
+def reload() -> Configuration:
+    """Re-reads the environment and the configuration file and updates the ARCEE_* variables of this module.
+
+    Clients that don't set their own api key, org or URL pick up the new values on their next request, over their
+    existing connections. Variables assigned at runtime (e.g. `arcee.config.ARCEE_API_KEY = "..."`) are kept.
+    Returns:
+        Configuration: The new configuration.
+    """
+    global _loaded
+    with _lock:
+        previous, _loaded = _loaded, load_configuration()
+        module_globals = globals()
+        for key in DEFAULTS:
+            if module_globals[key] == getattr(previous, key):
+                module_globals[key] = getattr(_loaded, key)
+        return _loaded
+
+
+def enable_hot_reload(interval: float = 1.0) -> None:
+    """Reloads the configuration when the configuration file changes, for long-running processes.
+
+    Requests check the modification time of the file at most once every `interval` seconds, so rotating an API key
+    or switching org with `arcee configure` takes effect without a restart.
+    Args:
+        interval (float): The minimum number of seconds between two checks of the configuration file.
+    """
+    global _hot_reload_interval, _next_check
+    _hot_reload_interval = interval
+    _next_check = 0.0
+
+
+def disable_hot_reload() -> None:
+    global _hot_reload_interval
+    _hot_reload_interval = None
+
+
+def check_for_changes() -> bool:
+    """Reloads the configuration if hot reload is enabled and the configuration file changed since it was loaded.
+
+    Cheap enough to call before every request: the file is only stat-ed once per hot reload interval.
+    Returns:
+        bool: Whether the configuration was reloaded.
+    """
+    global _next_check
+    interval = _hot_reload_interval
+    if interval is None:
+        return False
+    now = monotonic()
+    with _lock:
+        if now < _next_check:
+            return False
+        _next_check = now + interval
+        if _file_mtime_ns(_loaded.path) == _loaded.mtime_ns:
+            return False
+    try:
+        reload()
+    except (OSError, ValueError):
+        # e.g. the file is being rewritten: keep the current configuration and try again on the next check
+        return False
+    return True
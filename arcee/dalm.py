@@ -1,10 +1,13 @@
-from typing import Any, Dict, List, Literal, Optional
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union, overload
 
 from pydantic import BaseModel, model_validator
 from strenum import StrEnum
 
-from arcee.api_handler import make_request
+from arcee.api_handler import make_request, nonjson_request
+from arcee.client import get_client
 from arcee.schemas.routes import Route
+from arcee.streaming import SSE_CONTENT_TYPE, TokenStream
 
 
 def check_model_status(name: str) -> Dict[str, str]:
@@ -45,6 +48,19 @@ class DALMFilter(BaseModel):
         return self
 
 
+def filters_key(filters: Optional[Iterable[Union[DALMFilter, Dict[str, Any]]]]) -> Tuple[Tuple[str, str, str], ...]:
+    """Normalizes filters into a canonical, hashable key
+
+    Filters are validated like `DALM.retrieve` does, deduplicated and sorted, so the same set of filters given in
+    any order yields the same key.
+    """
+    normalized = set()
+    for f in filters or []:
+        dalm_filter = DALMFilter.model_validate(f)
+        normalized.add((dalm_filter.field_name, str(dalm_filter.filter_type), dalm_filter.value))
+    return tuple(sorted(normalized))
+
+
 class DALM:
     def __init__(self, name: str) -> None:
         self.name = name
@@ -64,7 +80,9 @@ class DALM:
         payload = {"model_id": self.model_id, "query": query, "size": size, "filters": filters, "id": self.model_id}
         return make_request("post", route, body=payload)
 
-    def retrieve(self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None) -> Dict:
+    def retrieve(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, use_cache: bool = True
+    ) -> Dict:
         """Retrieve {size} contexts with your retriever for the given query
 
         Arguments:
@@ -72,12 +90,36 @@ class DALM:
             size: The max number of context results to retrieve (can be less if filters are provided)
             filters: Optional filters to include with the query. This will restrict which context data the model can
                 retrieve from the context dataset
+            use_cache: Whether to answer from the `ResponseCache` of the client, if it has one. Entries are keyed on
+                the model id
         """
         filters = filters or []
-        ret_filters = [DALMFilter.model_validate(f).model_dump() for f in filters]
-        return self.invoke("retrieve", query, size, ret_filters)
+        cache = get_client().cache if use_cache else None
+        key = ("dalm_retrieve", self.model_id, query, size, filters_key(filters))
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
 
-    def generate(self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None) -> Dict:
+        ret_filters = [DALMFilter.model_validate(f).model_dump() for f in filters]
+        response = self.invoke("retrieve", query, size, ret_filters)
+        if cache is not None:
+            cache.set(key, response)
+        return response
+
+    @overload
+    def generate(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, stream: Literal[False] = False
+    ) -> Dict: ...
+
+    @overload
+    def generate(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, *, stream: Literal[True]
+    ) -> TokenStream: ...
+
+    def generate(
+        self, query: str, size: int = 3, filters: Optional[List[DALMFilter]] = None, stream: bool = False
+    ) -> Union[Dict, TokenStream]:
         """Generate a response using {size} contexts with your generator for the given query
 
         Arguments:
@@ -85,7 +127,25 @@ class DALM:
             size: The max number of context results to retrieve (can be less if filters are provided)
             filters: Optional filters to include with the query. This will restrict which context data the model can
                 retrieve from the context dataset
+            stream: Whether to return a `TokenStream` yielding the response tokens as they are generated
         """
         filters = filters or []
         gen_filters = [DALMFilter.model_validate(f).model_dump() for f in filters]
+        if stream:
+            return self._invoke_stream(query, size, gen_filters)
         return self.invoke("generate", query, size, gen_filters)
+
+    def _invoke_stream(self, query: str, size: int, filters: List[Dict]) -> TokenStream:
+        started_at = perf_counter()
+        payload = {
+            "model_id": self.model_id,
+            "query": query,
+            "size": size,
+            "filters": filters,
+            "id": self.model_id,
+            "stream": True,
+        }
+        response = nonjson_request(
+            "post", Route.generate, body=payload, headers={"Accept": SSE_CONTENT_TYPE}, stream=True
+        )
+        return TokenStream(response, started_at)
@@ -0,0 +1,168 @@
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Union
+
+# Pending keys are written to the on-disk set in transactions of this many keys
+SQLITE_WRITE_BATCH = 10_000
+
+# Keys held in memory, about 100 bytes each, before they move to a temporary on-disk set
+MAX_MEMORY_KEYS = 1_000_000
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFKC normalization, case folding and whitespace collapsing, so near-identical texts hash the same"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+@dataclass
+class DedupStats:
+    unique: int = 0
+    duplicates: int = 0
+
+
+class DocDeduplicator:
+    """Drops documents whose content was already seen, in this upload or in previous uploads
+
+    Documents are keyed on a 16-byte hash of (doc_name, doc_text), or of the text alone with `include_name=False`.
+    Keys live in an on-disk SQLite set when a `path` is given. Otherwise they are kept in an in-memory set, about 100
+    bytes per unique document, until there are more than `max_memory_keys` of them; they then move to a temporary
+    SQLite file, deleted on `close()`, so memory use stays bounded. The set at `path` persists, so incremental
+    re-uploads only send documents that are new or changed:
+
+        dedup = DocDeduplicator("~/.cache/arcee/pubmed.dedup")
+        arcee.upload_docs("pubmed", docs, dedup=dedup)
+        print(dedup.stats.duplicates)
+
+    Keys of the current upload are pending until `commit()` (called once an upload succeeds), and dropped by
+    `rollback()` (called when it fails), so a failed upload does not mark its documents as sent. Use one deduplicator
+    per upload at a time.
+
+    Arguments:
+        path: The file of the on-disk key set. Keys are kept in memory if not given
+        normalize: Whether to hash the normalized text (see `normalize_text`) instead of the exact text
+        include_name: Whether the document name is part of the key. Set to False to drop copies of a text stored
+            under several names
+        max_memory_keys: The number of keys kept in memory without a `path`, before they move to a temporary file
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        normalize: bool = False,
+        include_name: bool = True,
+        max_memory_keys: int = MAX_MEMORY_KEYS,
+    ) -> None:
+        self.path = Path(path).expanduser() if path is not None else None
+        self.normalize = normalize
+        self.include_name = include_name
+        self.max_memory_keys = max_memory_keys
+        self.stats = DedupStats()
+        self._lock = threading.Lock()
+        self._committed: Set[bytes] = set()
+        self._pending: Set[bytes] = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._unflushed = 0
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = self._connect(str(self.path))
+            # Keys left pending by an upload that crashed were never sent
+            self._db.execute("DELETE FROM seen WHERE committed = 0")
+            self._db.commit()
+
+    @staticmethod
+    def _connect(database: str) -> sqlite3.Connection:
+        db = sqlite3.connect(database, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY, committed INTEGER) WITHOUT ROWID")
+        return db
+
+    def _spill(self) -> None:
+        """Moves the in-memory keys to a temporary on-disk set, which SQLite deletes once closed"""
+        self._db = self._connect("")
+        self._db.executemany("INSERT INTO seen VALUES (?, 1)", ((key,) for key in self._committed))
+        self._db.executemany("INSERT INTO seen VALUES (?, 0)", ((key,) for key in self._pending))
+        self._db.commit()
+        self._committed, self._pending = set(), set()
+
+    def key(self, doc: Dict[str, Any]) -> bytes:
+        """The content key of a document, in the form taken by `upload_docs`"""
+        text = str(doc.get("doc_text", ""))
+        if self.normalize:
+            text = normalize_text(text)
+        digest = hashlib.blake2b(digest_size=16)
+        if self.include_name:
+            digest.update(str(doc.get("doc_name", "")).encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def add(self, doc: Dict[str, Any]) -> bool:
+        """Records the document as pending and returns True if its content was not seen before"""
+        key = self.key(doc)
+        with self._lock:
+            if self._db is not None:
+                new = (
+                    self._db.execute("INSERT OR IGNORE INTO seen (key, committed) VALUES (?, 0)", (key,)).rowcount == 1
+                )
+                self._unflushed += 1
+                if self._unflushed >= SQLITE_WRITE_BATCH:
+                    self._db.commit()
+                    self._unflushed = 0
+            else:
+                new = key not in self._committed and key not in self._pending
+                if new:
+                    self._pending.add(key)
+                    if len(self._committed) + len(self._pending) > self.max_memory_keys:
+                        self._spill()
+            if new:
+                self.stats.unique += 1
+            else:
+                self.stats.duplicates += 1
+            return new
+
+    def filter(self, docs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yields the documents whose content was not seen before, recording them as pending"""
+        return (doc for doc in docs if self.add(doc))
+
+    def commit(self) -> None:
+        """Marks the pending documents as sent, so later uploads skip them"""
+        with self._lock:
+            if self._db is not None:
+                self._db.execute("UPDATE seen SET committed = 1 WHERE committed = 0")
+                self._db.commit()
+                self._unflushed = 0
+            else:
+                self._committed |= self._pending
+                self._pending = set()
+
+    def rollback(self) -> None:
+        """Forgets the pending documents, e.g. because their upload failed"""
+        with self._lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM seen WHERE committed = 0")
+                self._db.commit()
+                self._unflushed = 0
+            else:
+                self._pending = set()
+
+    def __len__(self) -> int:
+        """The number of documents marked as sent"""
+        with self._lock:
+            if self._db is not None:
+                return int(self._db.execute("SELECT COUNT(*) FROM seen WHERE committed = 1").fetchone()[0])
+            return len(self._committed)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> "DocDeduplicator":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
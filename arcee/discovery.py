@@ -0,0 +1,128 @@
+"""Discovery of the files to upload under a set of files and directories"""
+
+import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, List, Sequence, Set, Tuple, Union
+
+# The device and inode numbers of a directory, to list each one once however many links lead to it
+DirectoryId = Tuple[int, int]
+
+# Directories listed concurrently. Listing is bound by filesystem latency, notably on network filesystems
+DEFAULT_DISCOVERY_WORKERS = 16
+
+
+@dataclass(frozen=True)
+class FoundFile:
+    """A file to upload, with the result of its single `stat`
+
+    Arguments:
+        path: The path of the file
+        size: The size of the file in bytes
+        mtime_ns: The modification time of the file in nanoseconds
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: Union[str, Path]) -> "FoundFile":
+        result = os.stat(path)
+        return cls(Path(path), result.st_size, result.st_mtime_ns)
+
+
+def _matches(relative: str, patterns: Sequence[str]) -> bool:
+    """Whether a path relative to its root directory, or its name, matches one of the glob patterns"""
+    name = relative.rsplit("/", 1)[-1]
+    return any(fnmatch(relative, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+
+def _scan(
+    root: str, directory: str, include: Sequence[str], exclude: Sequence[str]
+) -> Tuple[List[Tuple[str, DirectoryId]], List[FoundFile]]:
+    """Lists one directory: its subdirectories to descend into, and its files that pass the filters"""
+    subdirectories, files = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            if exclude and _matches(relative, exclude):
+                continue
+            # The file type comes from the directory listing on most filesystems, without a stat
+            if entry.is_dir():
+                result = entry.stat()
+                subdirectories.append((entry.path, (result.st_dev, result.st_ino)))
+            elif not include or _matches(relative, include):
+                result = entry.stat()
+                if stat.S_ISREG(result.st_mode):
+                    files.append(FoundFile(Path(entry.path), result.st_size, result.st_mtime_ns))
+    return subdirectories, files
+
+
+def discover_files(
+    paths: Iterable[Union[str, Path]],
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    recursive: bool = True,
+    workers: int = DEFAULT_DISCOVERY_WORKERS,
+) -> List[FoundFile]:
+    """Lists the files under `paths`, sorted by path and without duplicates
+
+    Files given directly are always listed. The files of directories are filtered by the glob patterns: a file is
+    listed if it matches one of the `include` patterns (or there are none) and none of the `exclude` patterns, which
+    also prune directories. Patterns match the path relative to the directory given, with / separators, or the file
+    name alone, e.g. "*.jsonl", "raw/*.csv" or ".git".
+
+    Every file is stat-ed once, and the result is kept in its `FoundFile`. Directories are listed concurrently on
+    `workers` threads. Symbolic links to directories are followed, but every directory is listed once, so links
+    looping back to a parent directory are not descended into again.
+
+    Args:
+        paths (list): Files and directories
+        include (list): Glob patterns of the files to list from directories
+        exclude (list): Glob patterns of the files and directories to skip
+        recursive (bool): Whether to descend into subdirectories, or only list the files directly in a directory
+        workers (int): The number of directories listed concurrently
+
+    Raises:
+        ValueError: If a path is neither a file nor a directory
+    """
+    assert workers >= 1, "workers must be >= 1"
+    found: List[FoundFile] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arcee-discovery") as pool:
+        pending: Set["Future[Tuple[List[Tuple[str, DirectoryId]], List[FoundFile]]]"] = set()
+        roots = {}
+        visited: Set[DirectoryId] = set()
+        for path in paths:
+            result = os.stat(path)
+            if stat.S_ISDIR(result.st_mode):
+                if (result.st_dev, result.st_ino) in visited:
+                    continue
+                visited.add((result.st_dev, result.st_ino))
+                future = pool.submit(_scan, str(path), str(path), include, exclude)
+                roots[future] = str(path)
+                pending.add(future)
+            elif stat.S_ISREG(result.st_mode):
+                found.append(FoundFile(Path(path), result.st_size, result.st_mtime_ns))
+            else:
+                raise ValueError(f"{path} is not a file or a directory")
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                root = roots.pop(future)
+                subdirectories, files = future.result()
+                found.extend(files)
+                for directory, directory_id in subdirectories if recursive else []:
+                    if directory_id in visited:
+                        continue
+                    visited.add(directory_id)
+                    child = pool.submit(_scan, root, directory, include, exclude)
+                    roots[child] = root
+                    pending.add(child)
+
+    unique = {file.path: file for file in found}
+    return [unique[path] for path in sorted(unique)]
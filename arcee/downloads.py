@@ -0,0 +1,861 @@
+"""Download of model weights to a file over several connections
+
+The weights archive is split into byte ranges fetched on parallel connections, each written at its offset in a file
+preallocated to the full size. Servers that do not honor `Range` requests are read over a single stream.
+
+Downloads are written to a `.part` file next to the destination, and the ranges completed so far are recorded in a
+`.progress` file. A range whose connection drops is requested again from its last received byte, and re-running an
+interrupted download only fetches the missing ranges, with `If-Range` so that a file changed on the server since is
+downloaded from the start. The `.part` file is renamed to the destination once complete.
+
+Archives can instead be extracted while they download, without writing them to disk. The SHA-256 of every file is
+computed as it downloads, checked against a `Repr-Digest` header if the server sends one, and used to keep the file
+in an optional local `WeightsCache`.
+
+Several models are downloaded at once with `download_weights_files`, sharing the connections of the client and an
+optional `BandwidthLimit`.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Full, Queue
+from time import monotonic, perf_counter, sleep
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, get_args
+
+import requests
+from requests import Response
+
+from arcee.api import download_weights, model_weight_types
+from arcee.batch import BatchResult, map_bounded
+from arcee.client import ArceeAPIError, get_client
+from arcee.retry import RetryPolicy
+
+if TYPE_CHECKING:
+    from arcee.weights_cache import WeightsCache
+
+DEFAULT_CONNECTIONS = 8
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+
+# Bytes read from the response and written to the file at a time. A dropped connection loses the chunk being read
+CHUNK_SIZE = 256 * 1024
+
+# Bytes of ranges received ahead of the ones before them kept in memory until they can be hashed. The rest of such a
+# range is read back from the `.part` file once written
+HASH_BUFFER_BYTES = 64 * 1024 * 1024
+
+# Chunks downloaded ahead of the extraction of a streamed archive
+EXTRACT_QUEUE_CHUNKS = 32
+
+# Python versions with extraction filters also apply the safe "data" filter to streamed archives
+_EXTRACT_FILTER: Dict[str, Any] = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+_REPR_DIGEST_SHA256 = re.compile(r"sha-256=:([A-Za-z0-9+/=]+):")
+
+# A range of bytes of the file, first and last byte included, as in a `Range` header
+ByteRange = Tuple[int, int]
+
+
+class IncompleteDownload(IOError):
+    """The connection was closed before the whole file or range was received"""
+
+
+# Failures after which a download goes on from the last received byte
+_RETRYABLE = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, IncompleteDownload)
+
+
+@dataclass
+class DownloadSummary:
+    """The outcome of a download
+
+    Arguments:
+        path: The file the weights were saved to, or the directory they were extracted into
+        bytes: The number of bytes downloaded
+        resumed_bytes: The number of bytes kept from an interrupted download of the same file
+        connections: The number of connections the file was downloaded on, 1 if the server does not support ranges
+        files: The number of files extracted, when the archive is extracted as it downloads
+        sha256: The SHA-256 of the file, computed as it downloads
+        cached: Whether the file was taken from the weights cache instead of downloaded
+        retries: The number of times a range or stream was requested again after a connection error
+        elapsed: Seconds the download took
+    """
+
+    path: Path
+    bytes: int = 0
+    resumed_bytes: int = 0
+    connections: int = 1
+    files: int = 0
+    sha256: Optional[str] = None
+    cached: bool = False
+    retries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+class BandwidthLimit:
+    """A token bucket capping the combined speed of the downloads it is passed to
+
+        limit = BandwidthLimit(100e6)  # 100 MB/s across all downloads
+        download_weights_file("alignment", "my-model", Path("my-model.tar.gz"), limit=limit)
+
+    Each chunk received takes its size from the bucket, which refills at `bytes_per_second` up to `burst` bytes. A
+    chunk larger than what is left borrows against the refill, and the connection that received it waits until the
+    debt is paid before reading on, which slows the sender down. Shared by downloads on several threads.
+
+    Arguments:
+        bytes_per_second: The maximum average number of bytes per second
+        burst: The number of bytes that can be received at once after an idle time. Defaults to one chunk
+    """
+
+    def __init__(self, bytes_per_second: float, burst: Optional[int] = None) -> None:
+        assert bytes_per_second > 0, "bytes_per_second must be > 0"
+        self.bytes_per_second = bytes_per_second
+        self.burst = CHUNK_SIZE if burst is None else burst
+        self._tokens = float(self.burst)
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, size: int) -> None:
+        """Takes `size` bytes from the bucket, waiting for them if it is in debt"""
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.bytes_per_second) - size
+            self._updated = now
+            wait = -self._tokens / self.bytes_per_second
+        if wait > 0:
+            sleep(wait)
+
+
+class _DownloadProgress:
+    """The ranges of a download written to its `.part` file, to resume an interrupted download
+
+    A JSON lines file, like `UploadManifest`: a header describing the file (size, range size and the validator the
+    server sent for it), then one line per range written and synced to the `.part` file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.header: Optional[Dict[str, Any]] = None
+        self.done: Set[int] = set()
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line torn by a crash: its range is downloaded again
+                        continue
+                    if self.header is None:
+                        self.header = entry
+                    else:
+                        self.done.add(entry["start"])
+
+    def start(self, header: Dict[str, Any]) -> None:
+        self.header, self.done = header, set()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+
+    def record(self, byte_range: ByteRange) -> None:
+        if self.header is None:
+            return
+        with self._lock:
+            self.done.add(byte_range[0])
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"start": byte_range[0], "end": byte_range[1]}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        self.header, self.done = None, set()
+        self.path.unlink(missing_ok=True)
+
+
+def _byte_ranges(start: int, size: int, part_size: int) -> List[ByteRange]:
+    return [(offset, min(offset + part_size, size) - 1) for offset in range(start, size, part_size)]
+
+
+def _content_range(response: Response) -> Optional[Tuple[int, int, int]]:
+    """The first byte, last byte and total size of a partial response, or None if the response is the whole file"""
+    if response.status_code != 206:
+        return None
+    match = _CONTENT_RANGE.fullmatch(response.headers.get("Content-Range", "").strip())
+    if match is None:
+        return None
+    first, last, total = (int(group) for group in match.groups())
+    return first, last, total
+
+
+def _validator(response: Response) -> Optional[str]:
+    """The strong ETag, or else the Last-Modified date, of the file, as sent in `If-Range`"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _expected_sha256(response: Response) -> Optional[str]:
+    """The SHA-256 of the file, as a hex string, if the server sent it in a `Repr-Digest` header"""
+    match = _REPR_DIGEST_SHA256.search(response.headers.get("Repr-Digest", ""))
+    return base64.b64decode(match.group(1)).hex() if match else None
+
+
+class _RangeHasher:
+    """The SHA-256 of a file written in ranges out of order, computed as the ranges download
+
+    A chunk is hashed as it arrives if every byte before it is hashed. The chunks of ranges further on are kept in
+    memory, up to `buffer_bytes` in all, and hashed once the bytes before them are. The rest of a range that does not
+    fit is read back from the file once the range is written, and so are the ranges written before a resumed download,
+    as a hash state cannot be saved to the `.progress` file.
+    """
+
+    def __init__(
+        self, path: Path, ranges: List[ByteRange], written: Set[int], buffer_bytes: int = HASH_BUFFER_BYTES
+    ) -> None:
+        self._path = path
+        self._ranges = ranges
+        self._buffer_bytes = buffer_bytes
+        # The number of bytes hashed from the start of the file, and the index of the range they end in
+        self._hashed = 0
+        self._next = 0
+        self._sha256 = hashlib.sha256()
+        self._buffers: Dict[int, List[bytes]] = {}
+        self._buffered = 0
+        # The ranges written to the file, and those with bytes not kept in memory, by first byte
+        self._written = set(written)
+        self._spilled = set(written)
+        self._reading = False
+        self._lock = threading.Lock()
+
+    def chunk(self, byte_range: ByteRange, offset: int, data: bytes) -> None:
+        """Hashes or keeps a chunk of `byte_range` received at `offset` in the file"""
+        with self._lock:
+            if offset == self._hashed and not self._reading:
+                self._sha256.update(data)
+                self._hashed += len(data)
+            elif byte_range[0] in self._spilled:
+                pass
+            elif self._buffered + len(data) <= self._buffer_bytes:
+                self._buffers.setdefault(byte_range[0], []).append(data)
+                self._buffered += len(data)
+            else:
+                # The chunks kept so far are hashed from memory, the rest of the range is read back
+                self._spilled.add(byte_range[0])
+
+    def written(self, byte_range: ByteRange) -> None:
+        """Records that the range is written to the file, and hashes the ranges that can be"""
+        with self._lock:
+            self._written.add(byte_range[0])
+        self.hash_ready()
+
+    def hash_ready(self) -> None:
+        """Hashes the kept and written ranges every byte before which is hashed
+
+        Ranges are read back without holding the lock, so other ranges go on downloading. A single thread reads at a
+        time, and goes on with the ranges written by others meanwhile.
+        """
+        with self._lock:
+            if self._reading:
+                return
+            self._reading = True
+        try:
+            while True:
+                with self._lock:
+                    span = self._advance()
+                    if span is None:
+                        self._reading = False
+                        return
+                self._read_back(*span)
+        except BaseException:
+            with self._lock:
+                self._reading = False
+            raise
+
+    def _advance(self) -> Optional[ByteRange]:
+        """Hashes the kept chunks that are next, and returns the next span to read back from the file if any"""
+        while self._next < len(self._ranges):
+            start, end = self._ranges[self._next]
+            if self._hashed > end:
+                self._next += 1
+                continue
+            if self._hashed == start:
+                for data in self._buffers.pop(start, []):
+                    self._sha256.update(data)
+                    self._hashed += len(data)
+                    self._buffered -= len(data)
+            if self._hashed > end:
+                continue
+            if start in self._written:
+                return self._hashed, end
+            return None
+        return None
+
+    def _read_back(self, start: int, end: int) -> None:
+        with open(self._path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                data = f.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    raise IOError(f"{self._path.name} is shorter than its byte ranges")
+                self._sha256.update(data)
+                remaining -= len(data)
+        with self._lock:
+            self._hashed = end + 1
+
+    def hexdigest(self) -> str:
+        assert self._next == len(self._ranges), "Not every range was hashed"
+        return self._sha256.hexdigest()
+
+
+def _preallocate(path: Path, size: int) -> None:
+    with open(path, "wb") as f:
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+                return
+            except OSError:
+                # Not supported by the file system: leave the file sparse
+                pass
+        f.truncate(size)
+
+
+def _write_at(path: Path, response: Response, offset: int, on_chunk: Callable[[bytes], None]) -> None:
+    """Writes the body of the response to the file from `offset`, and syncs it to disk"""
+    with response, open(path, "r+b") as f:
+        f.seek(offset)
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            f.write(chunk)
+            on_chunk(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def download_weights_file(
+    kind: model_weight_types,
+    id_or_name: str,
+    path: Path,
+    connections: int = DEFAULT_CONNECTIONS,
+    part_size: int = DEFAULT_PART_SIZE,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    retry: Optional[RetryPolicy] = None,
+    cache: Optional["WeightsCache"] = None,
+    limit: Optional[BandwidthLimit] = None,
+) -> DownloadSummary:
+    """Downloads the weights of a trained model to a file, over several connections when the server supports ranges
+
+        arcee.downloads.download_weights_file("alignment", "my-model", Path("my-model.tar.gz"), connections=16)
+
+    The first request asks for the first `part_size` bytes. If the server answers with that range, the rest of the
+    file is fetched as `part_size` ranges on up to `connections` connections at a time, each written at its offset in
+    a `.part` file preallocated to the full size. Otherwise the whole response is written over a single stream. Use a
+    client with a `pool_maxsize` of at least `connections` so connections are reused between ranges.
+
+    A range whose connection drops is requested again from its last received byte, and a stream from the start. If the
+    download still fails, the `.part` file and a `.progress` record of its completed ranges are kept next to `path`,
+    and calling this again only fetches the missing ranges. That needs the server to send an ETag or Last-Modified
+    date, checked with `If-Range` so that a file changed since is downloaded again. The `.part` file is renamed to
+    `path` once complete.
+
+    The SHA-256 of the file is computed as it downloads. Ranges received ahead of the ones before them are kept in
+    memory to be hashed, up to `HASH_BUFFER_BYTES`, and read back from the `.part` file beyond that. With a `cache`,
+    weights the server sends with the same ETag or Last-Modified date as cached ones are linked from the cache instead
+    of downloaded, and downloaded weights are added to it.
+
+    Arguments:
+        kind: The type of model, one of "pretraining", "alignment", "retriever" or "merging"
+        id_or_name: The ID or name of the model
+        path: The file to save the weights to
+        connections: The maximum number of ranges downloaded at the same time
+        part_size: The number of bytes of each range. A resumed download keeps the range size it started with
+        on_progress: Called with the number of bytes of the file downloaded so far, including resumed ones, and the
+            size of the file if known, e.g. to report progress. Calls are serialized, but may come from worker threads
+        retry: How many times, and after how long, a range or stream is requested again after a connection error.
+            Attempts are counted from the last one that received data. Defaults to the retry policy of the client
+        cache: A local cache of downloaded weights to link from and add to. See `WeightsCache`
+        limit: A cap on the download speed, which can be shared with other downloads
+    """
+    assert connections >= 1, "connections must be >= 1"
+    assert part_size >= 1, "part_size must be >= 1"
+    path = Path(path)
+    part = path.with_name(path.name + ".part")
+    progress = _DownloadProgress(path.with_name(path.name + ".progress"))
+    policy = retry or get_client().retry
+    summary = DownloadSummary(path)
+    started_at = perf_counter()
+    lock = threading.Lock()
+    total: Optional[int] = None
+    validator: Optional[str] = None
+    expected_sha256: Optional[str] = None
+
+    def advance(size: int) -> None:
+        with lock:
+            summary.bytes += size
+            if on_progress is not None:
+                on_progress(summary.resumed_bytes + summary.bytes, total)
+        if limit is not None and size > 0:
+            limit.acquire(size)
+
+    def backoff(attempt: int, error: Exception) -> None:
+        """Waits before the next attempt, or raises `error` if it is final"""
+        if not isinstance(error, _RETRYABLE) or not policy.should_retry(attempt, "GET"):
+            raise error
+        with lock:
+            summary.retries += 1
+        sleep(policy.backoff(attempt))
+
+    def request_range(start: int, end: int, validator: Optional[str]) -> Response:
+        headers = {"Range": f"bytes={start}-{end}"}
+        if validator:
+            headers["If-Range"] = validator
+        return download_weights(kind, id_or_name, headers=headers)
+
+    def download_stream(response: Response) -> None:
+        """Writes a file sent whole, starting over after a connection error"""
+        nonlocal total
+        received, sha256 = 0, hashlib.sha256()
+
+        def written(chunk: bytes) -> None:
+            nonlocal received
+            received += len(chunk)
+            sha256.update(chunk)
+            advance(len(chunk))
+
+        attempt = 0
+        while True:
+            attempt += 1
+            received, sha256 = 0, hashlib.sha256()
+            try:
+                total = int(response.headers.get("Content-Length") or 0) or None
+                _preallocate(part, 0)
+                _write_at(part, response, 0, written)
+                if total is not None and received < total:
+                    raise IncompleteDownload(f"Connection closed after {received} of {total} bytes of {path.name}")
+                summary.sha256 = sha256.hexdigest()
+                return
+            except Exception as e:
+                response.close()
+                backoff(attempt, e)
+                advance(-received)
+                response = download_weights(kind, id_or_name)
+
+    def download_ranges(first: Response, ranges: List[ByteRange], hasher: _RangeHasher) -> None:
+        """Writes the ranges in the preallocated `.part` file, the first one from `first`"""
+
+        def fetch(byte_range: ByteRange) -> None:
+            offset, end = byte_range
+            # The offset of the next byte to receive, over all attempts
+            position = offset
+            response: Optional[Response] = first if byte_range == ranges[0] else None
+            attempt = 0
+            while True:
+                attempt += 1
+                received = 0
+
+                def written(chunk: bytes) -> None:
+                    nonlocal received, position
+                    hasher.chunk(byte_range, position, chunk)
+                    received += len(chunk)
+                    position += len(chunk)
+                    advance(len(chunk))
+
+                try:
+                    if response is None:
+                        response = request_range(offset, end, validator)
+                        if _content_range(response) != (offset, end, total):
+                            response.close()
+                            raise IOError(
+                                f"The weights of {id_or_name} changed on the server during the download"
+                                if response.status_code == 200
+                                else f"Requested bytes {offset}-{end} of {path.name}, got {response.status_code}"
+                            )
+                    _write_at(part, response, offset, written)
+                    if offset + received <= end:
+                        raise IncompleteDownload(f"Connection closed at byte {offset + received} of {path.name}")
+                    progress.record(byte_range)
+                    hasher.written(byte_range)
+                    return
+                except Exception as e:
+                    if response is not None:
+                        response.close()
+                        response = None
+                    if received:
+                        # Data came through, so go on from there and count attempts from this one
+                        offset += received
+                        attempt = 1
+                    backoff(attempt, e)
+
+        summary.connections = min(connections, len(ranges))
+        for result in map_bounded(fetch, ranges, concurrency=connections):
+            if result.error is not None:
+                raise result.error
+        summary.sha256 = hasher.hexdigest()
+
+    def resume() -> bool:
+        """Fetches the ranges missing from the `.part` file of an interrupted download, if it can be resumed"""
+        nonlocal total, validator, expected_sha256
+        header = progress.header
+        if header is None or not part.exists() or part.stat().st_size != header["size"]:
+            return False
+        all_ranges = _byte_ranges(0, header["size"], header["part_size"])
+        ranges = [r for r in all_ranges if r[0] not in progress.done]
+        if ranges:
+            first = request_range(*ranges[0], header["validator"])
+            if _content_range(first) != (*ranges[0], header["size"]):
+                # The file changed on the server since, which then sent all of it
+                first.close()
+                return False
+            expected_sha256 = _expected_sha256(first)
+        total, validator = header["size"], header["validator"]
+        summary.resumed_bytes = total - sum(end - start + 1 for start, end in ranges)
+        hasher = _RangeHasher(part, all_ranges, progress.done)
+        # Hashes the ranges written before up to the first missing one, so that one is hashed as it downloads
+        hasher.hash_ready()
+        if ranges:
+            download_ranges(first, ranges, hasher)
+        else:
+            summary.sha256 = hasher.hexdigest()
+        return True
+
+    def start() -> None:
+        nonlocal total, validator, expected_sha256
+        progress.remove()
+        try:
+            first = download_weights(kind, id_or_name, headers={"Range": f"bytes=0-{part_size - 1}"})
+        except ArceeAPIError as e:
+            if e.status_code != 416:
+                raise
+            # An empty file has no range to ask for
+            first = download_weights(kind, id_or_name)
+
+        validator, expected_sha256 = _validator(first), _expected_sha256(first)
+        cached = cache.get(kind, id_or_name, validator) if cache is not None and validator else None
+        if cached is not None:
+            first.close()
+            cache.link(cached, path)  # type: ignore[union-attr]
+            summary.sha256, summary.cached = cached.sha256, True
+            return
+
+        content_range = _content_range(first)
+        if content_range is None or content_range[0] != 0:
+            download_stream(first)
+            return
+        _, first_last, total = content_range
+        _preallocate(part, total)
+        if validator:
+            # Without a validator, a later attempt could not tell whether the file changed, so it starts over
+            progress.start({"size": total, "part_size": part_size, "validator": validator})
+        ranges = [(0, first_last)] + _byte_ranges(first_last + 1, total, part_size)
+        download_ranges(first, ranges, _RangeHasher(part, ranges, set()))
+
+    try:
+        if not resume():
+            start()
+        if not summary.cached and expected_sha256 not in (None, summary.sha256):
+            # Fetching the same ranges again would not help
+            progress.remove()
+            raise IOError(f"The SHA-256 of {path.name} is {summary.sha256}, but the server sent {expected_sha256}")
+    except BaseException:
+        if progress.header is None:
+            part.unlink(missing_ok=True)
+        raise
+
+    if not summary.cached:
+        os.replace(part, path)
+        progress.remove()
+        if cache is not None and validator and summary.sha256:
+            cache.add(kind, id_or_name, validator, summary.sha256, path)
+    summary.elapsed = perf_counter() - started_at
+    return summary
+
+
+class _ChunkReader(io.RawIOBase):
+    """A file object reading the chunks of bytes put in a queue, up to a None"""
+
+    def __init__(self, chunks: "Queue[Optional[bytes]]") -> None:
+        self._chunks = chunks
+        self._buffer = memoryview(b"")
+        self._ended = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._buffer:
+            if self._ended:
+                return 0
+            chunk = self._chunks.get()
+            if chunk is None:
+                self._ended = True
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _is_inside(path: Path, root: Path) -> bool:
+    return os.path.commonpath([root, path]) == str(root)
+
+
+def _check_member(member: tarfile.TarInfo, root: Path) -> None:
+    """Rejects archive members written outside of `root`, links pointing outside of it, and special files"""
+    target = (root / member.name).resolve()
+    if not _is_inside(target, root):
+        raise ValueError(f"Refusing to extract {member.name}: it is outside of the extraction directory")
+    if member.issym() or member.islnk():
+        link = (target.parent if member.issym() else root) / member.linkname
+        if not _is_inside(link.resolve(), root):
+            raise ValueError(f"Refusing to extract {member.name}: it links outside of the extraction directory")
+    elif not (member.isfile() or member.isdir()):
+        raise ValueError(f"Refusing to extract {member.name}: it is not a file, directory or link")
+
+
+def _extract(fileobj: IO[bytes], root: Path) -> int:
+    """Extracts a tar archive, compressed or not, read as a stream. Returns the number of files extracted"""
+    files = 0
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            _check_member(member, root)
+            tar.extract(member, root, **_EXTRACT_FILTER)
+            files += member.isfile()
+    return files
+
+
+def extract_weights(
+    kind: model_weight_types,
+    id_or_name: str,
+    directory: Path,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    retry: Optional[RetryPolicy] = None,
+    cache: Optional["WeightsCache"] = None,
+    limit: Optional[BandwidthLimit] = None,
+) -> DownloadSummary:
+    """Downloads the weights archive of a trained model and extracts it into a directory as it arrives
+
+        arcee.downloads.extract_weights("alignment", "my-model", Path("models/my-model"))
+
+    The archive is never written to disk: the response is read on the calling thread and decompressed and extracted on
+    another one, so files are in place moments after the last byte arrives. Members that would be written outside of
+    `directory`, links pointing outside of it and special files are refused. The archive is read over a single stream.
+    If its connection drops, it is requested again from the last received byte, provided the server supports ranges
+    and sent an ETag or Last-Modified date to check that the file did not change. Files extracted before a failure are
+    left in `directory`.
+
+    With a `cache` holding the archive the server sends, it is extracted from the cache instead. Archives extracted as
+    they download are not added to the cache, since they are never on disk.
+
+    Arguments:
+        kind: The type of model, one of "pretraining", "alignment", "retriever" or "merging"
+        id_or_name: The ID or name of the model
+        directory: The directory to extract the weights into. Created if it does not exist
+        on_progress: Called with the number of bytes downloaded so far and the size of the archive, if known
+        retry: How many times, and after how long, the stream is resumed after a connection error. Attempts are counted
+            from the last one that received data. Defaults to the retry policy of the client
+        cache: A local cache of downloaded weights to extract from. See `WeightsCache`
+        limit: A cap on the download speed, which can be shared with other downloads
+    """
+    root = Path(directory).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    policy = retry or get_client().retry
+    summary = DownloadSummary(root)
+    started_at = perf_counter()
+    chunks: "Queue[Optional[bytes]]" = Queue(maxsize=EXTRACT_QUEUE_CHUNKS)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="arcee-extract") as pool:
+        reader = io.BufferedReader(_ChunkReader(chunks), buffer_size=CHUNK_SIZE)
+        extraction = pool.submit(_extract, reader, root)
+
+        def put(chunk: Optional[bytes]) -> bool:
+            """Hands a chunk to the extraction, unless it is over"""
+            while True:
+                try:
+                    chunks.put(chunk, timeout=0.1)
+                    return True
+                except Full:
+                    if extraction.done():
+                        return False
+
+        def stream() -> None:
+            response = download_weights(kind, id_or_name)
+            validator, expected_sha256 = _validator(response), _expected_sha256(response)
+            cached = cache.get(kind, id_or_name, validator) if cache is not None and validator else None
+            if cached is not None:
+                response.close()
+                summary.sha256, summary.cached = cached.sha256, True
+                with open(cached.path, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        if not put(chunk):
+                            return
+                return
+
+            total = int(response.headers.get("Content-Length") or 0) or None
+            sha256 = hashlib.sha256()
+            attempt = 0
+            while True:
+                attempt += 1
+                received = summary.bytes
+                try:
+                    with response:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            if not put(chunk):
+                                # The archive ended, or failed to extract
+                                return
+                            sha256.update(chunk)
+                            summary.bytes += len(chunk)
+                            if on_progress is not None:
+                                on_progress(summary.bytes, total)
+                            if limit is not None:
+                                limit.acquire(len(chunk))
+                    if total is not None and summary.bytes < total:
+                        raise IncompleteDownload(f"Connection closed after {summary.bytes} of {total} bytes")
+                    summary.sha256 = sha256.hexdigest()
+                    if expected_sha256 not in (None, summary.sha256):
+                        raise IOError(
+                            f"The SHA-256 of the archive is {summary.sha256}, but the server sent {expected_sha256}"
+                        )
+                    return
+                except _RETRYABLE as e:
+                    if summary.bytes > received:
+                        attempt = 1
+                    if validator is None or not policy.should_retry(attempt, "GET"):
+                        raise e
+                    summary.retries += 1
+                    sleep(policy.backoff(attempt))
+                    response = download_weights(
+                        kind, id_or_name, headers={"Range": f"bytes={summary.bytes}-", "If-Range": validator}
+                    )
+                    content_range = _content_range(response)
+                    if content_range is None or content_range[0] != summary.bytes:
+                        response.close()
+                        raise IOError(f"Could not resume the download of the weights of {id_or_name}") from e
+
+        try:
+            stream()
+        finally:
+            # Ends the archive, which then fails to extract if the download failed
+            put(None)
+        summary.files = extraction.result()
+    summary.elapsed = perf_counter() - started_at
+    return summary
+
+
+@dataclass
+class WeightsDownload:
+    """The weights of one model to download with `download_weights_files`
+
+    Arguments:
+        kind: The type of model, one of "pretraining", "alignment", "retriever" or "merging"
+        id_or_name: The ID or name of the model
+        path: The file to save the weights to, or the directory to extract them into with `extract`
+        extract: Whether to extract the archive into `path` as it downloads, see `extract_weights`
+    """
+
+    kind: model_weight_types
+    id_or_name: str
+    path: Path
+    extract: bool = False
+
+
+def read_weights_manifest(path: Path) -> List[WeightsDownload]:
+    """Reads the models to download from a JSON manifest
+
+    The manifest is a list of objects with the `kind` and `name` of each model, and optionally the `path` to save its
+    weights to (by default `<name>.tar.gz`, or the directory `<name>` with `extract`) and whether to `extract` them:
+
+        [
+            {"kind": "alignment", "name": "my-model", "path": "models/my-model.tar.gz"},
+            {"kind": "merging", "name": "my-merge", "path": "models/my-merge", "extract": true}
+        ]
+
+    Relative paths are relative to the current directory.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} should contain a list of models to download")
+
+    downloads = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not {"kind", "name"} <= entry.keys():
+            raise ValueError(f"Model {i} of {path} should be an object with a kind and a name")
+        if entry["kind"] not in get_args(model_weight_types):
+            raise ValueError(f"Unknown kind of model {entry['kind']!r} for {entry['name']} in {path}")
+        extract = bool(entry.get("extract", False))
+        default = entry["name"] if extract else f"{entry['name']}.tar.gz"
+        downloads.append(WeightsDownload(entry["kind"], entry["name"], Path(entry.get("path") or default), extract))
+    return downloads
+
+
+def download_weights_files(
+    downloads: Iterable[WeightsDownload],
+    concurrency: int = 4,
+    connections: int = 2 * DEFAULT_CONNECTIONS,
+    max_bytes_per_second: Optional[float] = None,
+    on_progress: Optional[Callable[[WeightsDownload, int, Optional[int]], None]] = None,
+    retry: Optional[RetryPolicy] = None,
+    cache: Optional["WeightsCache"] = None,
+) -> List[BatchResult[WeightsDownload, DownloadSummary]]:
+    """Downloads the weights of several models at the same time, and returns the outcome of each
+
+        results = arcee.downloads.download_weights_files(read_weights_manifest(Path("models.json")), concurrency=4)
+        failed = [result for result in results if not result.ok]
+
+    Up to `concurrency` models are downloaded at once, each with `download_weights_file`, or `extract_weights` if it
+    is to be extracted. The `connections` are shared evenly between them, and all downloads go through the client in
+    use, so use one with a `pool_maxsize` of at least `connections`. A failed download does not stop the others: its
+    result holds the error, and the `.part` file of its interrupted download is kept to be resumed by a later call.
+
+    Arguments:
+        downloads: The models to download, see `read_weights_manifest`
+        concurrency: The maximum number of models downloaded at the same time
+        connections: The maximum number of connections open at the same time, across all models
+        max_bytes_per_second: A cap on the combined speed of the downloads, see `BandwidthLimit`
+        on_progress: Called with the model, the number of bytes of it downloaded so far and its size if known. Calls
+            for the same model are serialized, but calls for different ones may be concurrent
+        retry: How many times, and after how long, a connection is retried. Defaults to the retry policy of the client
+        cache: A local cache of downloaded weights to link from and add to. See `WeightsCache`
+
+    Returns:
+        A `BatchResult` for each model, in the order of `downloads`, with the `DownloadSummary` of the model if it
+        succeeded or the error it failed with
+    """
+    assert concurrency >= 1, "concurrency must be >= 1"
+    assert connections >= 1, "connections must be >= 1"
+    per_download = max(1, connections // concurrency)
+    limit = BandwidthLimit(max_bytes_per_second) if max_bytes_per_second else None
+
+    def download(item: WeightsDownload) -> DownloadSummary:
+        def progress(done: int, total: Optional[int]) -> None:
+            if on_progress is not None:
+                on_progress(item, done, total)
+
+        if item.extract:
+            return extract_weights(
+                item.kind, item.id_or_name, item.path, on_progress=progress, retry=retry, cache=cache, limit=limit
+            )
+        return download_weights_file(
+            item.kind,
+            item.id_or_name,
+            item.path,
+            connections=per_download,
+            on_progress=progress,
+            retry=retry,
+            cache=cache,
+            limit=limit,
+        )
+
+    return list(map_bounded(download, downloads, concurrency=concurrency))
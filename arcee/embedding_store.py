@@ -0,0 +1,201 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+INDEX_FILE = "index.sqlite"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_from_response(response: Any) -> List[float]:
+    """Extracts the embedding vector of an `embed` response"""
+    if isinstance(response, dict):
+        for key in ("embedding", "embeddings", "vector", "data"):
+            if key in response:
+                return embedding_from_response(response[key])
+    if isinstance(response, list) and response:
+        if isinstance(response[0], (int, float)):
+            return [float(x) for x in response]
+        return embedding_from_response(response[0])
+    raise ValueError(f"Cannot find an embedding vector in the embed response: {str(response)[:200]}")
+
+
+class EmbeddingStore:
+    """A persistent, on-disk store of embeddings keyed by deployment name and content hash
+
+    Vectors of each deployment live in a memory-mapped float32 matrix file, one row per distinct text, and a SQLite
+    index maps (deployment, sha256 of the text) to rows. Pass a store to `embed` or `embed_many` to serve repeated
+    texts from disk without a network call, across runs and processes:
+
+        store = EmbeddingStore("~/.cache/arcee/embeddings")
+        arcee.api.embed("my-deployment", "some text", store=store)  # network, then stored
+        arcee.api.embed("my-deployment", "some text", store=store)  # disk
+        matrix = store.matrix("my-deployment")  # zero-copy (rows, dim) float32 view
+        hashes = store.content_hashes("my-deployment")  # row i holds the text with hash hashes[i]
+
+    Arguments:
+        path: The directory holding the index and matrix files. Created if needed
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode: writes take an explicit `BEGIN IMMEDIATE` so concurrent processes never hand out a row twice
+        self._db = sqlite3.connect(self.path / INDEX_FILE, check_same_thread=False, isolation_level=None)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS matrices (
+                deployment TEXT PRIMARY KEY, file TEXT NOT NULL, dim INTEGER NOT NULL, rows INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS embeddings (
+                deployment TEXT NOT NULL, content_hash TEXT NOT NULL, row INTEGER NOT NULL,
+                PRIMARY KEY (deployment, content_hash)
+            );
+            """)
+        self._maps: Dict[str, "np.memmap"] = {}
+
+    def _matrix_info(self, deployment: str) -> Optional[tuple]:
+        return self._db.execute("SELECT file, dim, rows FROM matrices WHERE deployment = ?", (deployment,)).fetchone()
+
+    def _rows_of(self, deployment: str, hashes: Sequence[str]) -> Dict[str, int]:
+        rows: Dict[str, int] = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start : start + 500]
+            rows.update(
+                self._db.execute(
+                    "SELECT content_hash, row FROM embeddings WHERE deployment = ? AND content_hash IN "
+                    f"({','.join('?' * len(chunk))})",
+                    (deployment, *chunk),
+                ).fetchall()
+            )
+        return rows
+
+    def _map(self, deployment: str, file: str, dim: int, min_rows: int = 0) -> "np.memmap":
+        """Returns the memory map of a matrix file holding at least `min_rows` rows, growing the file if needed"""
+        mapped = self._maps.get(deployment)
+        if mapped is not None and mapped.shape[0] >= max(min_rows, 1):
+            return mapped
+
+        matrix_path = self.path / file
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        capacity = os.path.getsize(matrix_path) // row_bytes if matrix_path.exists() else 0
+        if capacity < max(min_rows, 1):
+            # Grow geometrically so appends stay amortized O(1)
+            capacity = max(min_rows, 2 * capacity, 1024)
+            with open(matrix_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        if mapped is not None:
+            mapped.flush()
+        mapped = np.memmap(matrix_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+        self._maps[deployment] = mapped
+        return mapped
+
+    def get_many(self, deployment: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Returns the stored vector of every text, or None for texts that were never stored"""
+        hashes = [content_hash(text) for text in texts]
+        with self._lock:
+            info = self._matrix_info(deployment)
+            if info is None:
+                return [None] * len(texts)
+            file, dim, rows = info
+            found = self._rows_of(deployment, hashes)
+            mapped = self._map(deployment, file, dim, rows)
+            return [np.array(mapped[found[h]]) if h in found else None for h in hashes]
+
+    def get(self, deployment: str, text: str) -> Optional[np.ndarray]:
+        """Returns the stored vector of `text`, or None if it was never stored"""
+        return self.get_many(deployment, [text])[0]
+
+    def put_many(self, deployment: str, texts: Sequence[str], vectors: Iterable[Sequence[float]]) -> None:
+        """Stores the vector of every text. Texts that are already stored keep their row and get the new vector"""
+        matrix = np.asarray(list(vectors), dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("Expected one vector of the same dimension per text")
+        hashes = [content_hash(text) for text in texts]
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                info = self._matrix_info(deployment)
+                if info is None:
+                    file = hashlib.sha1(deployment.encode("utf-8")).hexdigest()[:16] + ".f32"
+                    dim, rows = matrix.shape[1], 0
+                    self._db.execute(
+                        "INSERT INTO matrices (deployment, file, dim, rows) VALUES (?, ?, ?, 0)",
+                        (deployment, file, dim),
+                    )
+                else:
+                    file, dim, rows = info
+                    if matrix.shape[1] != dim:
+                        raise ValueError(f"Expected vectors of dimension {dim} for {deployment}, got {matrix.shape[1]}")
+
+                assigned = self._rows_of(deployment, hashes)
+                new_rows = []
+                for h in hashes:
+                    if h not in assigned:
+                        assigned[h] = rows
+                        new_rows.append((deployment, h, rows))
+                        rows += 1
+
+                mapped = self._map(deployment, file, dim, rows)
+                for i, h in enumerate(hashes):
+                    mapped[assigned[h]] = matrix[i]
+                # Vectors hit the disk before the index points at them
+                mapped.flush()
+                self._db.executemany(
+                    "INSERT INTO embeddings (deployment, content_hash, row) VALUES (?, ?, ?)", new_rows
+                )
+                self._db.execute("UPDATE matrices SET rows = ? WHERE deployment = ?", (rows, deployment))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def put(self, deployment: str, text: str, vector: Sequence[float]) -> None:
+        """Stores the vector of `text`"""
+        self.put_many(deployment, [text], [vector])
+
+    def matrix(self, deployment: str) -> np.ndarray:
+        """Returns all stored vectors of a deployment as a zero-copy, read-only (rows, dim) float32 view"""
+        with self._lock:
+            info = self._matrix_info(deployment)
+            if info is None:
+                return np.empty((0, 0), dtype=np.float32)
+            file, dim, rows = info
+            view = self._map(deployment, file, dim, rows)[:rows]
+        view.flags.writeable = False
+        return view
+
+    def content_hashes(self, deployment: str) -> List[str]:
+        """Returns the content hash of every row of `matrix(deployment)`, in row order"""
+        with self._lock:
+            return [
+                h
+                for (h,) in self._db.execute(
+                    "SELECT content_hash FROM embeddings WHERE deployment = ? ORDER BY row", (deployment,)
+                )
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.flush()
+            self._maps.clear()
+            self._db.close()
+
+    def __enter__(self) -> "EmbeddingStore":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,81 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before re-sending a failed request
+
+    A request is retried on a connection error or a `retry_statuses` response when its method is safe to repeat:
+    a `retry_methods` method, or any method carrying an `Idempotency-Key` header. 429 responses are always retried
+    since the server rejected them before doing any work. Waits grow exponentially from `backoff_factor` up to
+    `backoff_max` with full jitter, unless the server sends a `Retry-After` header.
+
+    Arguments:
+        max_attempts: Total number of attempts, including the first one. 1 disables retries
+        backoff_factor: Upper bound in seconds of the wait before the first retry, doubled on every further retry
+        backoff_max: Upper bound in seconds of any backoff wait
+        jitter: Whether waits are drawn uniformly from [0, backoff] to spread out retries of concurrent clients
+        retry_statuses: Response statuses considered transient
+        retry_methods: HTTP methods that are safe to repeat without an idempotency key
+        respect_retry_after: Whether a `Retry-After` header overrides the backoff wait
+        max_retry_after: Upper bound in seconds of a wait requested by `Retry-After`
+    """
+
+    max_attempts: int = 3
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    jitter: bool = True
+    retry_statuses: frozenset = frozenset({429, 502, 503, 504})
+    retry_methods: frozenset = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    respect_retry_after: bool = True
+    max_retry_after: float = 120.0
+
+    def __post_init__(self) -> None:
+        assert self.max_attempts >= 1, "max_attempts must be >= 1"
+
+    def is_idempotent(self, method: str, headers: Optional[Mapping[str, str]] = None) -> bool:
+        """Whether a request may be sent more than once"""
+        return method.upper() in self.retry_methods or IDEMPOTENCY_HEADER in (headers or {})
+
+    def should_retry(
+        self, attempt: int, method: str, headers: Optional[Mapping[str, str]] = None, status: Optional[int] = None
+    ) -> bool:
+        """Whether to retry after `attempt` failed, with the given response status or a connection error (None)"""
+        if attempt >= self.max_attempts:
+            return False
+        if status is not None and status not in self.retry_statuses:
+            return False
+        return status == 429 or self.is_idempotent(method, headers)
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait after `attempt` failed"""
+        if retry_after and self.respect_retry_after:
+            wait = _parse_retry_after(retry_after)
+            if wait is not None:
+                return min(wait, self.max_retry_after)
+        wait = min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, wait) if self.jitter else wait
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Parses a Retry-After header, given either as seconds or as an HTTP date"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
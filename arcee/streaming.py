@@ -0,0 +1,138 @@
+import json
+from time import perf_counter
+from typing import Any, Iterator, List, Optional
+
+import requests
+
+SSE_CONTENT_TYPE = "text/event-stream"
+SSE_DONE = "[DONE]"
+
+
+def token_from_event(data: str) -> Optional[str]:
+    """Extracts the token delta from the data of one streamed event.
+
+    Understands plain-text events and the common JSON shapes: `{"token": "..."}`, `{"token": {"text": "..."}}`,
+    `{"text": "..."}`, `{"delta": "..."}` and OpenAI-style `{"choices": [{"delta": {"content": "..."}}]}`. Plain-text
+    tokens that happen to be JSON numbers, booleans or null, such as `42`, are kept as they are.
+    """
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return data
+    if isinstance(event, str):
+        return event
+    if not isinstance(event, dict):
+        return data
+
+    token: Any = event.get("token")
+    if isinstance(token, dict):
+        if token.get("special"):
+            return None
+        token = token.get("text")
+    if token is None:
+        token = event.get("text", event.get("delta"))
+    if token is None and event.get("choices"):
+        choice = event["choices"][0]
+        token = (choice.get("delta") or {}).get("content", choice.get("text"))
+    return token if isinstance(token, str) else None
+
+
+class SSEDecoder:
+    """Incrementally decodes server-sent events, one line at a time"""
+
+    def __init__(self) -> None:
+        self._data: List[str] = []
+        self.done = False
+
+    def feed(self, line: str) -> Optional[str]:
+        """Feeds one line without its line terminator. Returns the data of the event it completes, if any"""
+        if line == "":
+            return self.flush()
+        if line.startswith(":"):  # comment / keep-alive
+            return None
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Returns the data of a pending event that was not terminated by a blank line"""
+        if not self._data:
+            return None
+        data = "\n".join(self._data)
+        self._data = []
+        if data == SSE_DONE:
+            self.done = True
+            return None
+        return data
+
+
+class TokenStream:
+    """Iterates over the token deltas of a streamed generation as they arrive
+
+    Server-sent event responses are decoded event by event; any other response is treated as a chunked plain-text
+    stream. The stream records its latency as it is consumed:
+
+        stream = arcee.generate("my-deployment", query="...", stream=True)
+        for token in stream:
+            print(token, end="", flush=True)
+        print(stream.time_to_first_token, stream.elapsed)
+
+    Arguments:
+        response: The unread streaming response
+        started_at: `time.perf_counter()` when the request was sent. Defaults to now
+    """
+
+    def __init__(self, response: requests.Response, started_at: Optional[float] = None) -> None:
+        self.response = response
+        self.started_at = perf_counter() if started_at is None else started_at
+        self.time_to_first_token: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.tokens: List[str] = []
+
+    @property
+    def text(self) -> str:
+        """The text received so far"""
+        return "".join(self.tokens)
+
+    def _deltas(self) -> Iterator[str]:
+        if self.response.headers.get("Content-Type", "").startswith(SSE_CONTENT_TYPE):
+            decoder = SSEDecoder()
+            for line in self.response.iter_lines(decode_unicode=True):
+                data = decoder.feed(line)
+                if data is not None:
+                    token = token_from_event(data)
+                    if token:
+                        yield token
+                if decoder.done:
+                    return
+            data = decoder.flush()
+            token = token_from_event(data) if data is not None else None
+            if token:
+                yield token
+        else:
+            if self.response.encoding is None:
+                self.response.encoding = "utf-8"
+            for chunk in self.response.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    yield chunk
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for token in self._deltas():
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = perf_counter() - self.started_at
+                self.tokens.append(token)
+                yield token
+        finally:
+            self.elapsed = perf_counter() - self.started_at
+            self.close()
+
+    def close(self) -> None:
+        self.response.close()
+
+    def __enter__(self) -> "TokenStream":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
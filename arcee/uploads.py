@@ -0,0 +1,480 @@
+"""Streaming upload of document files to a context
+
+Documents flow through a reader → batcher → uploader pipeline: records are read incrementally from each file, cut into
+batches by their encoded JSON size and count, and each batch is sent while the next one is read and encoded. Peak
+memory stays around two batches whatever the size of the files.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from arcee.api import _dedup_transaction, _doc_payload
+from arcee.api_handler import make_request
+from arcee.batch import map_ahead, map_bounded
+from arcee.chunking import Splitter, split_groups
+from arcee.client import get_client
+from arcee.compression import EncodedBody, encode_body
+from arcee.dedup import DocDeduplicator
+from arcee.discovery import FoundFile
+from arcee.retry import IDEMPOTENCY_HEADER
+from arcee.schemas.routes import Route
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DOC_FILE_EXTENSIONS = {".txt", ".jsonl", ".csv"}
+
+# A few MB per request, in line with the request sizes the API accepts. Uploads hold up to `workers` + 2 batches
+DEFAULT_MAX_BATCH_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_BATCH_DOCS = 10_000
+
+# Rows parsed at a time from CSV files
+CSV_CHUNK_ROWS = 10_000
+
+# A record read from a file, with its position range in the file: byte offsets in .jsonl files, row numbers in .csv
+# files, and 0 to 1 for the single document of a .txt file
+Positioned = Tuple[Dict[str, Any], str, int, int]
+
+# Encodes documents like `json.dumps`, without building an encoder for every call
+_encode_json = json.JSONEncoder(allow_nan=False).encode
+
+
+def _read_jsonl(path: Path, start: int = 0) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        for line in iter(f.readline, b""):
+            end = position + len(line)
+            if line.strip():
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"{path} at byte {position} is not a JSON object")
+                yield record, position, end
+            position = end
+
+
+def _column_values(column: "pd.Series") -> List[Any]:
+    """The values of a column as Python objects, with empty cells as None rather than NaN, which is not valid JSON"""
+    if column.hasnans:
+        column = column.astype(object).where(column.notna(), None)
+    return column.tolist()
+
+
+def _read_csv(path: Path, doc_name: str, doc_text: str, start: int = 0) -> Iterator[Positioned]:
+    if not find_spec("pandas"):
+        raise ModuleNotFoundError(
+            "Cannot find pandas. Please run `pip install --upgrade 'arcee-py[cli]'` to upload CSV files"
+        )
+    import pandas as pd
+
+    row = 0
+    # Rows are skipped once parsed rather than with `skiprows`, which counts lines, not rows: records can span several
+    # lines, and blank lines are no records
+    with pd.read_csv(path, chunksize=CSV_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            _check_keys(path, chunk.columns, doc_name, doc_text)
+            if row + len(chunk) <= start:
+                row += len(chunk)
+                continue
+            if row < start:
+                chunk = chunk.iloc[start - row :]
+                row = start
+            # Documents are built from whole columns, rather than row by row through pandas
+            metadata = [column for column in chunk.columns if column not in (doc_name, doc_text)]
+            keys = ["doc_name", "doc_text", *metadata]
+            columns = [_column_values(chunk[column]) for column in [doc_name, doc_text, *metadata]]
+            # All columns have the length of the chunk (zip(strict=...) needs Python 3.10)
+            for values in zip(*columns):  # noqa: B905
+                yield dict(zip(keys, values)), str(path), row, row + 1  # noqa: B905
+                row += 1
+
+
+def _check_keys(path: Path, keys: Iterable[str], doc_name: str, doc_text: str) -> None:
+    if doc_name not in keys:
+        raise ValueError(
+            f"{doc_name} not found in data column/key of {path}. Rename column/key or use "
+            f"--doc-name in comment to specify your own"
+        )
+    if doc_text not in keys:
+        raise ValueError(
+            f"{doc_text} not found in data column/key of {path}. Rename column/key or use "
+            f"--doc-text in comment to specify your own"
+        )
+
+
+def _read_positioned(path: Path, doc_name: str, doc_text: str, start: int = 0) -> Iterator[Positioned]:
+    """Reads the documents of a file from position `start` on, with their position range"""
+    if path.suffix == ".txt":
+        if start == 0:
+            yield {"doc_name": path.name, "doc_text": path.read_text()}, str(path), 0, 1
+    elif path.suffix == ".jsonl":
+        for record, record_start, record_end in _read_jsonl(path, start):
+            _check_keys(path, record, doc_name, doc_text)
+            doc = {"doc_name": record.pop(doc_name), "doc_text": record.pop(doc_text), **record}
+            yield doc, str(path), record_start, record_end
+    elif path.suffix == ".csv":
+        yield from _read_csv(path, doc_name, doc_text, start)
+    else:
+        raise ValueError(f"File type not valid. Must be one of {DOC_FILE_EXTENSIONS}")
+
+
+def read_docs(path: Path, doc_name: str = "name", doc_text: str = "text") -> Iterator[Dict[str, Any]]:
+    """Reads the documents of a file one at a time, in the form taken by `upload_docs`
+
+    A .txt file is one document named after the file. Every record of a .jsonl or .csv file is a document, with its
+    `doc_name` and `doc_text` keys/columns as name and text, and any other key/column as metadata.
+    """
+    return (doc for doc, _, _, _ in _read_positioned(path, doc_name, doc_text))
+
+
+@dataclass
+class DocBatch:
+    """A batch of documents, serialized as the body of one contexts request
+
+    Arguments:
+        index: The position of the batch in the upload
+        body: The request body, as JSON
+        docs: The number of documents in the batch
+        sent: The number of bytes sent for the batch, after compression. Set once the batch is encoded
+        sources: The (file path, start, end) position ranges the documents were read from
+    """
+
+    index: int
+    body: bytes
+    docs: int
+    sent: int = 0
+    sources: List[Tuple[str, int, int]] = field(default_factory=list)
+
+    @property
+    def sha256(self) -> str:
+        """The content hash of the request body, also sent as its idempotency key"""
+        return hashlib.sha256(self.body).hexdigest()
+
+
+def _batch_positioned(
+    context: str, docs: Iterable[Positioned], max_batch_bytes: int, max_batch_docs: int, first_index: int = 0
+) -> Iterator[DocBatch]:
+    assert max_batch_docs >= 1, "max_batch_docs must be >= 1"
+    head = b'{"context_name": ' + json.dumps(context).encode("utf-8") + b', "documents": ['
+    tail = b"]}"
+    separator = b", "
+
+    def cut() -> DocBatch:
+        return DocBatch(index, head + separator.join(encoded) + tail, len(encoded), sources=sources)
+
+    index = first_index
+    encoded: List[bytes] = []
+    sources: List[Tuple[str, int, int]] = []
+    size = len(head) + len(tail)
+    for doc, path, start, end in docs:
+        fragment = _encode_json(_doc_payload(doc)).encode("utf-8")
+        added = len(fragment) + (len(separator) if encoded else 0)
+        if encoded and (size + added > max_batch_bytes or len(encoded) >= max_batch_docs):
+            yield cut()
+            index += 1
+            encoded, sources = [], []
+            size = len(head) + len(tail)
+            added = len(fragment)
+        encoded.append(fragment)
+        size += added
+        if sources and sources[-1][0] == path:
+            sources[-1] = (path, sources[-1][1], end)
+        else:
+            sources.append((path, start, end))
+
+    if encoded:
+        yield cut()
+
+
+def batch_docs(
+    context: str,
+    docs: Iterable[Dict[str, Any]],
+    max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_batch_docs: int = DEFAULT_MAX_BATCH_DOCS,
+) -> Iterator[DocBatch]:
+    """Serializes documents into request bodies of at most `max_batch_bytes` bytes and `max_batch_docs` documents
+
+    Each document is encoded once, and a batch is cut before the document that would take it over a limit. A document
+    larger than `max_batch_bytes` on its own is sent alone.
+    """
+    positioned = ((doc, "", i, i + 1) for i, doc in enumerate(docs))
+    return _batch_positioned(context, positioned, max_batch_bytes, max_batch_docs)
+
+
+class UploadManifest:
+    """A local checkpoint of the batches of an upload that the API acknowledged, to resume an interrupted upload
+
+    The manifest is a JSON lines file: a header describing the upload (context, files, batch limits), then one line
+    per acknowledged batch with its index, the file position ranges it was read from and the hash of its content.
+    Lines are appended and synced as soon as each batch is acknowledged, so a crash loses at most in-flight batches.
+
+    When an upload is re-run with the same manifest, reading starts right after the last batch of the acknowledged
+    prefix, and later batches that were already acknowledged (uploaded out of order by parallel workers) are skipped.
+
+    Arguments:
+        path: The manifest file. Created if it does not exist
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path).expanduser()
+        self.header: Optional[Dict[str, Any]] = None
+        self.acknowledged: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line torn by a crash: its batch was not fully recorded, so it is uploaded again
+                        continue
+                    if self.header is None:
+                        self.header = entry
+                    else:
+                        self.acknowledged[entry["index"]] = entry
+
+    def start(self, upload: Dict[str, Any]) -> None:
+        """Checks that the manifest describes `upload`, or starts a new manifest for it"""
+        if self.header is None:
+            self.header = upload
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._append(upload)
+        elif self.header != upload:
+            raise ValueError(
+                f"The upload manifest {self.path} was written for a different upload, or the files changed since. "
+                "Delete it to upload from the start."
+            )
+
+    def resume_point(self) -> Tuple[int, Optional[Tuple[str, int]]]:
+        """Returns the index of the first unacknowledged batch, and the file position its documents start at"""
+        index = 0
+        while index in self.acknowledged:
+            index += 1
+        if index == 0:
+            return 0, None
+        path, _, end = self.acknowledged[index - 1]["sources"][-1]
+        return index, (path, end)
+
+    def is_acknowledged(self, batch: DocBatch) -> bool:
+        entry = self.acknowledged.get(batch.index)
+        if entry is None:
+            return False
+        if entry["sha256"] != batch.sha256:
+            raise ValueError(
+                f"Batch {batch.index} differs from the one recorded in the upload manifest {self.path}. "
+                "Delete it to upload from the start."
+            )
+        return True
+
+    def record(self, batch: DocBatch) -> None:
+        """Records that the API acknowledged `batch`"""
+        entry = {"index": batch.index, "sha256": batch.sha256, "docs": batch.docs, "sources": batch.sources}
+        with self._lock:
+            self.acknowledged[batch.index] = entry
+            self._append(entry)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+@dataclass
+class UploadSummary:
+    """The outcome of an upload
+
+    Arguments:
+        batches: The number of uploaded batches
+        docs: The number of uploaded documents
+        bytes: The number of bytes sent, after compression
+        skipped_batches: The number of batches skipped because a previous run uploaded them
+        skipped_docs: The number of documents in the skipped batches
+        duplicates: The number of documents dropped by deduplication
+        responses: The response to every uploaded batch, in order
+    """
+
+    batches: int = 0
+    docs: int = 0
+    bytes: int = 0
+    skipped_batches: int = 0
+    skipped_docs: int = 0
+    duplicates: int = 0
+    responses: List[Dict[str, str]] = field(default_factory=list)
+
+
+def _split_positioned(docs: Iterator[Positioned], splitter: Splitter) -> Iterator[Positioned]:
+    """Splits documents into chunks, each with the position of its document"""
+    positions: Deque[Tuple[str, int, int]] = deque()
+
+    def unpositioned() -> Iterator[Dict[str, Any]]:
+        for doc, path, start, end in docs:
+            positions.append((path, start, end))
+            yield doc
+
+    # Chunks come in document order, after their document was read
+    for chunks in split_groups(unpositioned(), splitter):
+        path, start, end = positions.popleft()
+        for chunk in chunks:
+            yield chunk, path, start, end
+
+
+def _file_identity(file: FoundFile) -> List[Any]:
+    return [str(file.path), file.size, file.mtime_ns]
+
+
+def upload_doc_files(
+    context: str,
+    paths: Sequence[Union[Path, FoundFile]],
+    doc_name: str = "name",
+    doc_text: str = "text",
+    max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_batch_docs: int = DEFAULT_MAX_BATCH_DOCS,
+    workers: int = 1,
+    on_batch: Optional[Callable[[DocBatch, Dict[str, str]], None]] = None,
+    manifest: Union[str, Path, UploadManifest, None] = None,
+    dedup: Optional[DocDeduplicator] = None,
+    splitter: Optional[Splitter] = None,
+) -> UploadSummary:
+    """Uploads the documents of .txt, .jsonl and .csv files to a context, streaming them in batches
+
+    Files are read incrementally, so they can be larger than memory. Batches are read, serialized and compressed (per
+    the `compression` of the client) on a worker thread while up to `workers` previous batches are being sent. At
+    most `workers` + 2 batches are held in memory, so memory use is bounded by (`workers` + 2) * `max_batch_bytes`.
+    Every batch is sent with its content hash as `Idempotency-Key`.
+
+    Args:
+        context (str): The name of the context to upload to
+        paths (list): The files to upload, as paths or as listed by `discover_files`
+        doc_name (str): The key/column holding the document name in .jsonl and .csv files
+        doc_text (str): The key/column holding the document text in .jsonl and .csv files
+        max_batch_bytes (int): The maximum size of the JSON body of a request, before compression
+        max_batch_docs (int): The maximum number of documents per request
+        workers (int): The number of upload requests kept in flight. Raise it when uploads are bound by latency
+        on_batch (callable): Called in batch order with every batch and its response once it is uploaded, e.g. to
+            report progress
+        manifest (str | Path | UploadManifest): A checkpoint file of the acknowledged batches. Re-running an
+            interrupted upload with the same manifest skips what was already uploaded. See `UploadManifest`
+        dedup (DocDeduplicator): Drops documents whose content was already seen, in this upload or, with an on-disk
+            set, in previous ones. The documents are marked as sent once the whole upload succeeds. When resuming
+            with a manifest, the files are re-read from the start so that deduplication cuts the same batches
+        splitter (Splitter): Splits the documents into chunks, each uploaded as a document. See `Splitter`
+    """
+    assert workers >= 1, "workers must be >= 1"
+    compression = get_client().compression
+    files = [path if isinstance(path, FoundFile) else FoundFile.of(path) for path in paths]
+    if manifest is not None and not isinstance(manifest, UploadManifest):
+        manifest = UploadManifest(manifest)
+
+    first_index, resume_at = 0, None
+    if manifest is not None:
+        manifest.start(
+            {
+                "context": context,
+                "files": [_file_identity(file) for file in files],
+                "doc_name": doc_name,
+                "doc_text": doc_text,
+                "max_batch_bytes": max_batch_bytes,
+                "max_batch_docs": max_batch_docs,
+                "dedup": dedup is not None,
+                "splitter": None if splitter is None else [splitter.mode, splitter.size, splitter.overlap],
+            }
+        )
+        # Deduplication depends on every document before the resume point, and the chunks of a document can span
+        # batches, so with either the files are re-read from the start rather than skipped
+        if dedup is None and splitter is None:
+            first_index, resume_at = manifest.resume_point()
+
+    summary = UploadSummary()
+    if manifest is not None:
+        summary.skipped_batches = first_index
+        summary.skipped_docs = sum(manifest.acknowledged[index]["docs"] for index in range(first_index))
+
+    def positioned_docs() -> Iterator[Positioned]:
+        remaining = [file.path for file in files]
+        start = 0
+        if resume_at is not None:
+            resume_path, start = resume_at
+            remaining = remaining[[str(path) for path in remaining].index(resume_path) :]
+        for path in remaining:
+            yield from _read_positioned(path, doc_name, doc_text, start)
+            start = 0
+
+    docs = positioned_docs()
+    if dedup is not None:
+        deduplicator = dedup
+        duplicates_before = dedup.stats.duplicates
+
+        def unique(docs: Iterator[Positioned]) -> Iterator[Positioned]:
+            for positioned in docs:
+                if deduplicator.add(positioned[0]):
+                    yield positioned
+                summary.duplicates = deduplicator.stats.duplicates - duplicates_before
+
+        docs = unique(docs)
+
+    if splitter is not None:
+        docs = _split_positioned(docs, splitter)
+
+    batches = _batch_positioned(context, docs, max_batch_bytes, max_batch_docs, first_index)
+    if manifest is not None:
+        upload_manifest = manifest
+
+        def pending(batches: Iterator[DocBatch]) -> Iterator[DocBatch]:
+            for batch in batches:
+                if upload_manifest.is_acknowledged(batch):
+                    summary.skipped_batches += 1
+                    summary.skipped_docs += batch.docs
+                else:
+                    yield batch
+
+        batches = pending(batches)
+
+    def encode(batch: DocBatch) -> Tuple[DocBatch, EncodedBody]:
+        body = encode_body(batch.body, compression)
+        batch.sent = len(body.data)
+        return batch, body
+
+    def send(encoded: Tuple[DocBatch, EncodedBody]) -> Dict[str, str]:
+        batch, body = encoded
+        response = make_request("post", Route.contexts, body, headers={IDEMPOTENCY_HEADER: batch.sha256})
+        if manifest is not None:
+            manifest.record(batch)
+        return response
+
+    encoded_batches = map_ahead(encode, batches, thread_name_prefix="arcee-upload")
+    with _dedup_transaction(dedup):
+        for result in map_bounded(send, encoded_batches, concurrency=workers, max_pending=workers + 1):
+            if result.error is not None:
+                raise result.error
+            batch, response = result.item[0], cast(Dict[str, str], result.result)
+            summary.batches += 1
+            summary.docs += batch.docs
+            summary.bytes += batch.sent
+            summary.responses.append(response)
+            if on_batch is not None:
+                on_batch(batch, response)
+    return summary
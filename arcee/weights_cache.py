@@ -0,0 +1,186 @@
+"""A local content-addressed cache of downloaded model weights"""
+
+import os
+import shutil
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from time import time
+from typing import Any, Dict, List, Optional, Union
+
+DEFAULT_CACHE_DIR = "~/.cache/arcee/weights"
+
+# Seconds after which a file of the cache directory that is not indexed is considered left by a crash
+ORPHAN_GRACE_SECONDS = 3600
+
+
+@dataclass
+class CachedWeights:
+    """A weights file in a `WeightsCache`
+
+    Arguments:
+        kind: The type of model, one of "pretraining", "alignment", "retriever" or "merging"
+        name: The ID or name of the model
+        validator: The ETag, or else the Last-Modified date, the server sent for the file
+        sha256: The SHA-256 of the file, which is also its name in the cache
+        size: The size of the file in bytes
+        last_used: When the file was last downloaded or added, as a Unix timestamp
+        path: The file in the cache
+    """
+
+    kind: str
+    name: str
+    validator: str
+    sha256: str
+    size: int
+    last_used: float
+    path: Path
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Replaces `destination` with a hardlink to `source`, or a copy of it across file systems"""
+    temporary = destination.with_name(f".{destination.name}.{os.getpid()}.{threading.get_ident()}")
+    temporary.unlink(missing_ok=True)
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copyfile(source, temporary)
+    os.replace(temporary, destination)
+
+
+class WeightsCache:
+    """Downloaded weights kept on disk, so that downloading the same weights again is a hardlink instead of a transfer
+
+        cache = WeightsCache(max_bytes=200 << 30)
+        arcee.downloads.download_weights_file("alignment", "my-model", Path("my-model.tar.gz"), cache=cache)
+
+    Files are stored once per content, as `objects/<sha256>` in the cache directory, and indexed in an SQLite
+    database by model kind, ID or name, and the ETag (or else the Last-Modified date) the server sent for them. A
+    download with a cache looks up the validator of the server first: a hit is hardlinked to the destination, or
+    copied if the cache is on another file system, and a miss is added once downloaded. Hardlinked files share their
+    content with the cache, so write changes to a copy rather than to the downloaded file itself.
+
+    The cache can be shared by several processes. Once it grows larger than `max_bytes`, the least recently used
+    weights are evicted. Files already linked elsewhere are kept there.
+
+    Arguments:
+        path: The cache directory. Defaults to ARCEE_WEIGHTS_CACHE, or ~/.cache/arcee/weights
+        max_bytes: The maximum total size of the cached files. Unbounded if not given, see `prune`
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None, max_bytes: Optional[int] = None) -> None:
+        self.path = Path(path or os.getenv("ARCEE_WEIGHTS_CACHE") or DEFAULT_CACHE_DIR).expanduser()
+        self.max_bytes = max_bytes
+        self.objects = self.path / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path / "index.sqlite", check_same_thread=False, timeout=60)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS weights (kind TEXT, name TEXT, validator TEXT, sha256 TEXT, size INTEGER, "
+            "last_used REAL, PRIMARY KEY (kind, name, validator))"
+        )
+        self._db.commit()
+
+    def _entry(self, row: Any) -> CachedWeights:
+        kind, name, validator, sha256, size, last_used = row
+        return CachedWeights(kind, name, validator, sha256, size, last_used, self.objects / sha256)
+
+    def get(self, kind: str, name: str, validator: str) -> Optional[CachedWeights]:
+        """Returns the cached weights downloaded with this validator, and marks them as used"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM weights WHERE kind = ? AND name = ? AND validator = ?", (kind, name, validator)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = self._entry(row)
+            if not entry.path.exists():
+                # Removed from the cache directory by hand
+                self._db.execute("DELETE FROM weights WHERE sha256 = ?", (entry.sha256,))
+                self._db.commit()
+                return None
+            entry.last_used = time()
+            self._db.execute(
+                "UPDATE weights SET last_used = ? WHERE kind = ? AND name = ? AND validator = ?",
+                (entry.last_used, kind, name, validator),
+            )
+            self._db.commit()
+            return entry
+
+    def link(self, entry: CachedWeights, destination: Path) -> None:
+        """Puts the cached file at `destination`, as a hardlink unless it is on another file system"""
+        if destination.exists() and os.path.samefile(entry.path, destination):
+            return
+        _link_or_copy(entry.path, destination)
+
+    def add(self, kind: str, name: str, validator: str, sha256: str, source: Path) -> CachedWeights:
+        """Links a downloaded file into the cache, then evicts the least recently used files past `max_bytes`"""
+        blob = self.objects / sha256
+        if not blob.exists():
+            _link_or_copy(source, blob)
+        entry = CachedWeights(kind, name, validator, sha256, blob.stat().st_size, time(), blob)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO weights VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, name, validator, sha256, entry.size, entry.last_used),
+            )
+            self._db.commit()
+        if self.max_bytes is not None:
+            self.prune(self.max_bytes)
+        return entry
+
+    def entries(self) -> List[CachedWeights]:
+        """The cached weights, most recently used first"""
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM weights ORDER BY last_used DESC").fetchall()
+        return [self._entry(row) for row in rows]
+
+    def size(self) -> int:
+        """The total size of the cached files in bytes, counting files cached under several names once"""
+        return sum({entry.sha256: entry.size for entry in self.entries()}.values())
+
+    def prune(self, max_bytes: int = 0) -> List[CachedWeights]:
+        """Evicts the least recently used weights until the cache is at most `max_bytes`, and returns them
+
+        Files of the cache directory left unindexed for an hour, e.g. by a crash, are removed too.
+        """
+        with self._lock:
+            entries = [self._entry(row) for row in self._db.execute("SELECT * FROM weights ORDER BY last_used")]
+            references: Dict[str, int] = {}
+            for entry in entries:
+                references[entry.sha256] = references.get(entry.sha256, 0) + 1
+            total = sum({entry.sha256: entry.size for entry in entries}.values())
+
+            evicted = []
+            for entry in entries:
+                if total <= max_bytes:
+                    break
+                self._db.execute(
+                    "DELETE FROM weights WHERE kind = ? AND name = ? AND validator = ?",
+                    (entry.kind, entry.name, entry.validator),
+                )
+                evicted.append(entry)
+                references[entry.sha256] -= 1
+                if not references[entry.sha256]:
+                    del references[entry.sha256]
+                    entry.path.unlink(missing_ok=True)
+                    total -= entry.size
+            self._db.commit()
+
+            # Files being added by another process are linked a moment before they are indexed
+            orphaned_before = time() - ORPHAN_GRACE_SECONDS
+            for blob in self.objects.iterdir():
+                if blob.name not in references and blob.stat().st_ctime < orphaned_before:
+                    blob.unlink(missing_ok=True)
+        return evicted
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "WeightsCache":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
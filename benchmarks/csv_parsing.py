@@ -0,0 +1,70 @@
+"""Rows/sec of reading CSV and JSONL context files into upload documents
+
+Compares the row-by-row `DataFrame.iterrows()` conversion that `arcee retriever upload-context` used to do with the
+columnar readers of `arcee.uploads`. Run with
+
+    python benchmarks/csv_parsing.py --rows 50000
+"""
+
+import argparse
+import csv
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable
+
+import pandas as pd
+
+from arcee.uploads import read_docs
+
+
+def iterrows_docs(path: Path) -> Iterable[Dict[str, Any]]:
+    """The previous conversion: the whole file as a DataFrame, then one Series per row"""
+    df = pd.read_json(path, lines=True) if path.suffix == ".jsonl" else pd.read_csv(path)
+    return [{"doc_name": row.pop("name"), "doc_text": row.pop("text"), **dict(row)} for _, row in df.iterrows()]
+
+
+def columnar_docs(path: Path) -> Iterable[Dict[str, Any]]:
+    return read_docs(path)
+
+
+def write_files(folder: Path, rows: int) -> Dict[str, Path]:
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+    records = (
+        {"name": f"doc{i}", "text": text, "source": "benchmark", "year": 2000 + i % 20 if i % 7 else None}
+        for i in range(rows)
+    )
+    csv_path, jsonl_path = folder / "docs.csv", folder / "docs.jsonl"
+    with open(csv_path, "w", newline="") as csv_file, open(jsonl_path, "w") as jsonl_file:
+        writer = csv.DictWriter(csv_file, fieldnames=["name", "text", "source", "year"])
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            jsonl_file.write(json.dumps(record) + "\n")
+    return {"csv": csv_path, "jsonl": jsonl_path}
+
+
+def rows_per_second(reader: Callable[[Path], Iterable[Dict[str, Any]]], path: Path, rows: int) -> float:
+    started_at = perf_counter()
+    count = sum(1 for _ in reader(path))
+    assert count == rows, f"read {count} rows out of {rows}"
+    return rows / (perf_counter() - started_at)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = write_files(Path(folder), args.rows)
+        print(f"{'format':<8}{'iterrows rows/s':>18}{'columnar rows/s':>18}{'speedup':>10}")
+        for name, path in files.items():
+            before = rows_per_second(iterrows_docs, path, args.rows)
+            after = rows_per_second(columnar_docs, path, args.rows)
+            print(f"{name:<8}{before:>18,.0f}{after:>18,.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Throughput and memory of the upload paths against a local mock API
+
+Runs `upload_docs`, `UploadHandler.handle_doc_upload`, `upload_qa_pairs_from_csv` and
+`upload_hugging_face_dataset_qa_pairs` on generated corpora, and reports rows/s, MB/s (of request bodies received),
+the number of requests and the peak memory allocated by Python (tracemalloc). Run with
+
+    python -m benchmarks.ingest --rows 20000 --latency 0.02
+    python -m benchmarks.ingest --save-baseline  # record the results in benchmarks/baselines.json
+    python -m benchmarks.ingest --compare  # exit with an error if a result regressed against the baseline
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from importlib.util import find_spec
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import arcee
+from arcee.cli.handlers.upload import UploadHandler
+from arcee.client import ArceeClient
+from benchmarks.mock_api import MockServer
+
+BASELINES = Path(__file__).parent / "baselines.json"
+
+# A result regresses when its throughput drops, or its peak memory grows, by more than this fraction of the baseline
+TOLERANCE = 0.25
+
+TEXT = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore. " * 5
+
+# A scenario prepares its input in a folder, and returns the upload to measure
+Scenario = Callable[[Path, int, int], Callable[[], Any]]
+
+
+def _docs(rows: int) -> List[Dict[str, Any]]:
+    return [{"doc_name": f"doc{i}", "doc_text": TEXT, "source": "benchmark", "page": i} for i in range(rows)]
+
+
+def upload_docs(folder: Path, rows: int, workers: int) -> Callable[[], Any]:
+    batches = [_docs(rows)[start : start + 1000] for start in range(0, rows, 1000)]
+
+    def run() -> None:
+        for batch in batches:
+            arcee.upload_docs("benchmark", batch)
+
+    return run
+
+
+def handle_doc_upload(folder: Path, rows: int, workers: int) -> Callable[[], Any]:
+    # Imported ahead, so that importing the CSV reader is not timed
+    import pandas  # noqa: F401
+
+    # Half of the documents in .jsonl files, half in .csv files
+    for index in range(4):
+        path = folder / f"docs{index}.{'jsonl' if index % 2 else 'csv'}"
+        records = [{"name": f"doc{index}-{i}", "text": TEXT, "page": i} for i in range(rows // 4)]
+        with open(path, "w", newline="") as f:
+            if path.suffix == ".csv":
+                writer = csv.DictWriter(f, fieldnames=["name", "text", "page"])
+                writer.writeheader()
+                writer.writerows(records)
+            else:
+                f.writelines(json.dumps(record) + "\n" for record in records)
+
+    def run() -> None:
+        # Without the progress display of the CLI
+        with redirect_stdout(io.StringIO()):
+            UploadHandler.handle_doc_upload(
+                "benchmark", [folder], 8, "name", "text", max_batch_docs=1000, workers=workers
+            )
+
+    return run
+
+
+def upload_qa_pairs_from_csv(folder: Path, rows: int, workers: int) -> Callable[[], Any]:
+    path = folder / "qa.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["question", "answer"])
+        writer.writerows([f"Question {i}: {TEXT[:200]}?", TEXT] for i in range(rows))
+    return lambda: arcee.upload_qa_pairs_from_csv("benchmark", str(path), workers=workers)
+
+
+def upload_hugging_face_dataset_qa_pairs(folder: Path, rows: int, workers: int) -> Callable[[], Any]:
+    import datasets
+
+    messages = [
+        {"messages": [{"role": "user", "content": f"Question {i}?"}, {"role": "assistant", "content": TEXT}]}
+        for i in range(rows)
+    ]
+    datasets.disable_progress_bars()
+    datasets.DatasetDict({"train": datasets.Dataset.from_list(messages)}).save_to_disk(str(folder / "dataset"))
+    return lambda: arcee.upload_hugging_face_dataset_qa_pairs(
+        "benchmark", str(folder / "dataset"), "train", "chatml", workers=workers
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "upload_docs": upload_docs,
+    "handle_doc_upload": handle_doc_upload,
+    "upload_qa_pairs_from_csv": upload_qa_pairs_from_csv,
+    "upload_hugging_face_dataset_qa_pairs": upload_hugging_face_dataset_qa_pairs,
+}
+
+
+@dataclass
+class Result:
+    rows: int
+    seconds: float
+    requests: int
+    mb_sent: float
+    peak_mb: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.mb_sent / self.seconds
+
+
+def measure(scenario: Scenario, server: MockServer, rows: int, workers: int) -> Result:
+    """Times the scenario, then runs it again under tracemalloc, which slows it down, for its peak memory"""
+    # Every pass prepares its own input: `upload_docs` consumes the documents it sends
+    with tempfile.TemporaryDirectory() as folder:
+        run = scenario(Path(folder), rows, workers)
+        server.reset()
+        started_at = perf_counter()
+        run()
+        seconds = perf_counter() - started_at
+        requests, sent = server.requests, server.bytes
+
+    with tempfile.TemporaryDirectory() as folder:
+        run = scenario(Path(folder), rows, workers)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return Result(rows, seconds, requests, sent / 1e6, peak / 1e6)
+
+
+def regressions(name: str, result: Result, baseline: Dict[str, float]) -> List[str]:
+    found = []
+    if result.rows_per_second < baseline["rows_per_second"] * (1 - TOLERANCE):
+        found.append(f"{name}: {result.rows_per_second:,.0f} rows/s, baseline {baseline['rows_per_second']:,.0f}")
+    if result.peak_mb > baseline["peak_mb"] * (1 + TOLERANCE):
+        found.append(f"{name}: {result.peak_mb:,.1f} MB peak, baseline {baseline['peak_mb']:,.1f}")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="Documents or QA pairs per scenario")
+    parser.add_argument("--workers", type=int, default=4, help="Upload requests kept in flight")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every request")
+    parser.add_argument("--bandwidth", type=float, default=None, help="MB/s at which each request body is received")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Record the results in {BASELINES.name}")
+    parser.add_argument("--compare", action="store_true", help="Fail if a result regressed against the baseline")
+    args = parser.parse_args(argv)
+
+    names = args.scenario or list(SCENARIOS)
+    if "upload_hugging_face_dataset_qa_pairs" in names and not find_spec("datasets"):
+        print("Skipping upload_hugging_face_dataset_qa_pairs: datasets is not installed")
+        names.remove("upload_hugging_face_dataset_qa_pairs")
+
+    bandwidth = args.bandwidth * 1e6 if args.bandwidth else None
+    results = {}
+    print(f"{'scenario':<40}{'rows/s':>10}{'MB/s':>8}{'requests':>10}{'peak MB':>9}")
+    with MockServer(latency=args.latency, bandwidth=bandwidth) as server, ArceeClient(
+        api_key="benchmark", api_url=server.url, pool_maxsize=args.workers
+    ) as client, client.use():
+        for name in names:
+            result = measure(SCENARIOS[name], server, args.rows, args.workers)
+            results[name] = result
+            print(
+                f"{name:<40}{result.rows_per_second:>10,.0f}{result.mb_per_second:>8,.1f}"
+                f"{result.requests:>10}{result.peak_mb:>9,.1f}"
+            )
+
+    settings = {"rows": args.rows, "workers": args.workers, "latency": args.latency, "bandwidth": args.bandwidth}
+    if args.save_baseline:
+        baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {"settings": settings, "results": {}}
+        baselines["settings"] = settings
+        for name, result in results.items():
+            baselines["results"][name] = {
+                **{key: round(value, 3) for key, value in asdict(result).items()},
+                "rows_per_second": round(result.rows_per_second),
+                "mb_per_second": round(result.mb_per_second, 2),
+            }
+        BASELINES.write_text(json.dumps(baselines, indent=2) + "\n")
+
+    if args.compare:
+        baselines = json.loads(BASELINES.read_text())
+        if baselines["settings"] != settings:
+            print(f"Warning: baselines were recorded with {baselines['settings']}")
+        found = [
+            regression
+            for name, result in results.items()
+            if name in baselines["results"]
+            for regression in regressions(name, result, baselines["results"][name])
+        ]
+        for regression in found:
+            print(f"Regression: {regression}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""A local stand-in for the Arcee API with configurable latency and bandwidth, for benchmarks"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from types import TracebackType
+from typing import Any, Optional, Type
+
+# Request bodies are read in pieces of this size, so bandwidth is throttled smoothly
+READ_SIZE = 64 * 1024
+
+
+class MockServer:
+    """Accepts any request and replies `{}`, after `latency` seconds plus the time to receive the body at `bandwidth`
+
+        with MockServer(latency=0.05, bandwidth=50e6) as server:
+            ArceeClient(api_url=server.url)
+
+    Arguments:
+        latency: Seconds added to every request, as the round trip and processing time of the real API
+        bandwidth: Bytes per second at which each request body is received. Unlimited if not given
+    """
+
+    def __init__(self, latency: float = 0.0, bandwidth: Optional[float] = None) -> None:
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.bytes = 0
+
+    def _receive(self, handler: BaseHTTPRequestHandler) -> None:
+        remaining = int(handler.headers.get("Content-Length") or 0)
+        received = remaining
+        while remaining:
+            piece = handler.rfile.read(min(READ_SIZE, remaining))
+            remaining -= len(piece)
+            if self.bandwidth:
+                sleep(len(piece) / self.bandwidth)
+        sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            self.bytes += received
+
+    def _handler(self) -> Type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self) -> None:
+                server._receive(self)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            do_GET = do_POST = do_PUT = _handle
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "MockServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
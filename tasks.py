@@ -7,7 +7,7 @@ from invoke.context import Context
 PACKAGE_NAME = "arcee"
 VERSION_FILE = f"{PACKAGE_NAME}/__init__.py"
 # TODO: do only dalm
-SOURCES = " ".join(["arcee", "tests", "tasks.py"])
+SOURCES = " ".join(["arcee", "tests", "benchmarks", "tasks.py"])
 # TODO: Get this to 95
 PYTEST_FAIL_UNDER = 0
 
@@ -128,6 +128,24 @@ def test(ctx: Context) -> None:
     )
 
 
+@task
+def bench(ctx: Context, save_baseline: bool = False) -> None:
+    """bench
+
+    Run the upload benchmarks against a local mock API, and fail if a result regressed against
+    benchmarks/baselines.json.
+
+    Args:
+        ctx (Context): The invoke context.
+        save_baseline (bool, optional): Record the results as the new baselines instead. Defaults to False.
+    """
+    ctx.run(
+        f"python -m benchmarks.ingest {'--save-baseline' if save_baseline else '--compare'}",
+        pty=True,
+        echo=True,
+    )
+
+
 @task
 def build(ctx: Context) -> None:
     """build
@@ -0,0 +1,85 @@
+import json
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from arcee import config
+
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+@dataclass
+class RecordedRequest:
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+
+@dataclass
+class MockAPI:
+    """A local stand-in for the Arcee API. Replies with the request JSON unless `handler` is set"""
+
+    url: str = ""
+    requests: List[RecordedRequest] = field(default_factory=list)
+    handler: Optional[Callable[[RecordedRequest], Reply]] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def reply(self, request: RecordedRequest) -> Reply:
+        with self.lock:
+            self.requests.append(request)
+        if self.handler is not None:
+            return self.handler(request)
+        return (
+            200,
+            {"Content-Type": "application/json"},
+            json.dumps({"path": request.path, "body": request.json}).encode(),
+        )
+
+
+def _request_handler(api: MockAPI) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _handle(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            status, headers, payload = api.reply(RecordedRequest(self.command, self.path, dict(self.headers), body))
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            if "Content-Length" not in headers:
+                self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def api_server(monkeypatch: pytest.MonkeyPatch) -> Iterator[MockAPI]:
+    api = MockAPI()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _request_handler(api))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(config, "ARCEE_API_URL", api.url)
+    try:
+        yield api
+    finally:
+        server.shutdown()
+        server.server_close()
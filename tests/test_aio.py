@@ -0,0 +1,241 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from aiohttp import web
+
+import arcee.aio
+from arcee import config
+from arcee.chunking import Splitter
+from arcee.dedup import DocDeduplicator
+from arcee.embedding_store import EmbeddingStore
+
+
+@pytest.fixture
+def requests_seen() -> List[Dict[str, Any]]:
+    return []
+
+
+def _app(requests_seen: List[Dict[str, Any]]) -> web.Application:
+    async def handler(request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else None
+        requests_seen.append({"method": request.method, "path": request.path, "body": body, "headers": request.headers})
+        if request.path.endswith("/whoami"):
+            return web.json_response({"org": "my-org"})
+        if "models/status" in request.path:
+            return web.json_response({"id": "model-id", "status": "training_complete"})
+        if request.path.endswith("/embed"):
+            return web.json_response({"embedding": [1.0, float(len(body["query"]))]})  # type: ignore[index]
+        if request.path.endswith("/fail"):
+            return web.Response(status=500, text="boom")
+        if request.path.endswith("/partial"):
+            return web.Response(status=206, body=b"par", headers={"Content-Range": "bytes 0-2/10"})
+        return web.json_response({"path": request.path, "body": body})
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    return app
+
+
+def _run(requests_seen: List[Dict[str, Any]], coro_fn: Any) -> Any:
+    async def main() -> Any:
+        runner = web.AppRunner(_app(requests_seen))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        old_url = config.ARCEE_API_URL
+        config.ARCEE_API_URL = f"http://127.0.0.1:{port}"
+        try:
+            return await coro_fn()
+        finally:
+            config.ARCEE_API_URL = old_url
+            await arcee.aio.close()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_generate_concurrently_shares_session(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> List[Dict[str, str]]:
+        return await asyncio.gather(*(arcee.aio.generate("dep", query=f"q{i}") for i in range(50)))
+
+    results = _run(requests_seen, go)
+
+    assert [r["body"]["query"] for r in results] == [f"q{i}" for i in range(50)]  # type: ignore[index]
+    assert all(r["path"] == "/v2/deployment/generate" for r in requests_seen)
+    assert requests_seen[0]["headers"]["X-Token"] == config.ARCEE_API_KEY
+
+
+def test_current_org_and_dalm(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> Any:
+        org = await arcee.aio.get_current_org()
+        dalm = await arcee.aio.AsyncDALM.create("my-dalm")
+        retrieved = await dalm.retrieve("query", size=2)
+        return org, dalm.model_id, retrieved
+
+    org, model_id, retrieved = _run(requests_seen, go)
+
+    assert org == "my-org"
+    assert model_id == "model-id"
+    assert retrieved["body"]["size"] == 2
+
+
+def test_failed_request_raises(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> Any:
+        return await arcee.aio.api_handler.make_request("get", "fail")
+
+    with pytest.raises(Exception) as e:
+        _run(requests_seen, go)
+    assert "boom" in str(e.value)
+
+
+def test_partial_content_is_a_success(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> Any:
+        async with await arcee.aio.api_handler.nonjson_request("get", "partial", stream=True) as response:
+            return response.status, await response.read()
+
+    assert _run(requests_seen, go) == (206, b"par")
+
+
+def test_generate_many_keeps_order(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> List[Any]:
+        return [r async for r in arcee.aio.generate_many("dep", [f"q{i}" for i in range(30)], concurrency=4)]
+
+    results = _run(requests_seen, go)
+
+    assert [r.result["body"]["query"] for r in results] == [f"q{i}" for i in range(30)]
+
+
+def test_generate_stream() -> None:
+    async def handler(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in ["a", "b", "c"]:
+            await response.write(f'data: {{"token": "{token}"}}\n\n'.encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def go() -> Any:
+        app = web.Application()
+        app.router.add_post("/v2/deployment/generate", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        old_url = config.ARCEE_API_URL
+        config.ARCEE_API_URL = f"http://127.0.0.1:{port}"
+        try:
+            stream = await arcee.aio.generate("dep", query="q", stream=True)
+            return [token async for token in stream], stream.time_to_first_token
+        finally:
+            config.ARCEE_API_URL = old_url
+            await arcee.aio.close()
+            await runner.cleanup()
+
+    tokens, time_to_first_token = asyncio.run(go())
+
+    assert tokens == ["a", "b", "c"]
+    assert time_to_first_token is not None
+
+
+def test_upload_qa_pairs_from_csv_streams_batches(requests_seen: List[Dict[str, Any]], tmp_path: Path) -> None:
+    path = tmp_path / "qa.csv"
+    path.write_text("q,a\n" + "".join(f"question {i},answer {i}\n" for i in range(4500)) + "short\n")
+
+    async def go() -> Any:
+        return await arcee.aio.upload_qa_pairs_from_csv("qa", str(path), question_column="q", answer_column="a")
+
+    summary = _run(requests_seen, go)
+
+    assert (summary.uploaded, summary.skipped, summary.failed, summary.batches) == (4500, 1, 0, 3)
+    assert {r["path"] for r in requests_seen} == {"/v2/alignment/qaUpload"}
+    assert sorted(len(r["body"]["qa_pairs"]) for r in requests_seen) == [500, 2000, 2000]
+    assert {"question": "question 0", "answer": "answer 0"} in [r["body"]["qa_pairs"][0] for r in requests_seen]
+    assert "Idempotency-Key" not in requests_seen[0]["headers"]
+
+
+def test_upload_hugging_face_dataset_qa_pairs(requests_seen: List[Dict[str, Any]], tmp_path: Path) -> None:
+    datasets = pytest.importorskip("datasets")
+    rows = [
+        {"messages": [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]}
+        for i in range(2500)
+    ]
+    rows[0]["messages"] = rows[0]["messages"][:1]
+    datasets.Dataset.from_list(rows).save_to_disk(str(tmp_path / "saved"))
+
+    async def go() -> Any:
+        return await arcee.aio.upload_hugging_face_dataset_qa_pairs("qa", str(tmp_path / "saved"), "train", "chatml")
+
+    summary = _run(requests_seen, go)
+
+    assert (summary.uploaded, summary.skipped, summary.failed, summary.batches) == (2499, 1, 0, 2)
+    assert sorted(len(r["body"]["qa_pairs"]) for r in requests_seen) == [499, 2000]
+    assert {"question": "q1", "answer": "a1"} in [r["body"]["qa_pairs"][0] for r in requests_seen]
+
+
+def test_session_pool_limit(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> Any:
+        await arcee.aio.close()
+        session = arcee.aio.get_session(limit=3)
+        assert arcee.aio.get_session() is session
+        with pytest.raises(ValueError, match="close"):
+            arcee.aio.get_session(limit=4)
+        results = await asyncio.gather(*(arcee.aio.generate("dep", query=f"q{i}") for i in range(10)))
+        return session.connector.limit, len(results)  # type: ignore[union-attr]
+
+    assert _run(requests_seen, go) == (3, 10)
+
+
+def test_upload_docs_dedups_and_splits(requests_seen: List[Dict[str, Any]]) -> None:
+    def docs() -> List[Dict[str, str]]:
+        return [{"doc_name": "a", "doc_text": "0123456789"}, {"doc_name": "a", "doc_text": "0123456789"}]
+
+    async def go() -> Any:
+        with DocDeduplicator() as dedup:
+            first = await arcee.aio.upload_docs("ctx", docs(), dedup=dedup, splitter=Splitter("fixed", size=4))
+            second = await arcee.aio.upload_docs("ctx", docs(), dedup=dedup)
+            return first, second, dedup.stats.duplicates
+
+    first, second, duplicates = _run(requests_seen, go)
+
+    assert second == {}
+    assert duplicates == 3
+    assert len(requests_seen) == 1
+    assert [doc["document"] for doc in first["body"]["documents"]] == ["0123", "4567", "89"]
+
+
+def test_upload_docs_batches(requests_seen: List[Dict[str, Any]]) -> None:
+    batches = [[{"doc_name": f"doc{i}", "doc_text": "text"}] for i in range(6)]
+    batches.insert(3, [{"doc_name": "doc0", "doc_text": "text"}])
+
+    async def go() -> Any:
+        with DocDeduplicator() as dedup:
+            responses = await arcee.aio.upload_docs_batches("ctx", iter(batches), workers=3, dedup=dedup)
+            return responses, len(dedup)
+
+    responses, sent = _run(requests_seen, go)
+
+    assert [r["body"]["documents"][0]["name"] for r in responses] == [f"doc{i}" for i in range(6)]
+    assert sent == 6
+    assert {r["path"] for r in requests_seen} == {"/v2/contexts"}
+
+
+def test_download_weights_sends_headers(requests_seen: List[Dict[str, Any]]) -> None:
+    async def go() -> Any:
+        async with await arcee.aio.download_weights("merging", "model", headers={"Range": "bytes=0-9"}) as response:
+            return response.status
+
+    assert _run(requests_seen, go) == 200
+    assert requests_seen[0]["headers"]["Range"] == "bytes=0-9"
+
+
+def test_embed_with_store(requests_seen: List[Dict[str, Any]], tmp_path: Path) -> None:
+    async def go() -> Any:
+        with EmbeddingStore(tmp_path) as store:
+            return [await arcee.aio.embed("dep", query, store=store) for query in ["a", "bb", "a"]]
+
+    assert _run(requests_seen, go) == [{"embedding": [1.0, 1.0]}, {"embedding": [1.0, 2.0]}, {"embedding": [1.0, 1.0]}]
+    assert len(requests_seen) == 2
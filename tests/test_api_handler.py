@@ -1,8 +1,15 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from time import time
+from typing import Callable, Dict, List, Optional
 
 import pytest
+import requests
 
-from arcee.api_handler import retry_call
+from arcee.api_handler import make_request, retry_call
+from arcee.client import ArceeAPIError, ArceeClient
+from arcee.retry import IDEMPOTENCY_HEADER, RetryPolicy
+from tests.conftest import MockAPI, RecordedRequest, Reply
 
 
 def test_retry_call_no_args() -> None:
@@ -38,3 +45,80 @@ def test_retry_call_from_class() -> None:
     with pytest.raises(Exception) as e:
         t.tryit()
     assert str(e.value) == "foo"
+
+
+def test_retry_call_keeps_exception_type() -> None:
+    @retry_call(max_attempts=2, wait_sec=0.01)
+    def bad_func() -> None:
+        raise ValueError("bad value")
+
+    with pytest.raises(ValueError):
+        bad_func()
+
+
+FAST_RETRY = RetryPolicy(max_attempts=3, backoff_factor=0.001)
+
+
+def _flaky(statuses: List[int], headers: Optional[Dict[str, str]] = None) -> Callable[[RecordedRequest], Reply]:
+    remaining = list(statuses)
+
+    def handler(request: RecordedRequest) -> Reply:
+        status = remaining.pop(0) if remaining else 200
+        return status, headers or {}, b'{"ok": true}' if status == 200 else b"unavailable"
+
+    return handler
+
+
+def test_get_retried_on_transient_status(api_server: MockAPI) -> None:
+    api_server.handler = _flaky([503, 502])
+
+    assert make_request("get", "whoami", retry=FAST_RETRY) == {"ok": True}
+    assert len(api_server.requests) == 3
+
+
+def test_post_needs_idempotency_key(api_server: MockAPI) -> None:
+    api_server.handler = _flaky([503])
+    with pytest.raises(ArceeAPIError) as e:
+        make_request("post", "contexts", {}, retry=FAST_RETRY)
+    assert e.value.status_code == 503
+    assert len(api_server.requests) == 1
+
+    api_server.handler = _flaky([503])
+    make_request("post", "contexts", {}, headers={IDEMPOTENCY_HEADER: "batch-1"}, retry=FAST_RETRY)
+    assert len(api_server.requests) == 3
+
+
+def test_too_many_requests_honours_retry_after(api_server: MockAPI) -> None:
+    api_server.handler = _flaky([429], {"Retry-After": "0.2"})
+
+    t0 = time()
+    make_request("post", "contexts", {}, retry=FAST_RETRY)
+    assert time() - t0 >= 0.2
+    assert len(api_server.requests) == 2
+
+
+def test_last_error_chains_previous_attempts(api_server: MockAPI) -> None:
+    api_server.handler = _flaky([503, 503, 504])
+
+    with pytest.raises(ArceeAPIError) as e:
+        make_request("get", "whoami", retry=FAST_RETRY)
+    assert e.value.status_code == 504
+    assert isinstance(e.value.__cause__, ArceeAPIError)
+    assert e.value.__cause__.status_code == 503
+
+
+def test_connection_errors_keep_their_type() -> None:
+    client = ArceeClient(api_url="http://127.0.0.1:9", retry=FAST_RETRY)
+
+    with pytest.raises(requests.ConnectionError):
+        client.make_request("get", "whoami")
+
+
+def test_backoff() -> None:
+    policy = RetryPolicy(backoff_factor=1, backoff_max=5, jitter=False)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+    assert policy.backoff(1, retry_after="7") == 7
+    assert 0 <= RetryPolicy(backoff_factor=1).backoff(3) <= 4
+    in_a_minute = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 < policy.backoff(1, retry_after=format_datetime(in_a_minute, usegmt=True)) <= 60
@@ -0,0 +1,76 @@
+import threading
+import time
+from itertools import count, islice
+from typing import Dict, Iterator, List, Union
+
+import arcee
+from arcee.batch import map_bounded
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def test_results_keep_input_order_and_errors() -> None:
+    def func(i: int) -> int:
+        time.sleep(0.001 * (i % 5))
+        if i == 3:
+            raise ValueError("bad item")
+        return i * 2
+
+    results = list(map_bounded(func, range(20), concurrency=4))
+
+    assert [r.index for r in results] == list(range(20))
+    assert [r.result for r in results if r.ok] == [i * 2 for i in range(20) if i != 3]
+    assert isinstance(results[3].error, ValueError)
+    assert results[3].item == 3
+
+
+def test_concurrency_is_bounded() -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def func(i: int) -> int:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.005)
+        with lock:
+            in_flight -= 1
+        return i
+
+    list(map_bounded(func, range(40), concurrency=3))
+
+    assert peak <= 3
+
+
+def test_input_is_consumed_lazily() -> None:
+    consumed = 0
+
+    def items() -> Iterator[int]:
+        nonlocal consumed
+        for i in count():
+            consumed += 1
+            yield i
+
+    first = list(islice(map_bounded(lambda i: i, items(), concurrency=2), 5))
+
+    assert [r.result for r in first] == [0, 1, 2, 3, 4]
+    assert consumed <= 5 + 2 * 2
+
+
+def test_generate_many(api_server: MockAPI) -> None:
+    def handler(request: RecordedRequest) -> Reply:
+        body = request.json
+        if body["query"] == "fail":
+            return 500, {}, b"boom"
+        return 200, {}, f'{{"query": "{body["query"] or body["messages"][0]["content"]}"}}'.encode()
+
+    api_server.handler = handler
+    queries: List[Union[str, List[Dict[str, str]]]] = ["a", "fail", [{"role": "user", "content": "b"}]]
+
+    results = list(arcee.generate_many("dep", queries, concurrency=2, max_new_tokens=5))
+
+    assert results[0].result == {"query": "a"}
+    assert "boom" in str(results[1].error)
+    assert results[2].result == {"query": "b"}
+    assert all(r.json["max_new_tokens"] == 5 for r in api_server.requests)
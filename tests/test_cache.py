@@ -0,0 +1,94 @@
+import json
+import time
+
+import arcee
+from arcee.cache import ResponseCache
+from arcee.dalm import DALMFilter, filters_key
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def test_lru_eviction_and_stats() -> None:
+    cache = ResponseCache(max_entries=2, ttl=None)
+    cache.set(("retrieve", "dep", "a"), {"a": 1})
+    cache.set(("retrieve", "dep", "b"), {"b": 1})
+    assert cache.get(("retrieve", "dep", "a")) == {"a": 1}
+    cache.set(("retrieve", "dep", "c"), {"c": 1})
+
+    assert cache.get(("retrieve", "dep", "b")) is None
+    assert cache.get(("retrieve", "dep", "c")) == {"c": 1}
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (2, 1, 1, 2)
+
+
+def test_ttl_and_max_bytes() -> None:
+    cache = ResponseCache(ttl=0.01, max_bytes=50)
+    cache.set(("k",), "x" * 10)
+    time.sleep(0.02)
+    assert cache.get(("k",)) is None
+
+    cache.set(("big",), "x" * 100)
+    assert len(cache) == 0
+    cache.set(("a",), "x" * 20)
+    cache.set(("b",), "x" * 20)
+    cache.set(("c",), "x" * 20)
+    assert cache.stats.bytes <= 50
+    assert cache.get(("a",)) is None
+
+    # Sizes are counted in bytes: 10 characters of 4 bytes each do not fit in 30 bytes
+    cache = ResponseCache(max_bytes=30)
+    cache.set(("emoji",), "🙂" * 10)
+    assert len(cache) == 0
+    cache.set(("accents",), "é" * 10)
+    assert cache.get(("accents",)) == "é" * 10
+    assert cache.stats.bytes == 22
+
+
+def test_cached_responses_are_copies() -> None:
+    cache = ResponseCache()
+    cache.set(("k",), {"results": [1]})
+    cache.get(("k",))["results"].append(2)  # type: ignore[index]
+
+    assert cache.get(("k",)) == {"results": [1]}
+
+
+def test_filters_key_ignores_order() -> None:
+    a = DALMFilter(field_name="year", filter_type="strict_search", value="2024")  # type: ignore[arg-type]
+    b = {"field_name": "name", "filter_type": "fuzzy_search", "value": "doc"}
+
+    assert filters_key([a, b]) == filters_key([b, a]) == filters_key([b, a, b])
+    assert filters_key(None) == filters_key([]) == ()
+
+
+def test_retrieve_through_client_cache(api_server: MockAPI) -> None:
+    cache = ResponseCache()
+    client = arcee.ArceeClient(cache=cache)
+
+    with client.use():
+        first = arcee.api.retrieve("dep", "query")
+        second = arcee.api.retrieve("dep", "query")
+        arcee.api.retrieve("dep", "query", use_cache=False)
+        arcee.api.embed("dep", "query")
+        arcee.api.embed("dep", "query")
+
+    assert first == second
+    assert len(api_server.requests) == 3
+    assert cache.invalidate("dep") == 2
+    assert cache.invalidate("dep") == 0
+
+
+def test_dalm_retrieve_filters_hit_same_entry(api_server: MockAPI) -> None:
+    def handler(request: RecordedRequest) -> Reply:
+        if "models/status" in request.path:
+            return 200, {}, json.dumps({"id": "model-id", "status": "training_complete"}).encode()
+        return 200, {}, b'{"results": []}'
+
+    api_server.handler = handler
+    a = {"field_name": "year", "filter_type": "strict_search", "value": "2024"}
+    b = {"field_name": "name", "filter_type": "fuzzy_search", "value": "doc"}
+
+    with arcee.ArceeClient(cache=ResponseCache()).use():
+        dalm = arcee.DALM("my-dalm")
+        dalm.retrieve("query", filters=[a, b])  # type: ignore[list-item]
+        dalm.retrieve("query", filters=[b, a])  # type: ignore[list-item]
+
+    assert len(api_server.requests) == 2
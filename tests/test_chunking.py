@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+import arcee
+from arcee.chunking import Splitter, split_docs
+from arcee.uploads import upload_doc_files
+from tests.conftest import MockAPI
+
+TEXT = (
+    "The first paragraph. It has two sentences.\n\n"
+    "The second paragraph is a little longer! Does it have a question? Yes.\n\n" + "word " * 40 + "\n\nThe end."
+)
+
+
+@pytest.mark.parametrize("mode", ["fixed", "sentence", "paragraph"])
+def test_chunks_fit_and_cover_the_text(mode: str) -> None:
+    splitter = Splitter(mode, size=50)  # type: ignore[arg-type]
+    chunks = splitter.split_text(TEXT)
+    assert all(0 < len(chunk) <= 50 for chunk in chunks)
+    if mode == "fixed":
+        assert "".join(chunks) == TEXT
+    else:
+        assert " ".join(chunks).split() == TEXT.split()
+    assert Splitter(mode, size=len(TEXT)).split_text(TEXT) == [TEXT]  # type: ignore[arg-type]
+
+
+def test_sentence_and_paragraph_boundaries_with_overlap() -> None:
+    # Whole paragraphs are kept together, and the long one is cut between words
+    chunks = Splitter("paragraph", size=80).split_text(TEXT)
+    assert chunks[0] == "The first paragraph. It has two sentences."
+    assert chunks[1].startswith("The second paragraph is a little longer! Does it have a question? Yes.")
+    assert chunks[-1].endswith("word \n\nThe end.")
+    assert Splitter("sentence", size=70, overlap=25).split_text(TEXT)[:3] == [
+        "The first paragraph. It has two sentences.",
+        "It has two sentences.\n\nThe second paragraph is a little longer!",
+        "Does it have a question? Yes.\n\nword word word word word word word word",
+    ]
+    assert Splitter("fixed", size=10, overlap=4).split_text("abcdefghijklmnop") == ["abcdefghij", "ghijklmnop"]
+
+    with pytest.raises(ValueError, match="overlap"):
+        Splitter(size=10, overlap=10)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_split_docs_carries_metadata(processes: int) -> None:
+    docs: List[Dict[str, Any]] = [{"doc_name": f"doc{i}", "doc_text": TEXT, "source": i} for i in range(100)]
+    chunks = list(split_docs(docs, Splitter("paragraph", size=80, processes=processes)))
+    per_doc = len(Splitter("paragraph", size=80).split_text(TEXT))
+    assert len(chunks) == 100 * per_doc
+    assert chunks[per_doc] == {
+        "doc_name": "doc1",
+        "doc_text": "The first paragraph. It has two sentences.",
+        "source": 1,
+        "chunk_index": 0,
+        "chunk_count": per_doc,
+    }
+    assert [chunk["chunk_index"] for chunk in chunks[:per_doc]] == list(range(per_doc))
+
+
+def test_upload_with_splitter(api_server: MockAPI, tmp_path: Path) -> None:
+    splitter = Splitter("paragraph", size=80)
+    per_doc = len(splitter.split_text(TEXT))
+
+    book: Dict[str, Any] = {"doc_name": "book", "doc_text": TEXT, "year": 2020}
+    arcee.upload_docs("ctx", [book], splitter=splitter)
+    documents = api_server.requests[0].json["documents"]
+    assert len(documents) == per_doc
+    assert documents[1]["meta"] == {"year": 2020, "chunk_index": 1, "chunk_count": per_doc}
+
+    path = tmp_path / "books.jsonl"
+    path.write_text("".join(json.dumps({"name": f"book{i}", "text": TEXT}) + "\n" for i in range(5)))
+    api_server.requests.clear()
+    summary = upload_doc_files("ctx", [path], max_batch_docs=4, splitter=splitter, manifest=tmp_path / "manifest")
+    assert summary.docs == 5 * per_doc
+    assert all(len(r.json["documents"]) <= 4 for r in api_server.requests)
+
+
+def test_upload_files_with_split_processes_and_workers(api_server: MockAPI, tmp_path: Path) -> None:
+    splitter = Splitter("paragraph", size=80, processes=2)
+    per_doc = len(splitter.split_text(TEXT))
+    path = tmp_path / "books.jsonl"
+    path.write_text("".join(json.dumps({"name": f"book{i}", "text": TEXT}) + "\n" for i in range(200)))
+
+    summary = upload_doc_files("ctx", [path], max_batch_docs=50, splitter=splitter, workers=4)
+
+    assert summary.docs == 200 * per_doc
+    names = [doc["name"] for r in api_server.requests for doc in r.json["documents"]]
+    assert sorted(set(names)) == sorted(f"book{i}" for i in range(200))
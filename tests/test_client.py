@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pytest
+
+import arcee
+from arcee import config
+from arcee.client import ArceeClient, get_client
+from tests.conftest import MockAPI
+
+
+def test_default_client_follows_global_config(api_server: MockAPI) -> None:
+    arcee.api.retrieve("dep", "query")
+
+    assert api_server.requests[0].path == "/v2/deployment/retrieve"
+    assert api_server.requests[0].headers["X-Token"] == config.ARCEE_API_KEY
+
+
+def test_clients_keep_their_own_org(api_server: MockAPI) -> None:
+    first = ArceeClient(org="first-org", api_key="first-key")
+    second = ArceeClient(org="second-org", api_key="second-key")
+
+    first.make_request("get", "whoami")
+    with second.use():
+        assert get_client() is second
+        arcee.api.embed("dep", "query")
+    assert get_client() is not second
+
+    assert [r.headers["X-Arcee-Org"] for r in api_server.requests] == ["first-org", "second-org"]
+    assert [r.headers["X-Token"] for r in api_server.requests] == ["first-key", "second-key"]
+
+
+def test_client_shared_across_threads(api_server: MockAPI) -> None:
+    with ArceeClient(pool_maxsize=16, pool_block=True) as client:
+
+        def call(i: int) -> str:
+            with client.use():
+                return arcee.api.generate("dep", query=f"q{i}")["body"]["query"]  # type: ignore[index]
+
+        with ThreadPoolExecutor(16) as pool:
+            results: List[str] = list(pool.map(call, range(64)))
+
+    assert results == [f"q{i}" for i in range(64)]
+    assert len(api_server.requests) == 64
+
+
+def test_keep_alive_disabled(api_server: MockAPI) -> None:
+    ArceeClient(keep_alive=False).make_request("get", "whoami")
+
+    assert api_server.requests[0].headers["Connection"] == "close"
+
+
+def test_failed_request_raises(api_server: MockAPI) -> None:
+    api_server.handler = lambda request: (500, {}, b"boom")
+
+    with pytest.raises(Exception) as e:
+        ArceeClient().make_request("get", "whoami")
+    assert "boom" in str(e.value)
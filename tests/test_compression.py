@@ -0,0 +1,89 @@
+import gzip
+import json
+import threading
+from typing import Dict, Iterator, List
+
+import pytest
+
+import arcee
+from arcee.client import ArceeClient
+from arcee.compression import Compression, encode_ahead, encode_body
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def _decoded(request: RecordedRequest) -> Dict:
+    body = request.body
+    if request.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    elif request.headers.get("Content-Encoding") == "zstd":
+        import zstandard
+
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return json.loads(body)
+
+
+def _echo_decoded(request: RecordedRequest) -> Reply:
+    return 200, {"Content-Type": "application/json"}, json.dumps(_decoded(request)).encode()
+
+
+def test_encode_body_threshold() -> None:
+    compression = Compression("gzip", level=1, threshold=100)
+
+    small = encode_body({"a": "b"}, compression)
+    assert "Content-Encoding" not in small.headers
+    assert json.loads(small.data) == {"a": "b"}
+
+    body = {"text": "lorem ipsum " * 100}
+    large = encode_body(body, compression)
+    assert large.headers["Content-Encoding"] == "gzip"
+    assert len(large.data) < len(json.dumps(body))
+    assert json.loads(gzip.decompress(large.data)) == body
+    # Deterministic output, so retries resend the same bytes
+    assert encode_body(body, compression) == large
+
+
+def test_unknown_encoding() -> None:
+    with pytest.raises(ValueError):
+        Compression("brotli")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_client_compresses_bodies(api_server: MockAPI, encoding: str) -> None:
+    if encoding == "zstd":
+        pytest.importorskip("zstandard")
+    api_server.handler = _echo_decoded
+    docs = [{"doc_name": f"doc{i}", "doc_text": "some text " * 50} for i in range(10)]
+
+    with ArceeClient(compression=Compression(encoding)) as client, client.use():  # type: ignore[arg-type]
+        response = arcee.upload_docs("context", [dict(doc) for doc in docs])
+
+    request = api_server.requests[0]
+    assert request.headers["Content-Encoding"] == encoding
+    assert request.headers["Content-Type"] == "application/json"
+    assert int(request.headers["Content-Length"]) < len(json.dumps(response))
+    assert response["documents"][0] == {"name": "doc0", "document": "some text " * 50}  # type: ignore[index]
+
+
+def test_encode_ahead_overlaps_encoding_with_sending() -> None:
+    threads: List[str] = []
+
+    def bodies() -> Iterator[Dict[str, int]]:
+        for i in range(5):
+            threads.append(threading.current_thread().name)
+            yield {"batch": i}
+
+    encoded = [json.loads(body.data) for body in encode_ahead(bodies())]
+
+    assert encoded == [{"batch": i} for i in range(5)]
+    assert all(name.startswith("arcee-encode") for name in threads)
+
+
+def test_upload_docs_batches(api_server: MockAPI) -> None:
+    api_server.handler = _echo_decoded
+    batches = ([{"doc_name": f"doc{i}", "doc_text": "text"}] for i in range(3))
+
+    with ArceeClient(compression=Compression(threshold=0)) as client, client.use():
+        responses = arcee.upload_docs_batches("context", batches)
+
+    assert [r["documents"][0]["name"] for r in responses] == ["doc0", "doc1", "doc2"]  # type: ignore[index]
+    assert all(r.headers["Content-Encoding"] == "gzip" for r in api_server.requests)
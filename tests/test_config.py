@@ -0,0 +1,92 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pytest
+
+from arcee import config
+from arcee.client import ArceeClient
+from tests.conftest import MockAPI
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Points the configuration at a temporary file and restores the loaded configuration afterwards"""
+    conf_path = tmp_path / "config.json"
+    conf_path.write_text("{}")
+    monkeypatch.setenv("ARCEE_CONFIG_LOCATION", str(conf_path))
+    for key in config.DEFAULTS:
+        monkeypatch.delenv(key, raising=False)
+        monkeypatch.setattr(config, key, getattr(config, key))
+    monkeypatch.setattr(config, "_loaded", config.get_configuration())
+    yield conf_path
+    config.disable_hot_reload()
+
+
+def _write(conf_path: Path, values: Dict[str, str], mtime_ns: int) -> None:
+    conf_path.write_text(json.dumps(values))
+    os.utime(conf_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reload_reads_file_once(config_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write(config_file, {"ARCEE_API_KEY": "file-key", "ARCEE_ORG": "file-org"}, 1_000_000_000)
+    monkeypatch.setenv("ARCEE_ORG", "env-org")
+    reads = []
+    read_configuration_file = config.read_configuration_file
+
+    def counting_read(path: Path) -> Dict[str, str]:
+        reads.append(path)
+        return read_configuration_file(path)
+
+    monkeypatch.setattr(config, "read_configuration_file", counting_read)
+
+    loaded = config.reload()
+
+    assert len(reads) == 1
+    assert loaded.ARCEE_API_KEY == config.ARCEE_API_KEY == "file-key"
+    assert loaded.ARCEE_ORG == config.ARCEE_ORG == "env-org"
+    assert config.ARCEE_API_VERSION == "v2"
+    assert config.get_configuration() is loaded
+
+
+def test_reload_keeps_runtime_assignments(config_file: Path) -> None:
+    config.ARCEE_API_KEY = "assigned-key"
+    _write(config_file, {"ARCEE_API_KEY": "file-key", "ARCEE_ORG": "file-org"}, 1_000_000_000)
+
+    config.reload()
+
+    assert config.ARCEE_API_KEY == "assigned-key"
+    assert config.ARCEE_ORG == "file-org"
+
+
+def test_hot_reload_updates_live_client(config_file: Path, api_server: MockAPI) -> None:
+    _write(config_file, {"ARCEE_API_KEY": "old-key", "ARCEE_ORG": "old-org"}, 1_000_000_000)
+    config.reload()
+    config.enable_hot_reload(interval=0)
+    client = ArceeClient()
+    session = client.session
+
+    client.make_request("get", "whoami")
+    _write(config_file, {"ARCEE_API_KEY": "new-key", "ARCEE_ORG": "new-org"}, 2_000_000_000)
+    client.make_request("get", "whoami")
+
+    assert [r.headers["X-Token"] for r in api_server.requests] == ["old-key", "new-key"]
+    assert [r.headers["X-Arcee-Org"] for r in api_server.requests] == ["old-org", "new-org"]
+    assert client.session is session
+
+
+def test_hot_reload_keeps_configuration_on_invalid_file(config_file: Path) -> None:
+    _write(config_file, {"ARCEE_API_KEY": "old-key"}, 1_000_000_000)
+    config.reload()
+    config.enable_hot_reload(interval=0)
+
+    _write(config_file, {}, 2_000_000_000)
+    config_file.write_text('{"ARCEE_API_KEY": ')
+    assert not config.check_for_changes()
+    assert config.ARCEE_API_KEY == "old-key"
+
+    _write(config_file, {"ARCEE_API_KEY": "new-key"}, 3_000_000_000)
+    assert config.check_for_changes()
+    assert config.ARCEE_API_KEY == "new-key"
+    assert not config.check_for_changes()
@@ -0,0 +1,151 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+import arcee
+from arcee.dedup import DocDeduplicator, normalize_text
+from arcee.uploads import upload_doc_files
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def _uploaded_names(api_server: MockAPI) -> List[str]:
+    return [doc["name"] for r in api_server.requests for doc in r.json["documents"]]
+
+
+def test_dedup_keys() -> None:
+    dedup = DocDeduplicator()
+    docs: List[Dict[str, Any]] = [
+        {"doc_name": "a", "doc_text": "Hello  World"},
+        {"doc_name": "a", "doc_text": "Hello  World", "page": 2},
+        {"doc_name": "b", "doc_text": "Hello  World"},
+        {"doc_name": "a", "doc_text": "hello world"},
+    ]
+    assert [doc["doc_name"] for doc in dedup.filter(docs)] == ["a", "b", "a"]
+    assert (dedup.stats.unique, dedup.stats.duplicates) == (3, 1)
+
+    assert normalize_text(" Ｈello\tWORLD \n") == "hello world"
+    assert len(list(DocDeduplicator(normalize=True).filter(docs))) == 2
+    assert len(list(DocDeduplicator(normalize=True, include_name=False).filter(docs))) == 1
+
+
+def test_in_memory_keys_move_to_a_temporary_file_past_the_limit() -> None:
+    docs = [{"doc_name": str(i), "doc_text": "text"} for i in range(5)]
+    with DocDeduplicator(max_memory_keys=3) as dedup:
+        assert len(list(dedup.filter(docs[:2]))) == 2
+        dedup.commit()
+        assert len(list(dedup.filter(docs))) == 3
+        assert dedup._db is not None and not dedup._committed and not dedup._pending
+        assert len(dedup) == 2
+
+        # Pending keys moved along with the committed ones
+        dedup.rollback()
+        assert len(list(dedup.filter(docs))) == 3
+        dedup.commit()
+        assert len(dedup) == 5
+        assert list(dedup.filter(docs)) == []
+        assert (dedup.stats.unique, dedup.stats.duplicates) == (8, 9)
+
+
+def test_upload_docs_skips_duplicates(api_server: MockAPI) -> None:
+    def docs(count: int) -> List[Dict[str, str]]:
+        # `upload_docs` consumes the documents it sends
+        return [{"doc_name": f"doc{i % 3}", "doc_text": f"text {i % 3}"} for i in range(count)]
+
+    dedup = DocDeduplicator()
+    arcee.upload_docs("ctx", docs(6), dedup=dedup)
+    assert _uploaded_names(api_server) == ["doc0", "doc1", "doc2"]
+    assert (len(dedup), dedup.stats.duplicates) == (3, 3)
+
+    # Nothing new: no request is sent
+    assert arcee.upload_docs("ctx", docs(2), dedup=dedup) == {}
+    assert len(api_server.requests) == 1
+
+    responses = arcee.upload_docs_batches(
+        "ctx", [docs(2), [*docs(2), {"doc_name": "new", "doc_text": "x"}]], dedup=dedup
+    )
+    assert len(responses) == len(api_server.requests) - 1 == 1
+    assert _uploaded_names(api_server)[3:] == ["new"]
+
+
+def test_failed_upload_is_not_marked_as_sent(api_server: MockAPI, tmp_path: Path) -> None:
+    store = tmp_path / "ctx.dedup"
+
+    def fail(request: RecordedRequest) -> Reply:
+        return 400, {}, b"bad request"
+
+    api_server.handler = fail
+    with DocDeduplicator(store) as dedup, pytest.raises(Exception, match="bad request"):
+        arcee.upload_docs("ctx", [{"doc_name": f"doc{i}", "doc_text": "text"} for i in range(3)], dedup=dedup)
+    api_server.handler = None
+    with DocDeduplicator(store) as dedup:
+        assert len(dedup) == 0
+        arcee.upload_docs("ctx", [{"doc_name": f"doc{i}", "doc_text": "text"} for i in range(3)], dedup=dedup)
+        assert len(dedup) == 3
+
+
+def test_incremental_upload_with_store(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "docs.jsonl"
+    store = tmp_path / "ctx.dedup"
+    rows = [{"name": f"doc{i}", "text": f"text {i}"} for i in range(10)]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows + rows[:4]))
+
+    with DocDeduplicator(store) as dedup:
+        summary = upload_doc_files("ctx", [path], max_batch_docs=3, dedup=dedup)
+    assert (summary.docs, summary.duplicates) == (10, 4)
+    assert _uploaded_names(api_server) == [f"doc{i}" for i in range(10)]
+
+    rows[2]["text"] = "changed"
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows + [{"name": "doc10", "text": "new"}]))
+    api_server.requests.clear()
+    with DocDeduplicator(store) as dedup:
+        summary = upload_doc_files("ctx", [path], max_batch_docs=3, dedup=dedup)
+    assert (summary.docs, summary.duplicates) == (2, 9)
+    assert _uploaded_names(api_server) == ["doc2", "doc10"]
+
+
+def test_resume_with_dedup_and_manifest(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "docs.jsonl"
+    rows = [{"name": f"doc{i % 12}", "text": f"text {i % 12}"} for i in range(20)]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    store, manifest = tmp_path / "ctx.dedup", tmp_path / "upload.manifest"
+
+    def fail_from_third_batch(request: RecordedRequest) -> Reply:
+        if len(api_server.requests) >= 3:
+            return 500, {}, b"boom"
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    api_server.handler = fail_from_third_batch
+    with DocDeduplicator(store) as dedup, pytest.raises(Exception, match="boom"):
+        upload_doc_files("ctx", [path], max_batch_docs=4, manifest=manifest, dedup=dedup)
+
+    api_server.requests.clear()
+    api_server.handler = None
+    with DocDeduplicator(store) as dedup:
+        summary = upload_doc_files("ctx", [path], max_batch_docs=4, manifest=manifest, dedup=dedup)
+    assert (summary.skipped_batches, summary.batches, summary.duplicates) == (2, 1, 8)
+    assert _uploaded_names(api_server) == ["doc8", "doc9", "doc10", "doc11"]
+
+
+def test_cli_upload_closes_the_store_when_it_fails(
+    api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from arcee.cli.commands.retriever import upload_context
+    from arcee.cli.errors import ArceeException
+
+    closed: List[DocDeduplicator] = []
+    close = DocDeduplicator.close
+
+    def record_close(dedup: DocDeduplicator) -> None:
+        closed.append(dedup)
+        close(dedup)
+
+    monkeypatch.setattr(DocDeduplicator, "close", record_close)
+    api_server.handler = lambda request: (400, {}, b"bad request")
+    path = tmp_path / "docs.jsonl"
+    path.write_text(json.dumps({"name": "a", "text": "x"}) + "\n")
+
+    with pytest.raises(ArceeException, match="bad request"):
+        upload_context("ctx", file=[path], dedup_store=tmp_path / "store.dedup")
+    assert len(closed) == 1
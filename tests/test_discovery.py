@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from arcee.discovery import FoundFile, discover_files
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for name in ["b.jsonl", "a.txt", "raw/c.csv", "raw/deep/d.jsonl", "raw/deep/e.log", ".git/config", "z/y/x.txt"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(name)
+    return tmp_path
+
+
+def _relative(files: List[FoundFile], root: Path) -> List[str]:
+    return [file.path.relative_to(root).as_posix() for file in files]
+
+
+def test_discover_files_recursively_in_stable_order(tree: Path) -> None:
+    files = discover_files([tree], workers=4)
+    assert _relative(files, tree) == [
+        ".git/config",
+        "a.txt",
+        "b.jsonl",
+        "raw/c.csv",
+        "raw/deep/d.jsonl",
+        "raw/deep/e.log",
+        "z/y/x.txt",
+    ]
+    assert files[1] == FoundFile.of(tree / "a.txt")
+    assert files[1].size == len("a.txt")
+
+    assert _relative(discover_files([tree], recursive=False), tree) == ["a.txt", "b.jsonl"]
+
+
+def test_discover_files_filters(tree: Path) -> None:
+    assert _relative(discover_files([tree], include=["*.jsonl", "*.csv"]), tree) == [
+        "b.jsonl",
+        "raw/c.csv",
+        "raw/deep/d.jsonl",
+    ]
+    assert _relative(discover_files([tree], include=["raw/*.csv"]), tree) == ["raw/c.csv"]
+    assert _relative(discover_files([tree], exclude=[".git", "deep", "*.txt"]), tree) == ["b.jsonl", "raw/c.csv"]
+
+    # Files given directly are listed whatever the patterns, and only once
+    files = discover_files([tree / "raw" / "deep" / "e.log", tree / "raw"], include=["*.csv"])
+    assert _relative(files, tree) == ["raw/c.csv", "raw/deep/e.log"]
+    assert len(discover_files([tree / "a.txt", tree], recursive=False)) == 2
+
+    with pytest.raises(FileNotFoundError):
+        discover_files([tree / "missing"])
+
+
+def test_discover_files_lists_directories_in_a_symlink_loop_once(tree: Path) -> None:
+    (tree / "raw" / "deep" / "up").symlink_to("../..", target_is_directory=True)
+    files = discover_files([tree], workers=4)
+    assert _relative(files, tree) == [
+        ".git/config",
+        "a.txt",
+        "b.jsonl",
+        "raw/c.csv",
+        "raw/deep/d.jsonl",
+        "raw/deep/e.log",
+        "z/y/x.txt",
+    ]
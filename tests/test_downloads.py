@@ -0,0 +1,371 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from arcee import downloads
+from arcee.cli.errors import ArceeException
+from arcee.cli.handlers.weights import WeightsDownloadHandler
+from arcee.client import ArceeAPIError
+from arcee.downloads import (
+    BandwidthLimit,
+    WeightsDownload,
+    download_weights_file,
+    download_weights_files,
+    extract_weights,
+    read_weights_manifest,
+)
+from arcee.retry import RetryPolicy
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+WEIGHTS = os.urandom(100_000)
+
+FAST_RETRY = RetryPolicy(backoff_factor=0.01)
+
+
+def _serve_ranges(request: RecordedRequest, weights: bytes = WEIGHTS, etag: Optional[str] = None) -> Reply:
+    match = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+    headers = {"Content-Type": "application/gzip", **({"ETag": etag} if etag else {})}
+    if match is None or request.headers.get("If-Range", etag) != etag:
+        return 200, headers, weights
+    first, last = int(match.group(1)), min(int(match.group(2) or len(weights)), len(weights) - 1)
+    headers.update({"Accept-Ranges": "bytes", "Content-Range": f"bytes {first}-{last}/{len(weights)}"})
+    return 206, headers, weights[first : last + 1]
+
+
+def test_download_weights_in_ranges(api_server: MockAPI, tmp_path: Path) -> None:
+    api_server.handler = _serve_ranges
+    progress = []
+    summary = download_weights_file(
+        "alignment",
+        "my-model",
+        tmp_path / "weights.tar.gz",
+        connections=4,
+        part_size=16_384,
+        on_progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert (tmp_path / "weights.tar.gz").read_bytes() == WEIGHTS
+    assert summary.bytes == len(WEIGHTS)
+    assert summary.connections == 4
+    assert len(api_server.requests) == 7
+    assert {r.path for r in api_server.requests} == {"/v2/alignment/my-model/weights"}
+    assert sorted(r.headers["Range"] for r in api_server.requests)[:2] == ["bytes=0-16383", "bytes=16384-32767"]
+    assert progress[-1] == (len(WEIGHTS), len(WEIGHTS))
+
+
+def test_download_weights_without_range_support(api_server: MockAPI, tmp_path: Path) -> None:
+    # The server ignores the Range header and sends the whole file
+    api_server.handler = lambda request: (200, {"Content-Type": "application/gzip"}, WEIGHTS)
+    summary = download_weights_file("merging", "my-model", tmp_path / "weights.tar.gz", part_size=16_384)
+
+    assert (tmp_path / "weights.tar.gz").read_bytes() == WEIGHTS
+    assert summary.connections == 1
+    assert len(api_server.requests) == 1
+
+
+def test_failed_download_removes_the_file(api_server: MockAPI, tmp_path: Path) -> None:
+    def handler(request: RecordedRequest) -> Reply:
+        if request.headers["Range"].startswith("bytes=49152-"):
+            return 500, {}, b"Internal error"
+        return _serve_ranges(request)
+
+    api_server.handler = handler
+    with pytest.raises(ArceeAPIError):
+        download_weights_file("retriever", "my-model", tmp_path / "weights.tar.gz", connections=2, part_size=16_384)
+    assert not (tmp_path / "weights.tar.gz").exists()
+
+
+def test_cli_download_handler(api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    api_server.handler = _serve_ranges
+    monkeypatch.chdir(tmp_path)
+    WeightsDownloadHandler.handle_weights_download("pretraining", "my-model", connections=2)
+    assert (tmp_path / "my-model.tar.gz").read_bytes() == WEIGHTS
+
+    archive = _archive(MODEL_FILES)
+    api_server.handler = lambda request: _serve_ranges(request, archive)
+    WeightsDownloadHandler.handle_weights_download("pretraining", "my-model", extract=tmp_path / "models")
+    assert (tmp_path / "models" / "my-model" / "config.json").read_bytes() == MODEL_FILES["my-model/config.json"]
+
+    api_server.handler = lambda request: (404, {}, b"Not found")
+    with pytest.raises(ArceeException, match="Error downloading pretraining weights"):
+        WeightsDownloadHandler.handle_weights_download("pretraining", "missing", tmp_path / "missing.tar.gz")
+
+
+def test_dropped_connection_resumes_from_the_last_byte(
+    api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(downloads, "CHUNK_SIZE", 4096)
+    dropped: List[str] = []
+
+    def handler(request: RecordedRequest) -> Reply:
+        status, headers, body = _serve_ranges(request, etag='"v1"')
+        if request.headers["Range"] == "bytes=16384-32767" and not dropped:
+            # Announce the whole range, send half of it and close the connection
+            dropped.append(request.headers["Range"])
+            return status, {**headers, "Content-Length": str(len(body)), "Connection": "close"}, body[:8192]
+        return status, headers, body
+
+    api_server.handler = handler
+    summary = download_weights_file(
+        "alignment", "my-model", tmp_path / "weights.tar.gz", part_size=16_384, retry=FAST_RETRY
+    )
+
+    assert (tmp_path / "weights.tar.gz").read_bytes() == WEIGHTS
+    assert summary.sha256 == hashlib.sha256(WEIGHTS).hexdigest()
+    assert summary.retries == 1
+    assert summary.bytes == len(WEIGHTS)
+    resumed = [r for r in api_server.requests if r.headers["Range"] == "bytes=24576-32767"]
+    assert len(resumed) == 1 and resumed[0].headers["If-Range"] == '"v1"'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["weights.tar.gz"]
+
+
+def test_interrupted_download_resumes_missing_ranges(api_server: MockAPI, tmp_path: Path) -> None:
+    def failing(request: RecordedRequest) -> Reply:
+        if request.headers["Range"] in ("bytes=49152-65535", "bytes=81920-98303"):
+            return 500, {}, b"Internal error"
+        return _serve_ranges(request, etag='"v1"')
+
+    api_server.handler = failing
+    with pytest.raises(ArceeAPIError):
+        download_weights_file("alignment", "my-model", tmp_path / "weights.tar.gz", part_size=16_384)
+    assert not (tmp_path / "weights.tar.gz").exists()
+    assert (tmp_path / "weights.tar.gz.part").exists() and (tmp_path / "weights.tar.gz.progress").exists()
+
+    api_server.handler = lambda request: _serve_ranges(request, etag='"v1"')
+    api_server.requests.clear()
+    summary = download_weights_file("alignment", "my-model", tmp_path / "weights.tar.gz", part_size=1_000_000)
+
+    assert (tmp_path / "weights.tar.gz").read_bytes() == WEIGHTS
+    assert sorted(r.headers["Range"] for r in api_server.requests) == ["bytes=49152-65535", "bytes=81920-98303"]
+    assert all(r.headers["If-Range"] == '"v1"' for r in api_server.requests)
+    assert summary.resumed_bytes + summary.bytes == len(WEIGHTS)
+    assert summary.bytes == 2 * 16_384
+    assert summary.sha256 == hashlib.sha256(WEIGHTS).hexdigest()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["weights.tar.gz"]
+
+
+def test_interrupted_download_of_a_changed_file_starts_over(api_server: MockAPI, tmp_path: Path) -> None:
+    def failing(request: RecordedRequest) -> Reply:
+        if request.headers["Range"] == "bytes=49152-65535":
+            return 500, {}, b"Internal error"
+        return _serve_ranges(request, etag='"v1"')
+
+    api_server.handler = failing
+    with pytest.raises(ArceeAPIError):
+        download_weights_file("alignment", "my-model", tmp_path / "weights.tar.gz", part_size=16_384)
+
+    new_weights = os.urandom(50_000)
+    api_server.handler = lambda request: _serve_ranges(request, new_weights, etag='"v2"')
+    summary = download_weights_file("alignment", "my-model", tmp_path / "weights.tar.gz", part_size=16_384)
+
+    assert (tmp_path / "weights.tar.gz").read_bytes() == new_weights
+    assert summary.resumed_bytes == 0
+
+
+def _archive(files: Dict[str, bytes], links: Optional[Dict[str, str]] = None) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+        for name, target in (links or {}).items():
+            info = tarfile.TarInfo(name)
+            info.type, info.linkname = tarfile.SYMTYPE, target
+            tar.addfile(info)
+    return buffer.getvalue()
+
+
+MODEL_FILES = {
+    "my-model/config.json": b'{"architectures": ["MistralForCausalLM"]}',
+    "my-model/model.safetensors": os.urandom(200_000),
+}
+
+
+def test_extract_weights_while_downloading(
+    api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(downloads, "CHUNK_SIZE", 4096)
+    archive = _archive(MODEL_FILES, links={"my-model/weights": "model.safetensors"})
+    dropped: List[str] = []
+
+    def handler(request: RecordedRequest) -> Reply:
+        status, headers, body = _serve_ranges(request, archive, etag='"v1"')
+        if not dropped:
+            # Close the connection halfway through the archive, to be resumed with a range
+            dropped.append("")
+            return status, {**headers, "Content-Length": str(len(body)), "Connection": "close"}, body[: len(body) // 2]
+        return status, headers, body
+
+    api_server.handler = handler
+    summary = extract_weights("merging", "my-model", tmp_path / "models", retry=FAST_RETRY)
+
+    for name, content in MODEL_FILES.items():
+        assert (tmp_path / "models" / name).read_bytes() == content
+    assert (tmp_path / "models" / "my-model" / "weights").resolve() == (
+        tmp_path / "models" / "my-model" / "model.safetensors"
+    ).resolve()
+    assert summary.files == 2
+    assert summary.retries == 1
+    assert summary.bytes == len(archive)
+    assert api_server.requests[1].headers["Range"].startswith("bytes=")
+    assert api_server.requests[1].headers["If-Range"] == '"v1"'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["models"]
+
+
+@pytest.mark.parametrize(
+    "files, links",
+    [
+        ({"../evil.txt": b"evil"}, {}),
+        ({"/tmp/evil.txt": b"evil"}, {}),
+        ({}, {"my-model/passwd": "../../../etc/passwd"}),
+    ],
+)
+def test_extract_weights_refuses_paths_outside_the_directory(
+    api_server: MockAPI, tmp_path: Path, files: Dict[str, bytes], links: Dict[str, str]
+) -> None:
+    archive = _archive({"my-model/config.json": b"{}", **files}, links)
+    api_server.handler = lambda request: (200, {"Content-Type": "application/gzip"}, archive)
+    with pytest.raises(ValueError, match="Refusing to extract"):
+        extract_weights("alignment", "my-model", tmp_path / "models")
+    assert not (tmp_path / "evil.txt").exists()
+    assert not (tmp_path / "models" / "my-model" / "passwd").exists()
+
+
+def _hash_interleaved(hasher: downloads._RangeHasher, ranges: List[downloads.ByteRange]) -> None:
+    """Feeds the chunks of the ranges in reverse order, one chunk of every range at a time"""
+    offsets = [start for start, _ in ranges]
+    while any(offsets[i] <= end for i, (_, end) in enumerate(ranges)):
+        for i in reversed(range(len(ranges))):
+            if offsets[i] <= ranges[i][1]:
+                chunk = WEIGHTS[offsets[i] : min(offsets[i] + 4096, ranges[i][1] + 1)]
+                hasher.chunk(ranges[i], offsets[i], chunk)
+                offsets[i] += len(chunk)
+                if offsets[i] > ranges[i][1]:
+                    hasher.written(ranges[i])
+
+
+def test_range_hasher_hashes_chunks_as_they_arrive(tmp_path: Path) -> None:
+    ranges = downloads._byte_ranges(0, len(WEIGHTS), 16_384)
+
+    # Ranges received out of order are kept in memory, and never read back from the file, which does not exist
+    hasher = downloads._RangeHasher(tmp_path / "missing.part", ranges, set())
+    _hash_interleaved(hasher, ranges)
+    assert hasher.hexdigest() == hashlib.sha256(WEIGHTS).hexdigest()
+
+    # Ranges that do not fit in memory are read back once written
+    (tmp_path / "weights.part").write_bytes(WEIGHTS)
+    hasher = downloads._RangeHasher(tmp_path / "weights.part", ranges, set(), buffer_bytes=20_000)
+    _hash_interleaved(hasher, ranges)
+    assert hasher.hexdigest() == hashlib.sha256(WEIGHTS).hexdigest()
+
+
+def test_download_checks_the_sha256_sent_by_the_server(api_server: MockAPI, tmp_path: Path) -> None:
+    digest = base64.b64encode(hashlib.sha256(WEIGHTS).digest()).decode()
+
+    def handler(request: RecordedRequest) -> Reply:
+        status, headers, body = _serve_ranges(request, etag='"v1"')
+        return status, {**headers, "Repr-Digest": f"sha-256=:{digest}:"}, body
+
+    api_server.handler = handler
+    summary = download_weights_file("alignment", "my-model", tmp_path / "weights.tar.gz", part_size=16_384)
+    assert summary.sha256 == hashlib.sha256(WEIGHTS).hexdigest()
+
+    digest = base64.b64encode(hashlib.sha256(b"other weights").digest()).decode()
+    with pytest.raises(IOError, match="SHA-256"):
+        download_weights_file("alignment", "my-model", tmp_path / "other.tar.gz", part_size=16_384)
+    assert not (tmp_path / "other.tar.gz").exists()
+    assert not (tmp_path / "other.tar.gz.part").exists() and not (tmp_path / "other.tar.gz.progress").exists()
+
+
+def _serve_models(request: RecordedRequest) -> Reply:
+    if request.path == "/v2/alignment/my-model/weights":
+        return _serve_ranges(request, etag='"v1"')
+    if request.path == "/v2/merging/my-merge/weights":
+        return _serve_ranges(request, _archive(MODEL_FILES), etag='"v1"')
+    return 404, {}, b"Not found"
+
+
+def test_download_several_models(api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(downloads, "CHUNK_SIZE", 4096)
+    api_server.handler = _serve_models
+    manifest = tmp_path / "models.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"kind": "alignment", "name": "my-model", "path": str(tmp_path / "my-model.tar.gz")},
+                {"kind": "retriever", "name": "missing", "path": str(tmp_path / "missing.tar.gz")},
+                {"kind": "merging", "name": "my-merge", "path": str(tmp_path / "merged"), "extract": True},
+            ]
+        )
+    )
+    models = read_weights_manifest(manifest)
+    assert models[2] == WeightsDownload("merging", "my-merge", tmp_path / "merged", extract=True)
+
+    progress: Dict[str, int] = {}
+    started_at = time.perf_counter()
+    results = download_weights_files(
+        models,
+        concurrency=3,
+        max_bytes_per_second=500_000,
+        on_progress=lambda item, done, total: progress.update({item.id_or_name: done}),
+    )
+
+    assert [result.item.id_or_name for result in results] == ["my-model", "missing", "my-merge"]
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, ArceeAPIError) and results[1].error.status_code == 404
+    assert (tmp_path / "my-model.tar.gz").read_bytes() == WEIGHTS
+    assert (tmp_path / "merged" / "my-model" / "config.json").read_bytes() == MODEL_FILES["my-model/config.json"]
+    assert results[2].result is not None and results[2].result.files == 2
+    assert progress["my-model"] == len(WEIGHTS)
+    # Both downloads shared the cap, past its initial burst of one chunk
+    total = len(WEIGHTS) + len(_archive(MODEL_FILES))
+    assert time.perf_counter() - started_at >= 0.9 * (total - 4096) / 500_000
+
+
+def test_bandwidth_limit_spreads_chunks_over_time() -> None:
+    limit = BandwidthLimit(1_000_000, burst=0)
+    started_at = time.perf_counter()
+    for _ in range(5):
+        limit.acquire(100_000)
+    assert time.perf_counter() - started_at >= 0.45
+
+
+@pytest.mark.parametrize(
+    "manifest, error",
+    [
+        ({"kind": "alignment", "name": "my-model"}, "should contain a list"),
+        ([{"name": "my-model"}], "should be an object with a kind and a name"),
+        ([{"kind": "sft", "name": "my-model"}], "Unknown kind of model 'sft'"),
+    ],
+)
+def test_read_invalid_manifest(tmp_path: Path, manifest: object, error: str) -> None:
+    (tmp_path / "models.json").write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match=error):
+        read_weights_manifest(tmp_path / "models.json")
+
+
+def test_cli_bulk_download_handler(api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    api_server.handler = _serve_models
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models.json").write_text(
+        json.dumps(
+            [{"kind": "alignment", "name": "my-model"}, {"kind": "merging", "name": "my-merge", "extract": True}]
+        )
+    )
+    WeightsDownloadHandler.handle_bulk_download(tmp_path / "models.json", concurrency=2)
+    assert (tmp_path / "my-model.tar.gz").read_bytes() == WEIGHTS
+    assert (tmp_path / "my-merge" / "my-model" / "model.safetensors").exists()
+
+    (tmp_path / "models.json").write_text(json.dumps([{"kind": "pretraining", "name": "missing"}]))
+    with pytest.raises(ArceeException, match="Error downloading the weights of 1 of 1 model"):
+        WeightsDownloadHandler.handle_bulk_download(tmp_path / "models.json")
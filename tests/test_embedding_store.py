@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import arcee
+from arcee.embedding_store import EmbeddingStore, embedding_from_response
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def _embed(request: RecordedRequest) -> Reply:
+    query = request.json["query"]
+    return 200, {}, json.dumps({"embedding": [float(len(query)), 1.0, 0.5]}).encode()
+
+
+def test_put_get_and_persist(tmp_path: Path) -> None:
+    with EmbeddingStore(tmp_path) as store:
+        store.put_many("dep", ["a", "bb", "a"], [[1, 2], [3, 4], [5, 6]])
+        assert store.get("other", "a") is None
+        assert len(store) == 2
+
+    with EmbeddingStore(tmp_path) as store:
+        assert store.get("dep", "a").tolist() == [5, 6]  # type: ignore[union-attr]
+        assert [v.tolist() if v is not None else None for v in store.get_many("dep", ["bb", "c"])] == [[3, 4], None]
+        with pytest.raises(ValueError):
+            store.put("dep", "c", [1, 2, 3])
+
+
+def test_matrix_is_a_zero_copy_view(tmp_path: Path) -> None:
+    store = EmbeddingStore(tmp_path)
+    texts = [f"text {i}" for i in range(3000)]
+    store.put_many("dep", texts, np.arange(6000, dtype=np.float32).reshape(3000, 2))
+
+    matrix = store.matrix("dep")
+
+    assert matrix.shape == (3000, 2)
+    assert isinstance(matrix.base, np.memmap) or isinstance(matrix, np.memmap)
+    assert not matrix.flags.writeable
+    assert matrix[2999].tolist() == [5998, 5999]
+    assert len(store.content_hashes("dep")) == 3000
+    assert store.matrix("missing").shape == (0, 0)
+
+
+def test_embed_served_from_store(api_server: MockAPI, tmp_path: Path) -> None:
+    api_server.handler = _embed
+    store = EmbeddingStore(tmp_path)
+
+    first = arcee.api.embed("dep", "hello", store=store)
+    second = arcee.api.embed("dep", "hello", store=store)
+    results = list(arcee.api.embed_many("dep", ["hello", "hi", "hey"], store=store))
+
+    assert first == second == {"embedding": [5.0, 1.0, 0.5]}
+    assert [r.result["embedding"][0] for r in results] == [5.0, 2.0, 3.0]  # type: ignore[index]
+    assert len(api_server.requests) == 3
+
+
+def test_embedding_from_response() -> None:
+    assert embedding_from_response({"embedding": [1, 2]}) == [1.0, 2.0]
+    assert embedding_from_response({"data": [{"embedding": [3]}]}) == [3.0]
+    assert embedding_from_response([[4, 5]]) == [4.0, 5.0]
+    with pytest.raises(ValueError):
+        embedding_from_response({"nothing": 1})
@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+import arcee
+
+HEAVY_MODULES = ["aiohttp", "datasets", "numpy", "pandas", "pyarrow", "yaml"]
+
+
+def _import_in_subprocess(statement: str) -> dict:
+    """Runs `statement` in a fresh interpreter and reports its duration and the heavy modules it loaded"""
+    code = (
+        "import json, sys, time\n"
+        "started_at = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - started_at\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_arcee_is_lazy() -> None:
+    result = _import_in_subprocess("import arcee")
+    assert result["loaded"] == []
+    # Generous budget: eager imports took over a second, mostly in `datasets`
+    assert result["elapsed"] < 0.5
+
+
+def test_import_api_and_cli_skip_heavy_dependencies() -> None:
+    assert _import_in_subprocess("import arcee.api")["loaded"] == []
+    assert _import_in_subprocess("import arcee.cli.app")["loaded"] == []
+
+
+def test_lazy_attributes_resolve() -> None:
+    from arcee.api import generate
+    from arcee.dalm import DALM
+
+    assert arcee.generate is generate
+    assert arcee.DALM is DALM
+    assert arcee.config.ARCEE_API_VERSION
+    assert set(arcee.__all__) <= set(dir(arcee))
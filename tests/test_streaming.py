@@ -0,0 +1,64 @@
+import json
+
+import arcee
+from arcee.streaming import SSEDecoder, token_from_event
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def _sse(request: RecordedRequest) -> Reply:
+    if "models/status" in request.path:
+        return 200, {}, json.dumps({"id": "model-id", "status": "training_complete"}).encode()
+    events = [
+        {"token": {"text": "Hel", "special": False}},
+        {"token": {"text": "lo"}},
+        {"token": {"text": "</s>", "special": True}},
+    ]
+    body = ": keep-alive\n\n" + "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+    return 200, {"Content-Type": "text/event-stream"}, body.encode()
+
+
+def test_generate_stream_sse(api_server: MockAPI) -> None:
+    api_server.handler = _sse
+
+    stream = arcee.generate("dep", query="hi", stream=True)
+    tokens = list(stream)
+
+    assert tokens == ["Hel", "lo"]
+    assert stream.text == "Hello"
+    assert stream.time_to_first_token is not None and stream.elapsed is not None
+    assert 0 < stream.time_to_first_token <= stream.elapsed
+    assert api_server.requests[0].json["stream"] is True
+
+
+def test_generate_stream_plain_text(api_server: MockAPI) -> None:
+    api_server.handler = lambda request: (200, {"Content-Type": "text/plain; charset=utf-8"}, "héllo".encode())
+
+    assert "".join(arcee.generate("dep", query="hi", stream=True)) == "héllo"
+
+
+def test_dalm_generate_stream(api_server: MockAPI) -> None:
+    api_server.handler = _sse
+
+    dalm = arcee.DALM("my-dalm")
+
+    assert "".join(dalm.generate("query", stream=True)) == "Hello"
+    assert api_server.requests[-1].json["model_id"] == "model-id"
+
+
+def test_sse_decoder_and_event_shapes() -> None:
+    decoder = SSEDecoder()
+
+    assert [decoder.feed(line) for line in ["data: a", "data: b", "", "event: x", "data:[DONE]", ""]] == [
+        None,
+        None,
+        "a\nb",
+        None,
+        None,
+        None,
+    ]
+    assert decoder.done
+    assert token_from_event('{"choices": [{"delta": {"content": "x"}}]}') == "x"
+    assert token_from_event('{"text": "y"}') == "y"
+    assert token_from_event("raw") == "raw"
+    for scalar in ["42", "1.5", "true", "null"]:
+        assert token_from_event(scalar) == scalar
@@ -0,0 +1,295 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+import arcee
+from arcee.cli.handlers.upload import UploadHandler
+from arcee.client import ArceeClient
+from arcee.retry import RetryPolicy
+from arcee.uploads import batch_docs, read_docs, upload_doc_files
+from tests.conftest import MockAPI, RecordedRequest, Reply
+
+
+def _write_jsonl(path: Path, count: int, text: str = "lorem ipsum") -> None:
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({"name": f"doc{i}", "text": f"{text} {i}", "source": "jsonl"}) + "\n")
+
+
+def _uploaded_names(api_server: MockAPI) -> List[str]:
+    return [doc["name"] for r in api_server.requests for doc in r.json["documents"]]
+
+
+def test_batch_docs_cuts_by_size_and_count() -> None:
+    docs = [{"doc_name": f"doc{i}", "doc_text": "x" * 100, "page": i} for i in range(50)]
+
+    by_size = list(batch_docs("ctx", [dict(doc) for doc in docs], max_batch_bytes=1000, max_batch_docs=100))
+    assert len(by_size) > 1
+    assert all(len(batch.body) <= 1000 for batch in by_size)
+    assert [b.index for b in by_size] == list(range(len(by_size)))
+    bodies = [json.loads(batch.body) for batch in by_size]
+    assert all(body["context_name"] == "ctx" for body in bodies)
+    assert [doc for body in bodies for doc in body["documents"]] == [
+        {"name": f"doc{i}", "document": "x" * 100, "meta": {"page": i}} for i in range(50)
+    ]
+    assert sum(batch.docs for batch in by_size) == 50
+
+    by_count = list(batch_docs("ctx", [dict(doc) for doc in docs], max_batch_docs=20))
+    assert [batch.docs for batch in by_count] == [20, 20, 10]
+
+
+def test_batch_docs_sends_oversized_doc_alone() -> None:
+    docs = [{"doc_name": "small", "doc_text": "x"}, {"doc_name": "big", "doc_text": "x" * 500}]
+    batches = list(batch_docs("ctx", docs, max_batch_bytes=200))
+    assert [batch.docs for batch in batches] == [1, 1]
+
+
+def test_read_docs(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("plain text")
+    (tmp_path / "b.csv").write_text("title,body,year\nfirst,hello,2020\nsecond,world,\n")
+
+    assert list(read_docs(tmp_path / "a.txt")) == [{"doc_name": "a.txt", "doc_text": "plain text"}]
+    assert list(read_docs(tmp_path / "b.csv", doc_name="title", doc_text="body")) == [
+        {"doc_name": "first", "doc_text": "hello", "year": 2020.0},
+        {"doc_name": "second", "doc_text": "world", "year": None},
+    ]
+    with pytest.raises(ValueError, match="name not found"):
+        list(read_docs(tmp_path / "b.csv"))
+
+
+def test_csv_and_jsonl_read_the_same_docs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("arcee.uploads.CSV_CHUNK_ROWS", 3)
+    rows = [{"title": f"doc{i}", "body": f"text, {i}", "tag": None if i % 4 else "x", "n": i} for i in range(10)]
+    (tmp_path / "docs.jsonl").write_text("".join(json.dumps(row) + "\n" for row in rows))
+    (tmp_path / "docs.csv").write_text(
+        "title,body,tag,n\n" + "".join(f'{r["title"]},"{r["body"]}",{r["tag"] or ""},{r["n"]}\n' for r in rows)
+    )
+
+    expected = [{"doc_name": r["title"], "doc_text": r["body"], "tag": r["tag"], "n": r["n"]} for r in rows]
+    assert list(read_docs(tmp_path / "docs.jsonl", doc_name="title", doc_text="body")) == expected
+    assert list(read_docs(tmp_path / "docs.csv", doc_name="title", doc_text="body")) == expected
+
+
+def test_upload_file_larger_than_batch(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "docs.jsonl"
+    _write_jsonl(path, 200, text="lorem ipsum " * 20)
+    batches: List[Any] = []
+
+    summary = upload_doc_files(
+        "ctx", [path], max_batch_bytes=path.stat().st_size // 5, on_batch=lambda b, r: batches.append(b)
+    )
+
+    assert summary.docs == 200
+    assert summary.batches == len(api_server.requests) == len(batches) > 5
+    assert _uploaded_names(api_server) == [f"doc{i}" for i in range(200)]
+    assert api_server.requests[0].json["documents"][0]["meta"] == {"source": "jsonl"}
+
+
+def test_upload_with_workers_keeps_requests_in_flight(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "docs.jsonl"
+    _write_jsonl(path, 40)
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def slow(request: RecordedRequest) -> Reply:
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.05)
+        with lock:
+            in_flight["now"] -= 1
+        return 200, {"Content-Type": "application/json"}, json.dumps({"docs": len(request.json["documents"])}).encode()
+
+    api_server.handler = slow
+    batch_indexes: List[int] = []
+    summary = upload_doc_files(
+        "ctx", [path], max_batch_docs=2, workers=4, on_batch=lambda b, r: batch_indexes.append(b.index)
+    )
+
+    assert summary.docs == 40
+    assert batch_indexes == list(range(20))
+    assert 1 < in_flight["max"] <= 4
+    assert summary.bytes == sum(len(r.body) for r in api_server.requests)
+
+
+def test_cli_upload_handler(
+    api_server: MockAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    _write_jsonl(folder / "docs.jsonl", 30)
+    (folder / "notes.txt").write_text("notes")
+    # Files are read from their path, not from the working directory
+    monkeypatch.chdir(tmp_path)
+
+    response: Dict[str, Any] = UploadHandler.handle_doc_upload(
+        "ctx", [folder], chunk_size=1, doc_name="name", doc_text="text", max_batch_docs=8, workers=2
+    )
+
+    assert response["path"] == "/v2/contexts"
+    assert sorted(_uploaded_names(api_server)) == sorted([f"doc{i}" for i in range(30)] + ["notes.txt"])
+    assert all(len(r.json["documents"]) <= 8 for r in api_server.requests)
+
+    (folder / "nested").mkdir()
+    _write_jsonl(folder / "nested" / "more.jsonl", 3)
+    (folder / "nested" / "skip.jsonl").write_text("not json")
+    api_server.requests.clear()
+    UploadHandler.handle_doc_upload(
+        "ctx", [folder], 1, "name", "text", include=["*.jsonl"], exclude=["skip.jsonl"], recursive=True
+    )
+    assert _uploaded_names(api_server) == [f"doc{i}" for i in range(30)] + [f"doc{i}" for i in range(3)]
+
+
+def test_resume_from_manifest(api_server: MockAPI, tmp_path: Path) -> None:
+    _write_jsonl(tmp_path / "a.jsonl", 25)
+    (tmp_path / "b.csv").write_text("name,text\n" + "".join(f"csv{i},text {i}\n" for i in range(15)))
+    paths = [tmp_path / "a.jsonl", tmp_path / "b.csv"]
+    manifest = tmp_path / "upload.manifest"
+
+    def fail_from_fourth_batch(request: RecordedRequest) -> Reply:
+        if len(api_server.requests) >= 4:
+            return 500, {}, b"boom"
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    api_server.handler = fail_from_fourth_batch
+    with pytest.raises(Exception, match="boom"):
+        upload_doc_files("ctx", paths, max_batch_docs=4, manifest=manifest)
+    first_run = _uploaded_names(api_server)[:12]
+    assert len(first_run) == 12
+
+    api_server.requests.clear()
+    api_server.handler = None
+    summary = upload_doc_files("ctx", paths, max_batch_docs=4, manifest=manifest)
+
+    assert (summary.skipped_batches, summary.skipped_docs, summary.docs) == (3, 12, 28)
+    assert first_run + _uploaded_names(api_server) == [f"doc{i}" for i in range(25)] + [f"csv{i}" for i in range(15)]
+    keys = [r.headers["Idempotency-Key"] for r in api_server.requests]
+    assert len(set(keys)) == len(keys) == 7
+
+    # Batches acknowledged out of order, e.g. by parallel workers, are skipped too
+    lines = manifest.read_text().splitlines()
+    manifest.write_text("\n".join(line for line in lines if '"index": 5,' not in line) + "\n")
+    api_server.requests.clear()
+    summary = upload_doc_files("ctx", paths, max_batch_docs=4, manifest=manifest, workers=2)
+    assert (summary.batches, summary.skipped_batches) == (1, 9)
+    assert _uploaded_names(api_server) == ["doc20", "doc21", "doc22", "doc23"]
+
+    (tmp_path / "b.csv").write_text("name,text\nchanged,text\n")
+    with pytest.raises(ValueError, match="different upload"):
+        upload_doc_files("ctx", paths, max_batch_docs=4, manifest=manifest)
+
+
+def test_resume_csv_with_multiline_cells(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "docs.csv"
+    # Records span several lines, and blank lines between them are no records
+    path.write_text("name,text\n" + "".join(f'csv{i},"line one\nline two {i}"\n\n' for i in range(10)))
+    manifest = tmp_path / "upload.manifest"
+
+    def fail_from_second_batch(request: RecordedRequest) -> Reply:
+        if len(api_server.requests) >= 2:
+            return 500, {}, b"boom"
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    api_server.handler = fail_from_second_batch
+    with pytest.raises(Exception, match="boom"):
+        upload_doc_files("ctx", [path], max_batch_docs=3, manifest=manifest)
+
+    api_server.requests.clear()
+    api_server.handler = None
+    summary = upload_doc_files("ctx", [path], max_batch_docs=3, manifest=manifest)
+    assert summary.skipped_docs == 3
+    assert _uploaded_names(api_server) == [f"csv{i}" for i in range(3, 10)]
+    assert api_server.requests[0].json["documents"][0]["document"] == "line one\nline two 3"
+
+
+def test_upload_qa_pairs_from_csv_streams_batches(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "qa.csv"
+    path.write_text("q,a,extra\n" + "".join(f'"question {i}","answer, {i}",x\n' for i in range(4500)))
+    attempts: Dict[str, int] = {}
+    uploaded: List[Any] = []
+
+    def flaky(request: RecordedRequest) -> Reply:
+        # Every batch fails once with a transient error, then succeeds on its retry
+        key = request.headers["Idempotency-Key"]
+        attempts[key] = attempts.get(key, 0) + 1
+        if attempts[key] == 1:
+            return 503, {}, b"unavailable"
+        uploaded.append(request.json["qa_pairs"])
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    api_server.handler = flaky
+    with ArceeClient(retry=RetryPolicy(backoff_factor=0)).use():
+        summary = arcee.upload_qa_pairs_from_csv(
+            "qa", str(path), question_column="q", answer_column="a", workers=2, idempotency_keys=True
+        )
+
+    assert (summary.uploaded, summary.failed, summary.batches) == (4500, 0, 3)
+    assert summary.pairs_per_second > 0
+    assert len(api_server.requests) == 6
+    assert sorted(len(pairs) for pairs in uploaded) == [500, 2000, 2000]
+    assert {"question": "question 0", "answer": "answer, 0"} in [pairs[0] for pairs in uploaded]
+
+
+def test_upload_qa_pairs_from_csv_reports_failed_batches(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "qa.csv"
+    path.write_text("question,answer\n" + "".join(f"q{i},{'a' * 100}\n" for i in range(50)))
+
+    def reject_second_batch(request: RecordedRequest) -> Reply:
+        if request.json["qa_pairs"][0]["question"] == "q20":
+            return 400, {}, b"bad batch"
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    api_server.handler = reject_second_batch
+    summary = arcee.upload_qa_pairs_from_csv("qa", str(path), batch_size=20)
+    assert (summary.uploaded, summary.failed, summary.batches) == (30, 20, 3)
+    assert "bad batch" in str(summary.errors[0])
+
+    with pytest.raises(Exception, match="must have a 'prompt' and an 'answer' key"):
+        arcee.upload_qa_pairs_from_csv("qa", str(path), question_column="prompt")
+
+
+def test_upload_qa_pairs_from_csv_skips_short_rows(api_server: MockAPI, tmp_path: Path) -> None:
+    path = tmp_path / "qa.csv"
+    path.write_text("question,answer\nq1,a1\nq2\n\nq3,a3\n")
+    api_server.handler = lambda request: (200, {"Content-Type": "application/json"}, b"{}")
+
+    summary = arcee.upload_qa_pairs_from_csv("qa", str(path))
+    assert (summary.uploaded, summary.skipped, summary.failed) == (2, 1, 0)
+    # Idempotency keys are only sent when asked for
+    assert "Idempotency-Key" not in api_server.requests[0].headers
+    assert api_server.requests[0].json["qa_pairs"] == [
+        {"question": "q1", "answer": "a1"},
+        {"question": "q3", "answer": "a3"},
+    ]
+
+
+def _chat(question: str, answer: str, first_role: str = "user") -> Dict[str, Any]:
+    return {"messages": [{"role": first_role, "content": question}, {"role": "assistant", "content": answer}]}
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_upload_hugging_face_dataset_from_disk(api_server: MockAPI, tmp_path: Path, streaming: bool) -> None:
+    datasets = pytest.importorskip("datasets")
+    rows = [_chat(f"q{i}", f"a{i}") for i in range(2500)]
+    rows[1] = _chat("q1", "a1", first_role="system")
+    rows[2]["messages"] = rows[2]["messages"][:1]
+    rows[3]["messages"] = rows[3]["messages"] * 2
+    splits = {"train": datasets.Dataset.from_list(rows), "test": datasets.Dataset.from_list(rows[:10])}
+    datasets.DatasetDict(splits).save_to_disk(str(tmp_path / "saved"))
+    (tmp_path / "files").mkdir()
+    (tmp_path / "files" / "train.jsonl").write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    for local in ["saved", "files"]:
+        api_server.requests.clear()
+        summary = arcee.upload_hugging_face_dataset_qa_pairs(
+            "qa", str(tmp_path / local), "train", "chatml", streaming=streaming
+        )
+        assert (summary.uploaded, summary.skipped, summary.failed) == (2497, 3, 0)
+        pairs = [pair for r in api_server.requests for pair in r.json["qa_pairs"]]
+        assert sorted(len(r.json["qa_pairs"]) for r in api_server.requests) == [497, 2000]
+        assert {"question": "q0", "answer": "a0"} in pairs
+        assert {pair["question"] for pair in pairs} == {f"q{i}" for i in range(2500)} - {"q1", "q2", "q3"}
@@ -0,0 +1,95 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from arcee.cli.commands.cache import list_cached_weights, prune_cached_weights
+from arcee.downloads import download_weights_file, extract_weights
+from arcee.weights_cache import WeightsCache
+from tests.conftest import MockAPI
+from tests.test_downloads import MODEL_FILES, WEIGHTS, _archive, _serve_ranges
+
+
+def test_repeat_download_links_from_the_cache(api_server: MockAPI, tmp_path: Path) -> None:
+    api_server.handler = lambda request: _serve_ranges(request, etag='"v1"')
+    cache = WeightsCache(tmp_path / "cache")
+
+    first = download_weights_file("alignment", "my-model", tmp_path / "a.tar.gz", part_size=16_384, cache=cache)
+    assert first.sha256 == hashlib.sha256(WEIGHTS).hexdigest()
+    assert not first.cached
+    [entry] = cache.entries()
+    assert (entry.kind, entry.name, entry.validator, entry.size) == ("alignment", "my-model", '"v1"', len(WEIGHTS))
+    assert entry.path == tmp_path / "cache" / "objects" / first.sha256
+
+    api_server.requests.clear()
+    second = download_weights_file("alignment", "my-model", tmp_path / "b.tar.gz", cache=cache)
+    assert second.cached and second.sha256 == first.sha256
+    assert len(api_server.requests) == 1
+    assert os.path.samefile(tmp_path / "a.tar.gz", tmp_path / "b.tar.gz")
+
+    # The same weights at the same path are left as they are
+    assert download_weights_file("alignment", "my-model", tmp_path / "b.tar.gz", cache=cache).cached
+
+    # Weights changed on the server are downloaded again
+    new_weights = os.urandom(20_000)
+    api_server.handler = lambda request: _serve_ranges(request, new_weights, etag='"v2"')
+    third = download_weights_file("alignment", "my-model", tmp_path / "b.tar.gz", cache=cache)
+    assert not third.cached
+    assert (tmp_path / "b.tar.gz").read_bytes() == new_weights
+    assert (tmp_path / "a.tar.gz").read_bytes() == WEIGHTS
+    assert [entry.validator for entry in cache.entries()] == ['"v2"', '"v1"']
+    cache.close()
+
+
+def test_extract_from_the_cache(api_server: MockAPI, tmp_path: Path) -> None:
+    archive = _archive(MODEL_FILES)
+    api_server.handler = lambda request: _serve_ranges(request, archive, etag='"v1"')
+    with WeightsCache(tmp_path / "cache") as cache:
+        download_weights_file("merging", "my-model", tmp_path / "model.tar.gz", cache=cache)
+        summary = extract_weights("merging", "my-model", tmp_path / "model", cache=cache)
+
+    assert summary.cached and summary.bytes == 0
+    assert summary.files == 2
+    assert (tmp_path / "model" / "my-model" / "config.json").read_bytes() == MODEL_FILES["my-model/config.json"]
+
+
+def test_least_recently_used_weights_are_evicted(tmp_path: Path) -> None:
+    with WeightsCache(tmp_path / "cache", max_bytes=250) as cache:
+        for name in ["a", "b", "c"]:
+            (tmp_path / name).write_bytes(name.encode() * 100)
+            cache.add("alignment", name, '"v1"', hashlib.sha256(name.encode() * 100).hexdigest(), tmp_path / name)
+            if name == "b":
+                # Using "a" makes "b" the least recently used
+                assert cache.get("alignment", "a", '"v1"') is not None
+        assert sorted(entry.name for entry in cache.entries()) == ["a", "c"]
+        assert cache.size() == 200
+        assert cache.get("alignment", "b", '"v1"') is None
+        # Evicted weights stay where they were downloaded
+        assert (tmp_path / "b").read_bytes() == b"b" * 100
+
+        # Files cached under several names count once
+        cache.add("merging", "a", '"v1"', hashlib.sha256(b"a" * 100).hexdigest(), tmp_path / "a")
+        assert cache.size() == 200
+
+        # The least recently used name of "a" goes first, but its file stays for the other one
+        evicted = cache.prune(100)
+        assert [(entry.kind, entry.name) for entry in evicted] == [("alignment", "a"), ("alignment", "c")]
+        assert sorted(path.name for path in cache.objects.iterdir()) == [hashlib.sha256(b"a" * 100).hexdigest()]
+        assert len(cache.prune()) == 1
+        assert cache.size() == 0 and not any(cache.objects.iterdir())
+
+
+def test_cache_commands(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    with WeightsCache(tmp_path) as cache:
+        (tmp_path / "weights").write_bytes(WEIGHTS)
+        cache.add("retriever", "my-retriever", '"v1"', hashlib.sha256(WEIGHTS).hexdigest(), tmp_path / "weights")
+
+    list_cached_weights(tmp_path)
+    output = capsys.readouterr().out
+    assert "my-retriever" in output and "1 weights" in output
+
+    prune_cached_weights(0, tmp_path)
+    assert "Evicted 1 weights" in capsys.readouterr().out
+    with WeightsCache(tmp_path) as cache:
+        assert cache.entries() == []